@@ -1,118 +1,108 @@
-from bs4 import BeautifulSoup
-from datetime import datetime
-import os
-import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, Alignment
-import random
-import requests
-import uuid
+from async_engine import fetch, run_in_thread, run_sync, FetchError, FetchTimeout
+from extract_spec import Field, ItemSpec, text_of
+from scraper_utils import parse_html, dump_debug_page, collect_pages, DEFAULT_LIMIT
 
 
-def scrape(s_url, url, products_scrape):
+# Scraper name used for debug dumps
+SOURCE = "amazon"
+
+# Element holding the search results, the only subtree that is parsed
+RESULTS_CONTAINER_CLASS = "s-result-list"
+
+# Fields of one search result, read in a single walk over its subtree
+PRODUCT_SPEC = ItemSpec(
+    Name=Field(tag="h2", cls="a-color-base", get=lambda h2: text_of(h2.find("span"))),
+    Image=Field(cls="s-image", attr="src"),
+    Price=Field(cls="a-price-whole", post=lambda price: price[:-1] if price.endswith(".") else price),
+    Rating=Field(cls="a-icon-alt", post=lambda rating: rating.split()[0] if rating.split() else ""),
+    Link=Field(tag="h2", cls="a-color-base", get=lambda h2: h2.parent.get("href") if h2.parent else ""),
+)
+
+async def scrape_async(s_url, url, products_scrape=None, on_item=None):
     """
-    Scrapes product data from the given search URL and saves the page locally.
+    Scrapes product data from the given search URL on the async engine.
 
     Args:
         s_url (str): The search URL to scrape.
         url (str): Main domain URL.
-        products_scrape (int, optional): Number of products to scrape.
+        products_scrape (int, optional): Number of products to scrape, every product of the page if None.
+        on_item (callable, optional): Called with each product as soon as it is extracted.
 
     Returns:
-        bool: True if scraping is successful, False otherwise.
+        list | int | None: Scraped products, 0 if none were found, None on failure.
     """
-    print(f"🔍 Scraping {products_scrape} {'products' if products_scrape > 1 else 'product'} from {s_url}...\n")
+    print(f"🔍 Scraping {products_scrape or 'all'} {'product' if products_scrape == 1 else 'products'} from {s_url}...\n")
 
     try:
-        # Generate a unique filename for storing the response
-        file_name = f"{uuid.uuid4()}.html"
-        file_path = os.path.join("temp_files", file_name)
-
-        # Send GET request to the URL
+        # Send GET request to the URL (under the domain's governor), through the on-disk response cache
         headers = {
             "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36"
         }
-        response = requests.get(s_url, headers=headers, timeout=10)
-        response.raise_for_status()  # Raise exception for HTTP errors
-
-        if response.status_code == 200:
-            # Save response content to a temporary file
-            with open(file_path, "wb") as f:
-                f.write(response.content)
-
-            # Call function to extract product details
-            result = scrape_products(file_path, products_scrape, url)
-            return result
-        else:
-            print(f"❌ [ERROR] Failed to scrape {s_url}, Status Code: {response.status_code}\n")
-            return None
-    except requests.ConnectionError:
-        print(f"❌ [ERROR] Connection Error: Failed to connect to {s_url}\n")
-    except requests.ConnectTimeout:
+        response = await fetch(s_url, headers=headers, cache=True)
+
+        # Extract product details off the event loop, straight from the response bytes
+        result = await run_in_thread(scrape_products, response.content, products_scrape, url, on_item)
+        if not result:
+            dump_debug_page(response.content, SOURCE)
+        return result
+    except FetchTimeout:
         print(f"⏳ [ERROR] Timeout Error: {s_url} took too long to respond\n")
-    except requests.HTTPError as http_err:
-        print(f"❌ [ERROR] HTTP Error: {http_err}\n")
-    except requests.RequestException as req_err:
-        print(f"❌ [ERROR] Request Error: {req_err}\n")
+    except FetchError as fetch_err:
+        print(f"❌ [ERROR] Request Error: {fetch_err}\n")
     except Exception as err:
         print(f"❌ [ERROR] Unexpected Error: {err}\n")
     return None
 
-def scrape_products(file_path, products_scrape, url):
+def scrape(s_url, url, products_scrape):
+    """
+    Sync wrapper around scrape_async.
     """
-    Extracts product information from the stored HTML file and saves it in Excel.
+    return run_sync(scrape_async(s_url, url, products_scrape))
 
-    Args:
-        file_path (str): Path to the stored HTML file.
-        products_scrape (int): Number of products to extract.
+def scrape_products(content, products_scrape, url, on_item=None):
     """
+    Extracts product information from the page content.
 
-    # Read the saved HTML file
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    Args:
+        content (bytes | str): Raw HTML of the search results page.
+        products_scrape (int | None): Number of products to extract, all of them if None.
+        url (str): Main domain URL.
+        on_item (callable, optional): Called with each product as soon as it is extracted.
+    """
 
-    soup = BeautifulSoup(content, "html.parser")
+    soup = parse_html(content, RESULTS_CONTAINER_CLASS)
 
+    scrapped_products = []
     try:
         # Locate the product container
-        products_container = soup.find(class_="s-result-list")
+        products_container = soup.find(class_=RESULTS_CONTAINER_CLASS)
 
         products = products_container.find_all("div", role="listitem")
         if not products:
-            # Clean up the temporary file after scraping
-            clean(file_path)
             return 0
 
         # Limit to requested count
         products = products[:products_scrape]
 
-        scrapped_products = []
-
         # Extract details for each product
         for i, product in enumerate(products):
-            product_name = product.find("h2", class_="a-color-base").find("span").text if product.find("h2", class_="a-color-base") and product.find("h2", class_="a-color-base").find("span") else ""
-            product_image = product.find(class_="s-image").attrs.get("src") if product.find(class_="s-image") else ""
-            product_price = product.find(class_="a-price-whole").text if product.find(class_="a-price-whole") else ""
-            product_rating = product.find(class_="a-icon-alt").text.split()[0] if product.find(class_="a-icon-alt") else ""
-            product_link = product.find("h2", class_="a-color-base").parent.attrs.get('href') if product.find("h2", class_="a-color-base") and product.find("h2", class_="a-color-base").parent else ""
+            fields = PRODUCT_SPEC.extract(product)
 
-            if (product_name == "" and product_price == "" and product_link == "") or product_link == "":
+            if fields["Link"] == "":
                 continue
 
-            if product_price[-1] == ".":
-                product_price = product_price[:-1]
-
             product_data = {
                 "SNo": i + 1,
-                "Name": product_name,
-                "Image": product_image,
-                "Price": "Rs." + product_price,
-                "Rating": product_rating,
-                "Link": url + product_link,
+                "Name": fields["Name"],
+                "Image": fields["Image"],
+                "Price": "Rs." + fields["Price"],
+                "Rating": fields["Rating"],
+                "Link": url + fields["Link"],
             }
 
             scrapped_products.append(product_data)
+            if on_item:
+                on_item(product_data)
 
     except AttributeError as attr_err:
         print(f"❌ Attribute Error: {attr_err}\n")
@@ -122,114 +112,44 @@ def scrape_products(file_path, products_scrape, url):
         print(f"❌ Unexpected Error: {err}\n")
         return None
 
-    # Clean up the temporary file after scraping
-    clean(file_path)
-
     # Save extracted products to an Excel file
-    # save_to_excel(scrapped_products)
-    print(f"✅ {len(scrapped_products)} {'products' if products_scrape > 1 else 'product'} scrapped successfully.\n")
+    # save_export(scrapped_products, "scraped_products")
+    print(f"✅ {len(scrapped_products)} {'product' if len(scrapped_products) == 1 else 'products'} scrapped successfully.\n")
     return scrapped_products
 
-def save_to_excel(products):
+async def start_amazon_scrapper_async(search_key, limit=DEFAULT_LIMIT, offset=0, on_item=None):
     """
-    📊 Saves the scraped product data into an Excel file with improved formatting.
-
-    Features:
-    ✅ Auto-adjusts column widths based on content.
-    ✅ Bold headers for better readability.
-    ✅ Center-aligns the headers.
-    ✅ Description column wrapped to avoid excessive width.
+    Start scrapping on the async engine
 
     Args:
-        products (list of dict): List containing product details.
+        search_key (str): The keyword to search for.
+        limit (int): Number of products to return.
+        offset (int): Number of products to skip.
+        on_item (callable, optional): Called with each product of the window as soon as it is extracted.
     """
-
-    df = pd.DataFrame(products)
-
-    # Generate a timestamped filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_name = f"scraped_products_{timestamp}.xlsx"
-
-    # Save the DataFrame to Excel
-    df.to_excel(file_name, index=False, engine="openpyxl")
-
-    # Load the workbook to format it
-    wb = load_workbook(file_name)
-    ws = wb.active
-
-    # Apply formatting
-    for col_num, col in enumerate(ws.columns, 1):
-        max_length = 0
-        column_letter = get_column_letter(col_num)
-
-        # Determine max content width
-        for cell in col:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-
-        adjusted_width = max_length + 2  # Extra padding
-        ws.column_dimensions[column_letter].width = min(adjusted_width, 50)  # Limit max width
-
-    # Style headers
-    header_font = Font(bold=True)
-    for cell in ws[1]:  
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center")
-
-    # Wrap text in the "Description" column
-    for row in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=ws.max_column, max_col=ws.max_column):
-        for cell in row:
-            cell.alignment = Alignment(wrap_text=True)
-
-    # Save the formatted file
-    wb.save(file_name)
-    print(f"📁 Data successfully saved and formatted in {file_name} ✅\n")
-
-def clean(file_path):
-    """
-    🗑️ Cleans up temporary files after scraping.
-
-    Args:
-        file_path (str): The path of the temporary file to delete.
-    """
-    try:
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            print(f"🧹 Successfully deleted temporary file: {file_path}\n")
-        else:
-            print(f"⚠️  File not found: {file_path}\n")
-    except Exception as e:
-        print(f"❌ Error while deleting file {file_path}: {e}\n")
-
-def start_amazon_scrapper(search_key):
-    """
-    Start scrapping
-    """
-    # Ensure the 'temp_files' directory exists
-    os.makedirs("temp_files", exist_ok=True)
-
-    # Generate a random number between 1 - 50
-    products_scrape = random.randint(1, 50)
-
     global url
     url = "https://www.amazon.in"
 
     # Construct search URL
     search_url = f"{url}/s?k={search_key}"
 
-    # Call the scrape function with the provided number of products
-    result = scrape(search_url, url, products_scrape)
+    async def scrape_page(page, wanted, on_page_item):
+        # Take the whole page, collect_pages trims it to the requested window
+        return await scrape_async(f"{search_url}&page={page}", url, None, on_page_item)
+
+    # Fetch the result pages covering the requested window
+    result = await collect_pages(scrape_page, limit, offset, on_item=on_item)
 
     return result
 
+def start_amazon_scrapper(search_key, limit=DEFAULT_LIMIT, offset=0):
+    """
+    Start scrapping
+    """
+    return run_sync(start_amazon_scrapper_async(search_key, limit=limit, offset=offset))
 
-if __name__ == "__main__":
-    # Ensure the 'temp_files' directory exists
-    os.makedirs("temp_files", exist_ok=True)
 
+if __name__ == "__main__":
     url = "https://www.amazon.in"
 
     # Get search query from user
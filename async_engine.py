@@ -0,0 +1,366 @@
+import asyncio
+import atexit
+import concurrent.futures
+from contextlib import asynccontextmanager
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+import aiohttp
+import requests
+import governor
+import http_cache
+import http_client
+
+
+# Engine tuning (override through environment variables)
+ENGINE_BACKEND = os.environ.get("SCRAPER_ENGINE", "async").strip().lower()  # 'async' (aiohttp) or 'sync' (pooled requests session in threads)
+TOTAL_LIMIT = int(os.environ.get("SCRAPER_TOTAL_LIMIT", 500))  # Max upstream fetches in flight for the whole process
+PER_DOMAIN_LIMIT = int(os.environ.get("SCRAPER_PER_DOMAIN_LIMIT", 16))  # Default max fetches in flight per domain
+BLOCKING_PER_DOMAIN_LIMIT = int(os.environ.get("SCRAPER_BLOCKING_PER_DOMAIN_LIMIT", 4))  # Max blocking jobs (Selenium page loads) per domain
+EXECUTOR_WORKERS = int(os.environ.get("SCRAPER_EXECUTOR_WORKERS", 16))  # Threads for parsing, disk I/O and sync fetches
+SYNC_TIMEOUT = float(os.environ.get("SCRAPER_SYNC_TIMEOUT", 120))  # Upper bound for a sync wrapper call, in seconds
+
+
+def _parse_domain_limits(value):
+    """
+    Parses per-domain overrides like 'www.amazon.in=32,www.myntra.com=2'.
+    """
+    limits = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        domain, limit = item.split("=", 1)
+        if domain.strip() and limit.strip().isdigit():
+            limits[domain.strip().lower()] = int(limit)
+    return limits
+
+DOMAIN_LIMITS = _parse_domain_limits(os.environ.get("SCRAPER_DOMAIN_LIMITS", ""))
+
+
+class FetchError(Exception):
+    """
+    Raised when an upstream fetch fails (connection error or HTTP error status).
+    """
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class FetchTimeout(FetchError):
+    """
+    Raised when an upstream fetch does not complete within its timeout.
+    """
+
+
+class FetchBlocked(FetchError):
+    """
+    Raised when the upstream answers with a block page (robot check, captcha).
+    """
+
+
+class CircuitOpen(FetchError):
+    """
+    Raised without contacting the upstream while the domain's circuit breaker for that kind of call is open.
+    """
+    def __init__(self, domain, retry_in):
+        super().__init__(f"{domain} is failing, not retrying for {retry_in:.0f}s")
+        self.domain = domain
+        self.retry_in = retry_in
+
+
+# HTTP statuses that mean the upstream is unhealthy or pushing back, rather than a bad request
+UNHEALTHY_STATUSES = (403, 429, 500, 502, 503, 504)
+
+# Markers of block pages served with a 200 status (e.g. Amazon's robot check)
+BLOCK_MARKERS = {
+    "www.amazon.in": (b"/errors/validateCaptcha",),
+}
+
+
+class FetchResult:
+    """
+    Backend-independent response of a completed fetch.
+    """
+    __slots__ = ("url", "status", "headers", "content")
+
+    def __init__(self, url, status, headers, content):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.content = content
+
+
+_loop = None
+_loop_thread = None
+_loop_lock = threading.Lock()
+_session = None
+_in_flight = {}
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="scraper")
+_blocking_executor = None
+
+
+def get_loop():
+    """
+    Returns the engine's event loop, starting it on a daemon thread on first use.
+    """
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop.set_default_executor(_executor)
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="scraper-engine", daemon=True)
+            _loop_thread.start()
+    return _loop
+
+def run_sync(coro, timeout=None):
+    """
+    Runs a coroutine on the engine loop and blocks until it finishes.
+
+    This is the bridge used by the sync entry points (e.g. main.scrape), so any
+    number of Flask worker threads can share one loop and its connection pool.
+
+    Args:
+        coro (coroutine): The coroutine to run.
+        timeout (float, optional): Seconds to wait before cancelling. Defaults to SYNC_TIMEOUT.
+    """
+    loop = get_loop()
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("run_sync() cannot be called from the engine loop, await the coroutine instead")
+
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout=timeout or SYNC_TIMEOUT)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+def _domain(url):
+    return (urlsplit(url).hostname or "").lower()
+
+def _retry_after(headers):
+    value = (headers or {}).get("Retry-After", "")
+    return float(value) if value.strip().isdigit() else None
+
+def _outcome(err):
+    """
+    Classifies a failed call for the governor: upstream unhealthy, or not its fault.
+    """
+    if isinstance(err, (FetchTimeout, FetchBlocked)):
+        return governor.FAILED
+    if isinstance(err, FetchError):
+        return governor.FAILED if err.status is None or err.status in UNHEALTHY_STATUSES else governor.NEUTRAL
+    if isinstance(err, (asyncio.CancelledError, concurrent.futures.CancelledError)):
+        return governor.NEUTRAL
+    return governor.FAILED
+
+@asynccontextmanager
+async def _governed(domain, kind, limit):
+    """
+    Runs one upstream call under the domain's governor: fails fast while the circuit of
+    this kind of call is open, then waits for a rate limit token and an adaptive concurrency slot.
+    """
+    domain_governor = governor.get_governor(domain)
+    if not domain_governor.allow(kind):
+        raise CircuitOpen(domain, domain_governor.breaker(kind).retry_in())
+
+    await domain_governor.acquire(kind, limit)
+    _in_flight[domain] = _in_flight.get(domain, 0) + 1
+    start = time.monotonic()
+    try:
+        yield
+    except BaseException as err:
+        await domain_governor.release(kind, _outcome(err), retry_after=getattr(err, "retry_after", None))
+        raise
+    else:
+        await domain_governor.release(kind, governor.OK, latency=time.monotonic() - start)
+    finally:
+        _in_flight[domain] -= 1
+
+def _pool_trace_config():
+    """
+    Reports the aiohttp connector's connection usage (reused and new connections, time
+    queued for a free one) to http_client.pool_stats, like the sync backend's pools do.
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_request_start(session, ctx, params):
+        ctx.host = params.url.host
+        ctx.wait = 0.0
+
+    async def on_queued_start(session, ctx, params):
+        ctx.queued_at = time.perf_counter()
+
+    async def on_queued_end(session, ctx, params):
+        ctx.wait = time.perf_counter() - ctx.queued_at
+
+    async def on_reused(session, ctx, params):
+        http_client.pool_stats.record_checkout(ctx.host, ctx.wait)
+        ctx.wait = 0.0
+
+    async def on_created(session, ctx, params):
+        http_client.pool_stats.record_new_connection(ctx.host)
+        await on_reused(session, ctx, params)
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_connection_queued_start.append(on_queued_start)
+    trace_config.on_connection_queued_end.append(on_queued_end)
+    trace_config.on_connection_reuseconn.append(on_reused)
+    trace_config.on_connection_create_end.append(on_created)
+    return trace_config
+
+def _get_session():
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(limit=TOTAL_LIMIT, limit_per_host=PER_DOMAIN_LIMIT, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(sock_connect=http_client.CONNECT_TIMEOUT, sock_read=http_client.READ_TIMEOUT)
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers=http_client.DEFAULT_HEADERS,
+            trace_configs=[_pool_trace_config()],
+        )
+    return _session
+
+async def _fetch_async(url, headers, timeout):
+    session = _get_session()
+    kwargs = {}
+    if timeout:
+        kwargs["timeout"] = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+    try:
+        async with session.get(url, headers=headers, **kwargs) as response:
+            content = await response.read()
+            if response.status >= 400:
+                err = FetchError(f"{response.status} {response.reason} for url: {url}", status=response.status)
+                err.retry_after = _retry_after(response.headers)
+                raise err
+            return FetchResult(str(response.url), response.status, dict(response.headers), content)
+    except asyncio.TimeoutError:
+        raise FetchTimeout(f"{url} took too long to respond")
+    except aiohttp.ClientError as err:
+        raise FetchError(f"Failed to fetch {url}: {err}")
+
+def _fetch_blocking(url, headers, timeout):
+    try:
+        response = http_client.fetch(url, headers=headers, timeout=timeout)
+        if response.status_code >= 400:
+            err = FetchError(f"{response.status_code} {response.reason} for url: {url}", status=response.status_code)
+            err.retry_after = _retry_after(response.headers)
+            raise err
+        return FetchResult(response.url, response.status_code, dict(response.headers), response.content)
+    except requests.Timeout:
+        raise FetchTimeout(f"{url} took too long to respond")
+    except requests.RequestException as err:
+        raise FetchError(f"Failed to fetch {url}: {err}")
+
+async def fetch(url, headers=None, timeout=None, cache=False):
+    """
+    Fetches a URL under the domain's governor (rate limit, adaptive concurrency limit
+    and circuit breaker, see governor.py).
+
+    With cache=True the response goes through the on-disk HTTP cache: fresh responses
+    are served from disk, stale ones are revalidated with ETag/Last-Modified and only
+    downloaded again if they changed.
+
+    Args:
+        url (str): The target URL.
+        headers (dict, optional): Extra headers merged over the defaults.
+        timeout (tuple, optional): (connect, read) timeout in seconds.
+        cache (bool): Use the on-disk HTTP response cache.
+
+    Returns:
+        FetchResult: The completed response.
+
+    Raises:
+        CircuitOpen: Without a request, while the domain is failing.
+        FetchTimeout: If the upstream did not respond in time.
+        FetchError: On connection errors, HTTP error statuses or block pages.
+    """
+    cache = cache and http_cache.ENABLED
+    cached = None
+    if cache:
+        cached = await run_in_thread(http_cache.get_cache().get, url)
+        if cached is not None:
+            if cached.fresh:
+                return FetchResult(url, cached.status, cached.headers, cached.content)
+            headers = {**(headers or {}), **cached.validators()}
+
+    domain = _domain(url)
+    async with _governed(domain, "fetch", DOMAIN_LIMITS.get(domain, PER_DOMAIN_LIMIT)):
+        if ENGINE_BACKEND == "sync":
+            result = await asyncio.get_running_loop().run_in_executor(_executor, _fetch_blocking, url, headers, timeout)
+        else:
+            result = await _fetch_async(url, headers, timeout)
+
+        # A block page is a failure for the governor even though it came with a 200
+        if any(marker in result.content for marker in BLOCK_MARKERS.get(domain, ())):
+            raise FetchBlocked(f"Blocked by {domain} (robot check page)", status=result.status)
+
+    if cached is not None and result.status == 304:
+        await run_in_thread(http_cache.get_cache().revalidated, url, result.headers, len(cached.content))
+        return FetchResult(url, cached.status, cached.headers, cached.content)
+    if cache and result.status == 200:
+        await run_in_thread(http_cache.get_cache().set, url, result.status, result.headers, result.content)
+    return result
+
+def _get_blocking_executor():
+    """
+    Returns the thread pool of blocking upstream work, one thread per browser of the pool.
+
+    Selenium calls can block for a long time (waiting for a free browser, loading and
+    scrolling a page), so they get their own threads: a few stuck fallbacks never starve
+    the parsing of every other source. Extra calls queue here without holding a thread.
+    """
+    global _blocking_executor
+    if _blocking_executor is None:
+        # Imported here so the engine only needs Selenium once blocking work is run
+        import browser_pool
+        _blocking_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=browser_pool.POOL_SIZE, thread_name_prefix="scraper-blocking"
+        )
+    return _blocking_executor
+
+async def run_blocking(url, fn, *args):
+    """
+    Runs blocking upstream work (e.g. a Selenium page load) in its own thread pool,
+    under the governor of the given URL's domain.
+    """
+    domain = _domain(url)
+    async with _governed(domain, "blocking", DOMAIN_LIMITS.get(domain, BLOCKING_PER_DOMAIN_LIMIT)):
+        return await asyncio.get_running_loop().run_in_executor(_get_blocking_executor(), fn, *args)
+
+async def run_in_thread(fn, *args):
+    """
+    Runs CPU-bound work (HTML parsing) off the event loop.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+def get_engine_stats():
+    """
+    Returns engine configuration and the current number of in-flight fetches per domain.
+    """
+    return {
+        "backend": ENGINE_BACKEND,
+        "total_limit": TOTAL_LIMIT,
+        "per_domain_limit": PER_DOMAIN_LIMIT,
+        "blocking_per_domain_limit": BLOCKING_PER_DOMAIN_LIMIT,
+        "domain_limits": DOMAIN_LIMITS,
+        "executor_workers": EXECUTOR_WORKERS,
+        "in_flight": dict(_in_flight),
+    }
+
+def _shutdown():
+    """
+    Closes the shared session and stops the loop at interpreter exit.
+    """
+    if _loop is None or not _loop.is_running():
+        return
+    if _session is not None and not _session.closed:
+        try:
+            asyncio.run_coroutine_threadsafe(_session.close(), _loop).result(timeout=5)
+        except Exception:
+            pass
+    _loop.call_soon_threadsafe(_loop.stop)
+
+atexit.register(_shutdown)
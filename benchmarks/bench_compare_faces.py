@@ -0,0 +1,106 @@
+"""
+Benchmark: /compare_faces latency, old flow vs single detect -> encode flow.
+
+The old endpoint ran the rotate-and-retry detection on both images, then
+face_recognition.face_encodings() on the unrotated images without their boxes, which
+detected the faces all over again (and lost rotated ones). The new one runs
+face_utils.encode_faces() once per image. Both flows are timed in-process on the same
+(image, frame) pairs: the frame as given, rotated by 90 degrees and resized to a 12MP-like
+4000px side.
+
+With --url the running endpoint is timed as well, over HTTP.
+
+Usage:
+    python benchmarks/bench_compare_faces.py --image stored.jpg [--frame frame.jpg] [--runs 5]
+                                             [--url http://localhost:5000/compare_faces]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import face_recognition
+from bench_face_detection import legacy_face_locations
+from face_utils import encode_faces, face_distance, rotate_image
+import requests
+
+
+def legacy_compare(img1, img2):
+    """
+    The old /compare_faces flow. Returns the distance, or None when a face is missing.
+    """
+    if len(legacy_face_locations(img1)) != 1 or len(legacy_face_locations(img2)) != 1:
+        return None
+    encoding1 = face_recognition.face_encodings(img1)
+    encoding2 = face_recognition.face_encodings(img2)
+    if not encoding1 or not encoding2:
+        return None
+    return face_distance(encoding1[0], encoding2[0])
+
+def compare(img1, img2):
+    """
+    The new /compare_faces flow. Returns the distance, or None when a face is missing.
+    """
+    locations1, encodings1 = encode_faces(img1)
+    if len(locations1) != 1:
+        return None
+    locations2, encodings2 = encode_faces(img2)
+    if len(locations2) != 1:
+        return None
+    return face_distance(encodings1[0], encodings2[0])
+
+def median_ms(fn, runs):
+    timings = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+def fmt_distance(distance):
+    return "no face" if distance is None else f"{distance:.3f}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the /compare_faces flow before and after.")
+    parser.add_argument("--image", required=True, help="Stored image with one face")
+    parser.add_argument("--frame", help="Live frame with one face (default: the stored image)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--url", help="Also time a running /compare_faces endpoint")
+    args = parser.parse_args()
+
+    frame_path = args.frame or args.image
+    image, frame = cv2.imread(args.image), cv2.imread(frame_path)
+    if image is None or frame is None:
+        sys.exit("❌ Cannot read the image or the frame")
+
+    scale = 4000 / max(frame.shape[:2])
+    cases = {
+        "frame": frame,
+        "frame rotated 90": rotate_image(frame, 90),
+        "frame 4000px": cv2.resize(frame, (round(frame.shape[1] * scale), round(frame.shape[0] * scale))),
+    }
+
+    print(f"{'case':<20}{'legacy ms':>11}{'distance':>10}{'new ms':>10}{'distance':>10}{'speedup':>9}")
+    for case, case_frame in cases.items():
+        legacy_ms, legacy = median_ms(lambda: legacy_compare(image, case_frame), args.runs)
+        new_ms, distance = median_ms(lambda: compare(image, case_frame), args.runs)
+        print(f"{case:<20}{legacy_ms:>11.1f}{fmt_distance(legacy):>10}{new_ms:>10.1f}{fmt_distance(distance):>10}"
+              f"{legacy_ms / new_ms:>8.1f}x")
+
+    if args.url:
+        with open(args.image, "rb") as f:
+            image_bytes = f.read()
+        for case, case_frame in cases.items():
+            frame_bytes = cv2.imencode(".jpg", case_frame)[1].tobytes()
+            post = lambda: requests.post(args.url, files={
+                "image": ("image.jpg", image_bytes, "image/jpeg"),
+                "frame": ("frame.jpg", frame_bytes, "image/jpeg"),
+            })
+            endpoint_ms, response = median_ms(post, args.runs)
+            print(f"🌐 {case:<20}{endpoint_ms:>10.1f} ms  {response.status_code} {response.text.strip()}")
@@ -0,0 +1,66 @@
+"""
+Benchmark: parse + extract time per site and HTML parser backend, on saved pages.
+
+For every fixture page the tree build the extractor does (parse_html) and the full scrape_products /
+scrape_newss call are timed separately, so the extraction share is total - parse.
+Each parser backend that is installed is measured (html.parser always, lxml if present).
+
+Usage:
+    python benchmarks/bench_extraction.py [--items 50] [--runs 20]
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import CORPUS, fixture_path, load_fixture
+import scraper_utils
+
+
+def available_parsers():
+    parsers = ["html.parser"]
+    try:
+        import lxml  # noqa: F401
+        parsers.append("lxml")
+    except ImportError:
+        pass
+    return parsers
+
+def median_ms(fn, runs):
+    timings = []
+    result = None
+    for _ in range(runs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn()
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure parse and extraction time per site and parser backend.")
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"📄 {args.items} items per page, {args.runs} runs\n")
+    print(f"{'page':<32}{'parser':<14}{'parse ms':>10}{'extract ms':>12}{'total ms':>10}{'items':>7}")
+
+    for name, page in CORPUS.items():
+        # Feeds do not go through the HTML parser
+        if not name.endswith(".html") or not os.path.exists(fixture_path(name)):
+            continue
+        content = load_fixture(name)
+        extract, url = page.extract, page.url
+
+        for backend in available_parsers():
+            scraper_utils.HTML_PARSER = backend
+            parse_ms, _ = median_ms(lambda: scraper_utils.parse_html(content, page.container), args.runs)
+            total_ms, result = median_ms(lambda: extract(content, args.items, url), args.runs)
+            items = len(result) if result else 0
+            print(f"{name:<32}{backend:<14}{parse_ms:>10.2f}{total_ms - parse_ms:>12.2f}{total_ms:>10.2f}{items:>7}")
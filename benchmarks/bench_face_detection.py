@@ -0,0 +1,92 @@
+"""
+Benchmark: face detection latency per orientation case.
+
+Every photo given (each with one face, upright) is turned into five cases: upright,
+rotated by 90, 180 and 270 degrees, and a same-sized picture without a face. Each case is
+run through the old rotate-and-retry loop (a full HOG pass per orientation, warped into
+the original canvas) and through face_utils.detect_faces (orientation probed on a
+downscaled copy, then one pass on the image downscaled to FACE_DETECT_MAX_SIDE), reporting
+the median latency and the number of faces found.
+
+--sides also runs every photo resized to the given longest sides (e.g. 4000 for a 12MP
+phone upload), to check that latency no longer grows with the upload resolution.
+
+Usage:
+    python benchmarks/bench_face_detection.py --images photo.jpg [photo2.jpg ...] [--sides 640 4000] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import face_recognition
+import numpy as np
+from face_utils import detect_faces, rotate_image
+
+
+def legacy_face_locations(img):
+    """
+    The detection loop this benchmark compares against: one full pass per rotation until a face is found.
+    """
+    (h, w) = img.shape[:2]
+    for angle in [0, 90, 180, 270]:
+        M = cv2.getRotationMatrix2D((w // 2, h // 2), angle, 1.0)
+        face_locations = face_recognition.face_locations(cv2.warpAffine(img, M, (w, h)))
+        if face_locations:
+            return face_locations
+    return []
+
+def no_face_like(img):
+    """
+    Returns a picture of the same size without a face: smoothed noise.
+    """
+    noise = np.random.default_rng(0).integers(0, 256, img.shape, dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (0, 0), 8)
+
+def cases(img):
+    yield "upright", img
+    for angle in (90, 180, 270):
+        yield f"rotated {angle}", rotate_image(img, angle)
+    yield "no face", no_face_like(img)
+
+def median_ms(fn, runs):
+    timings = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark face detection per orientation case.")
+    parser.add_argument("--images", nargs="+", required=True, help="Photos with one upright face")
+    parser.add_argument("--sides", nargs="+", type=int, default=[], help="Also run every photo resized to these longest sides")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'image':<24}{'size':>11}{'case':<14}{'legacy ms':>11}{'faces':>7}{'new ms':>11}{'faces':>7}{'speedup':>9}")
+    for path in args.images:
+        img = cv2.imread(path, cv2.IMREAD_COLOR)
+        if img is None:
+            print(f"❌ Cannot read {path}")
+            continue
+
+        name = os.path.basename(path)[:22]
+        variants = [img]
+        for side in args.sides:
+            scale = side / max(img.shape[:2])
+            variants.append(cv2.resize(img, (round(img.shape[1] * scale), round(img.shape[0] * scale))))
+
+        for variant in variants:
+            size = f"{variant.shape[1]}x{variant.shape[0]}"
+            for case, case_img in cases(variant):
+                legacy_ms, legacy = median_ms(lambda: legacy_face_locations(case_img), args.runs)
+                new_ms, (_, faces, _) = median_ms(lambda: detect_faces(case_img), args.runs)
+                print(f"{name:<24}{size:>11}  {case:<12}{legacy_ms:>11.1f}{len(legacy):>7}{new_ms:>11.1f}{len(faces):>7}"
+                      f"{legacy_ms / new_ms:>8.1f}x")
@@ -0,0 +1,85 @@
+"""
+Benchmark: 1:N gallery search latency.
+
+Fills a face_gallery.FaceGallery with random 128-d encodings (centered around 0 with a
+norm of about 1, like real ones) and times identify() for random probes,
+reporting the median and p99 latency. BLAS is pinned to one thread, so the numbers are
+for one CPU core. For reference, the per-identity loop over face_recognition.compare_faces
+it replaces is timed on a slice of the gallery and extrapolated to its full size.
+
+Usage:
+    python benchmarks/bench_face_gallery.py [--identities 100000] [--probes 200] [--k 5]
+"""
+import os
+
+# Must be set before numpy is imported
+for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(var, "1")
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from face_gallery import FaceGallery
+
+
+def random_encodings(rng, n):
+    return rng.normal(0, 0.09, (n, 128)).astype(np.float32)
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the 1:N face gallery search.")
+    parser.add_argument("--identities", type=int, default=100000)
+    parser.add_argument("--probes", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--loop-sample", type=int, default=2000, help="Identities the Python loop baseline is timed on")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    encodings = random_encodings(rng, args.identities)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gallery = FaceGallery(os.path.join(tmp, "gallery.npz"))
+        start = time.perf_counter()
+        for i, encoding in enumerate(encodings):
+            gallery.enroll(f"id-{i}", encoding)
+        enroll_s = time.perf_counter() - start
+
+        # Probes: noisy copies of enrolled faces, the right identity must come first
+        targets = rng.integers(0, args.identities, args.probes)
+        probes = encodings[targets] + rng.normal(0, 0.01, (args.probes, 128)).astype(np.float32)
+
+        timings = []
+        correct = 0
+        for target, probe in zip(targets, probes):
+            start = time.perf_counter()
+            matches = gallery.identify(probe, args.k)
+            timings.append((time.perf_counter() - start) * 1000)
+            correct += matches[0][0] == f"id-{target}"
+
+    print(f"👥 {args.identities} identities enrolled in {enroll_s:.1f}s, {gallery.stats()['bytes'] / 1024 / 1024:.1f} MB")
+    print(f"🔎 identify (k={args.k}): median {statistics.median(timings):.2f} ms, p99 {percentile(timings, 99):.2f} ms, "
+          f"top-1 correct {correct}/{args.probes}")
+
+    try:
+        import face_recognition
+    except ImportError:
+        print("⚠️  face_recognition is not installed, skipping the loop baseline")
+        sys.exit(0)
+
+    sample = [encoding.astype(np.float64) for encoding in encodings[:args.loop_sample]]
+    start = time.perf_counter()
+    for encoding in sample:
+        face_recognition.compare_faces([encoding], probes[0])
+    loop_ms = (time.perf_counter() - start) * 1000 * args.identities / len(sample)
+    print(f"🐢 compare_faces loop: about {loop_ms:.0f} ms for {args.identities} identities "
+          f"(timed on {len(sample)}, {loop_ms / statistics.median(timings):.0f}x slower)")
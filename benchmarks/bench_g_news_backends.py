@@ -0,0 +1,76 @@
+"""
+Benchmark: Google News RSS backend vs the Selenium page backend, on saved fixtures.
+
+Compares extraction of the same number of items from:
+    - fixtures/g_news_search.xml  (search feed, streaming XML parser)
+    - fixtures/g_news_search.html (rendered search page, BeautifulSoup)
+
+Only extraction is measured here. The Selenium backend additionally pays for a
+browser page load and scrolling on every request, which the feed backend avoids.
+
+Usage:
+    python benchmarks/bench_g_news_backends.py [--items 30] [--runs 20]
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import google_news
+
+
+URL = "https://news.google.com"
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+def measure(fn, runs):
+    """
+    Returns (median latency in ms, peak traced allocation in KB, items extracted).
+    """
+    timings = []
+    result = None
+    for _ in range(runs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn()
+            timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(timings), peak / 1024, len(result) if result else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the Google News feed and page backends.")
+    parser.add_argument("--items", type=int, default=30)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    feed = load_fixture("g_news_search.xml")
+    page = load_fixture("g_news_search.html").decode("utf-8")
+
+    backends = {
+        "rss": lambda: google_news.scrape_rss_newss(feed, args.items),
+        "selenium": lambda: google_news.scrape_newss(page, args.items, URL),
+    }
+
+    print(f"📄 Feed: {len(feed) / 1024:.0f} KB, page: {len(page) / 1024:.0f} KB, {args.items} items, {args.runs} runs\n")
+    print(f"{'backend':<12}{'median ms':>12}{'peak KB':>12}{'items':>8}")
+    for name, fn in backends.items():
+        median_ms, peak_kb, items = measure(fn, args.runs)
+        print(f"{name:<12}{median_ms:>12.2f}{peak_kb:>12.0f}{items:>8}")
+    print("\nℹ️  The selenium row excludes the browser page load and scrolling it also needs in production.")
@@ -0,0 +1,110 @@
+"""
+Benchmark: in-memory parse pipeline vs the old temp_files round trip.
+
+Runs amazon.scrape_products over a synthetic search page in two ways:
+    - legacy: write response bytes to temp_files/<uuid>.html, read it back as str, parse, delete
+    - in-memory: parse the response bytes directly
+
+Usage:
+    python benchmarks/bench_parse_pipeline.py [--products 50] [--runs 20]
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import amazon
+
+
+URL = "https://www.amazon.in"
+
+def build_amazon_page(products, padding_kb=600):
+    """
+    Builds a synthetic Amazon search page with the markup scrape_products expects.
+
+    Args:
+        products (int): Number of result items to render.
+        padding_kb (int): Size of the inline script/nav filler, to mimic a real 1-3 MB page.
+    """
+    items = []
+    for i in range(products):
+        items.append(
+            f'<div role="listitem" data-asin="B0{i:08d}"><div class="s-card">'
+            f'<img class="s-image" src="https://m.media-amazon.com/images/I/{i}.jpg"/>'
+            f'<a class="a-link-normal" href="/dp/B0{i:08d}"><h2 class="a-size-medium a-color-base"><span>Product {i} – 128 GB</span></h2></a>'
+            f'<span class="a-icon-alt">4.{i % 10} out of 5 stars</span>'
+            f'<span class="a-price"><span class="a-price-whole">{1000 + i * 37:,}.</span></span>'
+            f'</div></div>'
+        )
+    filler = "var x = 'ƒ';" * (padding_kb * 1024 // 13)
+    html = (
+        '<!doctype html><html><head><meta charset="utf-8"><title>Amazon.in</title>'
+        f'<script>{filler}</script></head><body><div id="nav">{"<a href=/x>nav</a>" * 200}</div>'
+        f'<div class="s-main-slot s-result-list">{"".join(items)}</div>'
+        f'<div id="footer">{"<p>footer</p>" * 200}</div></body></html>'
+    )
+    return html.encode("utf-8")
+
+def legacy_pipeline(content, products):
+    """
+    Reproduces the old flow: temp file write, read back, parse, delete.
+    """
+    os.makedirs("temp_files", exist_ok=True)
+    file_path = os.path.join("temp_files", f"{uuid.uuid4()}.html")
+    with open(file_path, "wb") as f:
+        f.write(content)
+    with open(file_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    result = amazon.scrape_products(text, products, URL)
+    os.remove(file_path)
+    return result
+
+def in_memory_pipeline(content, products):
+    """
+    New flow: parse the response bytes directly.
+    """
+    return amazon.scrape_products(content, products, URL)
+
+def measure(fn, content, products, runs):
+    """
+    Returns (median latency in ms, peak traced allocation in KB) for the given pipeline.
+    """
+    timings = []
+    for _ in range(runs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn(content, products)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn(content, products)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(timings), peak / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare temp-file and in-memory parse pipelines.")
+    parser.add_argument("--products", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    content = build_amazon_page(args.products)
+    print(f"📄 Page size: {len(content) / 1024:.0f} KB, {args.products} products, {args.runs} runs\n")
+
+    legacy_ms, legacy_kb = measure(legacy_pipeline, content, args.products, args.runs)
+    memory_ms, memory_kb = measure(in_memory_pipeline, content, args.products, args.runs)
+
+    print(f"{'pipeline':<12}{'median ms':>12}{'peak KB':>12}")
+    print(f"{'legacy':<12}{legacy_ms:>12.2f}{legacy_kb:>12.0f}")
+    print(f"{'in-memory':<12}{memory_ms:>12.2f}{memory_kb:>12.0f}")
+    print(f"\n⚡ Saved {legacy_ms - memory_ms:.2f} ms and {legacy_kb - memory_kb:.0f} KB peak per request")
@@ -0,0 +1,71 @@
+"""
+Fixture corpus shared by the offline benchmarks and the fixture recorder.
+
+Every page maps to the extractor that reads it, the main domain URL passed to it and
+the live URL it is recorded from. Pages are read from fixtures/ only, nothing here
+touches the network.
+
+The committed pages are synthetic, not recordings: hand-built pages carrying the result
+markup each extractor reads, padded with filler script to a realistic page weight. They
+keep the extractors and the benchmarks runnable offline and are good for comparing two
+commits on the same input, but their numbers say little about real pages. Record real
+pages with record_fixtures.py (then drop them from SYNTHETIC_PAGES) before using
+run_benchmarks.py results as evidence of a real-world gain.
+"""
+from collections import namedtuple
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import amazon
+import flipkart
+import google_news
+import myntra
+
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+# extract(content, items, url) is the scraper's extractor, url the main domain URL passed to it,
+# live_url where the page is recorded from, browser whether recording needs a rendered page and
+# container the class of the results container the extractor restricts its parse to (None when
+# it parses the whole page, and for feeds)
+Page = namedtuple("Page", "source extract url live_url browser container")
+
+CORPUS = {
+    "amazon_search.html": Page(
+        "amazon", amazon.scrape_products, "https://www.amazon.in",
+        "https://www.amazon.in/s?k=iphone", False, amazon.RESULTS_CONTAINER_CLASS,
+    ),
+    "flipkart_search_vertical.html": Page(
+        "flipkart", flipkart.scrape_products, "https://www.flipkart.com",
+        "https://www.flipkart.com/search?q=iphone", False, None,
+    ),
+    "flipkart_search_grid.html": Page(
+        "flipkart", flipkart.scrape_products, "https://www.flipkart.com",
+        "https://www.flipkart.com/search?q=running+shoes", False, None,
+    ),
+    "myntra_search.html": Page(
+        "myntra", myntra.scrape_products, "https://www.myntra.com",
+        "https://www.myntra.com/tshirts", True, None,
+    ),
+    "g_news_search.html": Page(
+        "g-news", google_news.scrape_newss, "https://news.google.com",
+        "https://news.google.com/search?q=iphone", True, None,
+    ),
+    "g_news_search.xml": Page(
+        "g-news", lambda content, items, url: google_news.scrape_rss_newss(content, items), "https://news.google.com",
+        google_news.RSS_SEARCH_URL.format("iphone"), False, None,
+    ),
+}
+
+# Pages of fixtures/ that are synthetic (see above), flagged in benchmark results
+SYNTHETIC_PAGES = set(CORPUS)
+
+def fixture_path(name):
+    return os.path.join(FIXTURES_DIR, name)
+
+def load_fixture(name):
+    with open(fixture_path(name), "rb") as f:
+        return f.read()
@@ -0,0 +1,82 @@
+"""
+Records the fixture corpus from the live sites.
+
+Every page of corpus.CORPUS is fetched from its live URL (plain HTTP, or the pooled
+headless browser for pages that need rendering) and saved to fixtures/. A page is only
+saved if its extractor finds items in it, so a captcha or consent page never replaces a
+good fixture unless --force is given.
+
+Re-record when a site changes its markup, then commit the pages together with the
+scraper change and a fresh run_benchmarks.py baseline. A recorded page replaces a
+synthetic one: remove it from corpus.SYNTHETIC_PAGES, and trim it before committing
+(strip inline scripts and styles the extractor never reads, keep the results markup).
+
+Usage:
+    python benchmarks/record_fixtures.py [--pages myntra_search.html ...] [--force]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import CORPUS, fixture_path
+import http_client
+
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36"
+}
+
+def record(name, force=False):
+    """
+    Fetches one page of the corpus and saves it if it extracts.
+
+    Returns:
+        bool: True if the fixture was written.
+    """
+    page = CORPUS[name]
+    print(f"🌐 Recording {name} from {page.live_url}...")
+
+    if page.browser:
+        from browser_pool import get_html_selenium
+        content = get_html_selenium(page.live_url).encode("utf-8")
+    else:
+        response = http_client.fetch(page.live_url, headers=HEADERS)
+        response.raise_for_status()
+        content = response.content
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = page.extract(content, 50, page.url)
+    items = len(result) if result else 0
+
+    if not items and not force:
+        print(f"❌ No items extracted from {name}, fixture left unchanged (use --force to save anyway)\n")
+        return False
+
+    with open(fixture_path(name), "wb") as f:
+        f.write(content)
+    print(f"✅ {name}: {len(content) / 1024:.0f} KB, {items} items\n")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record the benchmark fixture corpus from the live sites.")
+    parser.add_argument("--pages", nargs="+", choices=list(CORPUS), help="Fixture pages to record (default: all)")
+    parser.add_argument("--force", action="store_true", help="Save pages even if nothing could be extracted")
+    args = parser.parse_args()
+
+    failed = []
+    for name in args.pages or CORPUS:
+        try:
+            if not record(name, args.force):
+                failed.append(name)
+        except Exception as err:
+            print(f"❌ [ERROR] {name}: {err}\n")
+            failed.append(name)
+
+    if failed:
+        print(f"⚠️  Not recorded: {', '.join(failed)}")
+        sys.exit(1)
@@ -0,0 +1,195 @@
+"""
+Offline scraper benchmark suite over the fixture corpus.
+
+Pages of the corpus that are synthetic rather than recorded (corpus.SYNTHETIC_PAGES) are
+marked with * and flagged in the JSON results: compare such numbers between commits
+only, they are no evidence of a gain on the live sites.
+
+Drives every extractor (scrape_products / scrape_newss / scrape_rss_newss) over its
+fixture pages and reports, per page:
+    - parse_ms:   median tree build time (parse_html) as the extractor does it: the results
+                  container only where the scraper parses partially, HTML pages only
+    - parse_kb:   peak traced allocation of that tree build
+    - full_parse_ms / full_parse_kb: the same for a tree of the whole page, for reference
+    - total_ms:   median time of the full extractor call
+    - extract_ms: total_ms - parse_ms
+    - items:      number of items extracted
+    - peak_kb:    peak traced allocation of one extractor call
+
+Results are written as JSON (default: benchmarks/results/<commit>.json) so runs can be
+compared between commits with --baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--items 50] [--runs 20] [--pages amazon_search.html ...]
+                                        [--output results.json] [--baseline results/<commit>.json]
+"""
+import argparse
+import contextlib
+from datetime import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import BENCH_DIR, CORPUS, SYNTHETIC_PAGES, fixture_path, load_fixture
+import scraper_utils
+
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# Relative change above which a metric is flagged when comparing with a baseline
+REGRESSION_THRESHOLD = 0.10
+
+def current_commit():
+    """
+    Returns the short hash of the checked out commit (with '-dirty' for local changes), or 'unknown'.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=BENCH_DIR, capture_output=True, text=True
+        ).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def quiet(fn):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn()
+
+def median_ms(fn, runs):
+    timings = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = quiet(fn)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+def peak_kb(fn):
+    tracemalloc.start()
+    try:
+        quiet(fn)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+def bench_page(name, items, runs):
+    """
+    Measures one fixture page.
+
+    Returns:
+        dict: The page metrics, see the module docstring.
+    """
+    page = CORPUS[name]
+    content = load_fixture(name)
+    extract = lambda: page.extract(content, items, page.url)
+
+    parse_ms = parse_kb = full_parse_ms = full_parse_kb = 0.0
+    if name.endswith(".html"):
+        parse = lambda: scraper_utils.parse_html(content, page.container)
+        full_parse = lambda: scraper_utils.parse_html(content)
+        parse_ms, _ = median_ms(parse, runs)
+        parse_kb = peak_kb(parse)
+        full_parse_ms, _ = median_ms(full_parse, runs)
+        full_parse_kb = peak_kb(full_parse)
+    total_ms, result = median_ms(extract, runs)
+
+    return {
+        "source": page.source,
+        "synthetic": name in SYNTHETIC_PAGES,
+        "bytes": len(content),
+        "parse_ms": round(parse_ms, 3),
+        "parse_kb": round(parse_kb, 1),
+        "full_parse_ms": round(full_parse_ms, 3),
+        "full_parse_kb": round(full_parse_kb, 1),
+        "extract_ms": round(total_ms - parse_ms, 3),
+        "total_ms": round(total_ms, 3),
+        "items": len(result) if result else 0,
+        "peak_kb": round(peak_kb(extract), 1),
+    }
+
+def compare(results, baseline):
+    """
+    Prints the change of every metric against a baseline run, flagging regressions.
+    """
+    print(f"\n📊 Compared with {baseline['commit']} ({baseline['timestamp']})\n")
+    print(f"{'page':<32}{'metric':<12}{'baseline':>12}{'current':>12}{'change':>10}")
+
+    regressions = 0
+    for name, metrics in results["pages"].items():
+        old = baseline["pages"].get(name)
+        if old is None:
+            continue
+        for metric in ("total_ms", "peak_kb", "parse_ms", "parse_kb", "items"):
+            before, after = old[metric], metrics[metric]
+            change = (after - before) / before if before else 0.0
+
+            # Fewer items is a regression too, not an improvement
+            worse = change < -REGRESSION_THRESHOLD if metric == "items" else change > REGRESSION_THRESHOLD
+            regressions += worse
+            flag = " ⚠️" if worse else ""
+            print(f"{name:<32}{metric:<12}{before:>12}{after:>12}{change:>+10.1%}{flag}")
+
+    print(f"\n{'⚠️  ' + str(regressions) + ' regression(s)' if regressions else '✅ No regressions'} above {REGRESSION_THRESHOLD:.0%}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the offline scraper benchmarks over the fixture corpus.")
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--pages", nargs="+", choices=list(CORPUS), help="Fixture pages to run (default: all)")
+    parser.add_argument("--output", help="Where to write the JSON results (default: results/<commit>.json)")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    args = parser.parse_args()
+
+    commit = current_commit()
+    results = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "parser": scraper_utils.HTML_PARSER,
+        "items": args.items,
+        "runs": args.runs,
+        "pages": {},
+    }
+
+    print(f"📄 {args.items} items per page, {args.runs} runs, {scraper_utils.HTML_PARSER} parser, commit {commit}\n")
+    print(f"{'page':<32}{'parse ms':>10}{'parse KB':>10}{'full ms':>9}{'full KB':>9}"
+          f"{'extract ms':>12}{'total ms':>10}{'items':>7}{'peak KB':>10}")
+
+    for name in args.pages or CORPUS:
+        if not os.path.exists(fixture_path(name)):
+            print(f"⚠️  {name} is not recorded, skipping")
+            continue
+        metrics = bench_page(name, args.items, args.runs)
+        results["pages"][name] = metrics
+        label = name + (" *" if metrics["synthetic"] else "")
+        print(f"{label:<32}{metrics['parse_ms']:>10.2f}{metrics['parse_kb']:>10.0f}{metrics['full_parse_ms']:>9.2f}"
+              f"{metrics['full_parse_kb']:>9.0f}{metrics['extract_ms']:>12.2f}{metrics['total_ms']:>10.2f}"
+              f"{metrics['items']:>7}{metrics['peak_kb']:>10.0f}")
+
+    if any(metrics["synthetic"] for metrics in results["pages"].values()):
+        print("\n* Synthetic fixture, not a recorded page: only compare it between commits")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        sys.exit(1 if compare(results, baseline) else 0)
@@ -0,0 +1,353 @@
+import atexit
+from contextlib import contextmanager
+import os
+import queue
+import threading
+import time
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+
+# psutil is optional, without it instances are only recycled by page count
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# Pool tuning (override through environment variables)
+POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", 2))  # Max live Chrome instances
+MAX_PAGES = int(os.environ.get("BROWSER_MAX_PAGES", 50))  # Recycle an instance after this many page loads
+MAX_MEMORY_MB = int(os.environ.get("BROWSER_MAX_MEMORY_MB", 1024))  # Recycle an instance once its process tree exceeds this RSS
+CHECKOUT_TIMEOUT = float(os.environ.get("BROWSER_CHECKOUT_TIMEOUT", 60))  # Seconds to wait for a free instance
+PAGE_LOAD_TIMEOUT = float(os.environ.get("BROWSER_PAGE_LOAD_TIMEOUT", 30))
+
+# Scrolling (override through environment variables)
+SCROLL_STRATEGY = os.environ.get("BROWSER_SCROLL_STRATEGY", "smooth")  # 'smooth' or 'fast'
+SCROLL_TIME_BUDGET = float(os.environ.get("BROWSER_SCROLL_TIME_BUDGET", 20))  # Overall seconds for load + scroll
+RENDER_TIMEOUT = float(os.environ.get("BROWSER_RENDER_TIMEOUT", 5))  # Max wait for the results container to appear
+SETTLE_TIMEOUT = float(os.environ.get("BROWSER_SETTLE_TIMEOUT", 1.5))  # Max wait for more content after a scroll round
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def resolve_driver_path():
+    """
+    Resolves the chromedriver binary once per process.
+
+    CHROMEDRIVER_PATH wins if set, otherwise webdriver-manager resolves (and downloads
+    if needed) a matching driver. The result is reused by every browser instance.
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = os.environ.get("CHROMEDRIVER_PATH") or ChromeDriverManager().install()
+            print(f"🧭 Using chromedriver at {_driver_path}\n")
+    return _driver_path
+
+def _chrome_options():
+    options = Options()
+    options.add_argument("--headless")  # Run in background
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    return options
+
+
+class PooledBrowser:
+    """
+    A long-lived headless Chrome instance plus its usage counters.
+    """
+    def __init__(self):
+        service = Service(resolve_driver_path())
+        self.driver = webdriver.Chrome(service=service, options=_chrome_options())
+        self.driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        self.pages = 0
+        self.created_at = time.time()
+
+    def is_healthy(self):
+        """
+        Checks that the browser still answers a trivial script.
+        """
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def memory_mb(self):
+        """
+        Returns the RSS of chromedriver and all its Chrome children, or None if unknown.
+        """
+        if psutil is None:
+            return None
+        try:
+            process = psutil.Process(self.driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+        except Exception:
+            return None
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as err:
+            print(f"⚠️  Error while closing browser: {err}\n")
+
+
+class BrowserPool:
+    """
+    Bounded pool of warm headless Chrome instances with checkout/checkin.
+
+    Instances are health-checked on checkout and recycled after MAX_PAGES page
+    loads or once their memory exceeds MAX_MEMORY_MB.
+    """
+    def __init__(self, size=POOL_SIZE, max_pages=MAX_PAGES, max_memory_mb=MAX_MEMORY_MB):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self._idle = queue.LifoQueue()  # Most recently used first, it is the warmest
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._live = 0
+        self._stats = {"checkouts": 0, "launched": 0, "recycled": 0, "unhealthy": 0, "wait_time_total": 0.0}
+
+    def _launch(self):
+        browser = PooledBrowser()
+        with self._lock:
+            self._live += 1
+            self._stats["launched"] += 1
+        return browser
+
+    def _discard(self, browser, reason):
+        browser.quit()
+        with self._lock:
+            self._live -= 1
+            self._stats[reason] += 1
+
+    def checkout(self, timeout=CHECKOUT_TIMEOUT):
+        """
+        Takes a healthy browser out of the pool, launching one if none is idle.
+
+        Raises:
+            TimeoutError: If no instance became free within the timeout.
+        """
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No browser available within {timeout}s")
+
+        try:
+            browser = None
+            while browser is None:
+                try:
+                    browser = self._idle.get_nowait()
+                except queue.Empty:
+                    browser = self._launch()
+                    break
+
+                if not browser.is_healthy():
+                    self._discard(browser, "unhealthy")
+                    browser = None
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["wait_time_total"] += time.perf_counter() - start
+        return browser
+
+    def checkin(self, browser, broken=False):
+        """
+        Returns a browser to the pool, or recycles it if it is broken, worn out or too big.
+        """
+        try:
+            browser.pages += 1
+            memory = browser.memory_mb()
+
+            if broken:
+                self._discard(browser, "unhealthy")
+            elif browser.pages >= self.max_pages or (memory is not None and memory > self.max_memory_mb):
+                self._discard(browser, "recycled")
+            else:
+                try:
+                    # Drop the rendered page so idle instances do not hold its memory
+                    browser.driver.get("about:blank")
+                    self._idle.put(browser)
+                except Exception:
+                    self._discard(browser, "unhealthy")
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def browser(self, timeout=CHECKOUT_TIMEOUT):
+        """
+        Context manager yielding a WebDriver from the pool.
+        """
+        pooled = self.checkout(timeout=timeout)
+        broken = False
+        try:
+            yield pooled.driver
+        except Exception:
+            broken = not pooled.is_healthy()
+            raise
+        finally:
+            self.checkin(pooled, broken=broken)
+
+    def warm_up(self, count=None):
+        """
+        Resolves the driver and pre-launches instances so the first requests do not pay startup.
+        """
+        resolve_driver_path()
+        count = min(count or self.size, self.size)
+        browsers = [self.checkout() for _ in range(count)]
+        for browser in browsers:
+            self.checkin(browser)
+        # Warm-up loads are not real pages
+        for browser in list(self._idle.queue):
+            browser.pages = 0
+
+    def stats(self):
+        """
+        Returns pool configuration and usage counters.
+        """
+        with self._lock:
+            checkouts = self._stats["checkouts"]
+            return {
+                "size": self.size,
+                "max_pages": self.max_pages,
+                "max_memory_mb": self.max_memory_mb,
+                "live": self._live,
+                "idle": self._idle.qsize(),
+                "checkouts": checkouts,
+                "launched": self._stats["launched"],
+                "recycled": self._stats["recycled"],
+                "unhealthy": self._stats["unhealthy"],
+                "wait_time_avg_ms": round(self._stats["wait_time_total"] * 1000 / checkouts, 3) if checkouts else 0.0,
+            }
+
+    def close(self):
+        """
+        Quits every idle instance.
+        """
+        while True:
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(browser, "recycled")
+
+
+pool = BrowserPool()
+atexit.register(pool.close)
+
+
+def _result_count(driver, target_selector):
+    """
+    Returns the number of child nodes of the results container (0 if it is not rendered yet).
+    """
+    return driver.execute_script(
+        "var el = document.querySelector(arguments[0]); return el ? el.children.length : 0;",
+        target_selector,
+    ) or 0
+
+def _page_height(driver):
+    return driver.execute_script("return document.body.scrollHeight")
+
+def _scroll_state(driver, target_selector):
+    """
+    Returns (page height, number of result nodes) with a single script call.
+    """
+    height, count = driver.execute_script(
+        "var el = arguments[0] ? document.querySelector(arguments[0]) : null;"
+        "return [document.body.scrollHeight, el ? el.children.length : 0];",
+        target_selector,
+    )
+    return height or 0, count or 0
+
+def get_html_selenium(url, target_selector=None, target_count=None, time_budget=SCROLL_TIME_BUDGET,
+                      scroll_strategy=SCROLL_STRATEGY, scroll_pause=0.5, scroll_step=300):
+    """
+    Fetches the HTML source of a webpage using a pooled headless browser, scrolling until
+    enough results are rendered.
+
+    Scrolling stops as soon as the results container has target_count children, when
+    the page stops growing, or when the time budget runs out, whichever comes first.
+    All waits are explicit waits on the DOM, so a step returns as soon as new content shows up.
+
+    Args:
+        url (str): The target URL.
+        target_selector (str, optional): CSS selector of the results container.
+        target_count (int, optional): Number of result nodes needed.
+        time_budget (float): Overall limit (in seconds) for loading and scrolling.
+        scroll_strategy (str): 'smooth' scrolls in steps so lazy content renders on the way,
+            'fast' jumps straight to the bottom on every round.
+        scroll_pause (float): Max time to wait (in seconds) on each smooth scroll step; a step
+            moves on as soon as the page grows or more results render.
+        scroll_step (int): Number of pixels to scroll per smooth step.
+    """
+    def target_reached(driver):
+        return bool(target_selector and target_count) and _result_count(driver, target_selector) >= target_count
+
+    def remaining():
+        return max(deadline - time.monotonic(), 0)
+
+    def progressed(before):
+        # True once the page grew or more results rendered since `before` was taken
+        return lambda driver: any(now > then for now, then in zip(_scroll_state(driver, target_selector), before))
+
+    with pool.browser() as driver:
+        deadline = time.monotonic() + time_budget
+
+        # Open URL
+        driver.get(url)
+
+        # Wait for the results container to render instead of sleeping
+        if target_selector:
+            try:
+                WebDriverWait(driver, min(RENDER_TIMEOUT, remaining()), poll_frequency=0.1).until(
+                    lambda d: _result_count(d, target_selector) > 0
+                )
+            except TimeoutException:
+                print(f"⚠️  {target_selector} did not render within {RENDER_TIMEOUT}s\n")
+
+        last_height = _page_height(driver)
+
+        while remaining() > 0 and not target_reached(driver):
+            if scroll_strategy == "fast":
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            else:
+                position = int(driver.execute_script("return window.pageYOffset + window.innerHeight") or 0)
+                for _ in range(position, last_height + scroll_step, scroll_step):
+                    before = _scroll_state(driver, target_selector)
+                    driver.execute_script(f"window.scrollBy(0, {scroll_step});")
+                    try:
+                        # Give lazy content up to scroll_pause to show up, but move on as soon as some did
+                        WebDriverWait(driver, min(scroll_pause, remaining()), poll_frequency=0.05).until(progressed(before))
+                    except TimeoutException:
+                        pass
+                    if target_reached(driver) or remaining() <= 0:
+                        break
+
+            if target_reached(driver):
+                break
+
+            # Wait for new content (page growth or more results); stop when nothing more loads
+            try:
+                WebDriverWait(driver, min(SETTLE_TIMEOUT, remaining()), poll_frequency=0.1).until(
+                    lambda d: _page_height(d) > last_height or target_reached(d)
+                )
+            except TimeoutException:
+                break
+            last_height = _page_height(driver)
+
+        if remaining() <= 0:
+            print(f"⏱️  Scroll budget of {time_budget}s used up for {url}\n")
+
+        # Get full page source
+        return driver.page_source
@@ -0,0 +1,258 @@
+import csv
+from datetime import datetime
+import io
+from itertools import chain, islice
+import os
+import tempfile
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment
+from openpyxl.utils import get_column_letter
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+# Export tuning (override through environment variables)
+LOOKAHEAD_ROWS = int(os.environ.get("EXPORT_LOOKAHEAD_ROWS", 500))  # Rows buffered to pick the columns and their widths
+CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 64 * 1024))  # Bytes per streamed chunk
+PARQUET_ROW_GROUP = int(os.environ.get("EXPORT_PARQUET_ROW_GROUP", 1000))  # Rows per Parquet row group
+SPOOL_MAX_BYTES = 8 * 1024 * 1024  # Binary exports are spooled to disk past this size
+MAX_COLUMN_WIDTH = 50
+COLUMN_PADDING = 2
+
+# Columns whose cells are wrapped instead of widening the column
+WRAP_COLUMNS = ("Description",)
+
+# Supported export formats mapped to their content type
+EXPORT_FORMATS = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv; charset=utf-8',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class ExportUnavailable(Exception):
+    """
+    Raised when an export format needs an optional package that is not installed.
+    """
+
+
+def available_formats():
+    """
+    Returns the export formats usable with the installed packages.
+    """
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet' or pa is not None]
+
+def _cell(value):
+    """
+    Flattens a result value for a cell: lists (e.g. Description) become one line per entry.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return "\n".join(str(entry) for entry in value)
+    return value
+
+def _lookahead(rows):
+    """
+    Reads the first LOOKAHEAD_ROWS rows ahead.
+
+    Returns:
+        tuple: (buffered rows, iterator over all rows including the buffered ones)
+    """
+    rows = iter(rows)
+    buffered = list(islice(rows, LOOKAHEAD_ROWS))
+    return buffered, chain(buffered, rows)
+
+def _columns(buffered):
+    """
+    Returns the keys of the buffered rows, in first seen order.
+    """
+    columns = {}
+    for row in buffered:
+        columns.update(dict.fromkeys(row))
+    return list(columns)
+
+def _widths(buffered, columns):
+    """
+    Returns the width of every column: its longest line in the buffered rows (or header), padded and capped.
+    """
+    widths = []
+    for column in columns:
+        longest = len(column)
+        for row in buffered:
+            value = _cell(row.get(column))
+            if value != "":
+                longest = max(longest, max(len(line) for line in str(value).split("\n")))
+        widths.append(min(longest + COLUMN_PADDING, MAX_COLUMN_WIDTH))
+    return widths
+
+def write_xlsx(rows, file, columns=None, title="Results"):
+    """
+    Writes rows to an XLSX workbook in a single pass.
+
+    The workbook is in write-only mode, so rows are streamed to the file instead of being
+    kept as cells. Column widths are computed from the look-ahead rows (write-only
+    sheets need them before the first row), headers are bold and centered and the
+    WRAP_COLUMNS cells are wrapped.
+
+    Args:
+        rows (iterable of dict): The rows, e.g. scraped products.
+        file (str | file): Path or binary file object to write to.
+        columns (list, optional): Column order. Defaults to the keys of the look-ahead rows.
+        title (str): Sheet title.
+
+    Returns:
+        int: The number of rows written.
+    """
+    buffered, rows = _lookahead(rows)
+    columns = list(columns or _columns(buffered))
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    for col_num, width in enumerate(_widths(buffered, columns), 1):
+        ws.column_dimensions[get_column_letter(col_num)].width = width
+
+    header_font = Font(bold=True)
+    header_alignment = Alignment(horizontal="center")
+    wrap_alignment = Alignment(wrap_text=True)
+    wrapped = {i for i, column in enumerate(columns) if column in WRAP_COLUMNS}
+
+    header = []
+    for column in columns:
+        cell = WriteOnlyCell(ws, value=column)
+        cell.font = header_font
+        cell.alignment = header_alignment
+        header.append(cell)
+    ws.append(header)
+
+    count = 0
+    for row in rows:
+        values = [_cell(row.get(column)) for column in columns]
+        for i in wrapped:
+            cell = WriteOnlyCell(ws, value=values[i])
+            cell.alignment = wrap_alignment
+            values[i] = cell
+        ws.append(values)
+        count += 1
+
+    wb.save(file)
+    return count
+
+def write_parquet(rows, file, columns=None):
+    """
+    Writes rows to a Parquet file, PARQUET_ROW_GROUP rows at a time. Every column is a string column.
+
+    Args:
+        rows (iterable of dict): The rows, e.g. scraped products.
+        file (str | file): Path or binary file object to write to.
+        columns (list, optional): Column order. Defaults to the keys of the look-ahead rows.
+
+    Returns:
+        int: The number of rows written.
+
+    Raises:
+        ExportUnavailable: If pyarrow is not installed.
+    """
+    if pa is None:
+        raise ExportUnavailable("Parquet export needs pyarrow (pip install pyarrow)")
+
+    buffered, rows = _lookahead(rows)
+    columns = list(columns or _columns(buffered))
+    schema = pa.schema([(column, pa.string()) for column in columns])
+
+    count = 0
+    with pq.ParquetWriter(file, schema) as writer:
+        while True:
+            batch = list(islice(rows, PARQUET_ROW_GROUP))
+            if not batch:
+                break
+            data = {column: [str(_cell(row.get(column))) for row in batch] for column in columns}
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+            count += len(batch)
+    return count
+
+def iter_csv(rows, columns=None):
+    """
+    Streams rows as CSV, yielding UTF-8 chunks of about CHUNK_SIZE bytes.
+    """
+    buffered, rows = _lookahead(rows)
+    columns = list(columns or _columns(buffered))
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_cell(row.get(column)) for column in columns])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def iter_export(rows, fmt, columns=None):
+    """
+    Streams rows in an export format, as chunks of bytes.
+
+    CSV is produced while the rows are consumed. XLSX and Parquet are zip/footer based,
+    so they are written to a spooled temporary file (on disk past SPOOL_MAX_BYTES) in one
+    pass and then streamed back; the rows themselves are never all held in memory.
+
+    Args:
+        rows (iterable of dict): The rows, e.g. scraped products. May be a generator.
+        fmt (str): One of EXPORT_FORMATS.
+        columns (list, optional): Column order. Defaults to the keys of the look-ahead rows.
+
+    Raises:
+        ExportUnavailable: If the format needs a package that is not installed.
+    """
+    if fmt == 'csv':
+        yield from iter_csv(rows, columns)
+        return
+    if fmt == 'parquet' and pa is None:
+        raise ExportUnavailable("Parquet export needs pyarrow (pip install pyarrow)")
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as file:
+        if fmt == 'xlsx':
+            write_xlsx(rows, file, columns)
+        else:
+            write_parquet(rows, file, columns)
+
+        file.seek(0)
+        while True:
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+def export_filename(prefix, fmt):
+    """
+    Returns a timestamped export file name, e.g. scraped_products_20250301_101500.xlsx.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{prefix}_{timestamp}.{fmt}"
+
+def save_export(rows, prefix, fmt="xlsx"):
+    """
+    📊 Saves scraped data into a timestamped file in the current directory.
+
+    Args:
+        rows (list of dict): List containing product or news details.
+        prefix (str): File name prefix, e.g. 'scraped_products'.
+        fmt (str): One of EXPORT_FORMATS.
+
+    Returns:
+        str: The file name.
+    """
+    file_name = export_filename(prefix, fmt)
+    with open(file_name, "wb") as f:
+        for chunk in iter_export(rows, fmt):
+            f.write(chunk)
+    print(f"📊 Saved {file_name}\n")
+    return file_name
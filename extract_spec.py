@@ -0,0 +1,117 @@
+class Field:
+    """
+    One output field of an extraction spec: which node to match, what to read from it
+    and how to clean the value.
+
+    The first node in document order that matches wins, like BeautifulSoup's find().
+
+    Args:
+        tag (str, optional): Tag name the node must have.
+        cls (str, optional): CSS class the node must carry.
+        attr (str, optional): Attribute to read. The node text is read when omitted.
+        has_attr (str, optional): Attribute the node must carry (e.g. an <a> with a title).
+        parent (str, optional): Tag name the node's parent must have.
+        get (callable, optional): Reads the value from the matched node instead of text/attr.
+        post (callable, optional): Post-processes a non-empty value.
+        default: Value used when nothing matches or the value is empty.
+    """
+    def __init__(self, tag=None, cls=None, attr=None, has_attr=None, parent=None, get=None, post=None, default=""):
+        if not tag and not cls:
+            raise ValueError("A field needs a tag or a class to match")
+
+        self.tag = tag
+        self.cls = cls
+        self.attr = attr
+        self.has_attr = has_attr
+        self.parent = parent
+        self.get = get
+        self.post = post
+        self.default = default
+
+    def accepts(self, node):
+        if self.tag and node.name != self.tag:
+            return False
+        if self.has_attr and not node.get(self.has_attr):
+            return False
+        if self.parent and (node.parent is None or node.parent.name != self.parent):
+            return False
+        return True
+
+    def read(self, node):
+        if self.get:
+            value = self.get(node)
+        elif self.attr:
+            value = node.get(self.attr)
+        else:
+            value = node.get_text()
+
+        if value is None or value == "":
+            return self.default
+        return self.post(value) if self.post else value
+
+
+class ItemSpec:
+    """
+    Declarative description of one result item (field name -> Field), compiled so a
+    single walk over the item's subtree fills every field.
+
+    Fields are indexed by class and by tag, so each node costs a couple of dict lookups
+    instead of one find() call per field, and the walk stops once every field is filled.
+    """
+    def __init__(self, **fields):
+        self.fields = fields
+        self._by_class = {}
+        self._by_tag = {}
+
+        for name, field in fields.items():
+            if field.cls:
+                self._by_class.setdefault(field.cls, []).append((name, field))
+            else:
+                self._by_tag.setdefault(field.tag, []).append((name, field))
+
+    def extract(self, item):
+        """
+        Reads every field of the spec from the item's subtree.
+
+        Args:
+            item (Tag): The result item node.
+
+        Returns:
+            dict: Field name -> value, with the field default for anything not found.
+        """
+        values = {}
+        remaining = len(self.fields)
+
+        # Whitespace and other text nodes between items have nothing to walk
+        descendants = getattr(item, "descendants", None)
+        if descendants is not None and getattr(item, "name", None) is not None:
+            for node in descendants:
+                if node.name is None:
+                    continue
+
+                candidates = self._by_tag.get(node.name, ())
+                classes = node.get("class")
+                if classes:
+                    for cls in classes:
+                        if cls in self._by_class:
+                            candidates = [*candidates, *self._by_class[cls]]
+
+                for name, field in candidates:
+                    if name not in values and field.accepts(node):
+                        values[name] = field.read(node)
+                        remaining -= 1
+
+                if not remaining:
+                    break
+
+        for name, field in self.fields.items():
+            if name not in values:
+                values[name] = field.default
+        return values
+
+
+def text_of(node):
+    """
+    Returns the text of an optional node, or "" if it is missing.
+    """
+    return node.get_text() if node is not None else ""
@@ -0,0 +1,208 @@
+import atexit
+import numpy as np
+import os
+import threading
+
+
+# Face gallery tuning (override through environment variables)
+GALLERY_PATH = os.environ.get("FACE_GALLERY_PATH", os.path.join("temp_files", "face_gallery.npz"))
+DEFAULT_TOP_K = int(os.environ.get("FACE_GALLERY_TOP_K", 5))  # Matches returned by identify() unless asked otherwise
+MAX_TOP_K = 100
+INITIAL_CAPACITY = 1024  # Rows allocated up front, doubled whenever the gallery is full
+SAVE_INTERVAL = 5  # Min seconds between two saves (made by a background thread), the gallery is also saved at exit
+
+ENCODING_SIZE = 128
+
+
+class FaceGallery:
+    """
+    1:N face identification over enrolled 128-d encodings.
+
+    Encodings are rows of one contiguous float32 matrix, next to their squared norms, so a
+    search is a single matrix-vector product (BLAS) giving the squared distance
+    |g|^2 - 2 g.q + |q|^2 of every identity, an argpartition for the top k and an exact
+    distance for those k only, with no Python loop over the gallery. Removing an identity moves
+    the last row into its place, so the matrix stays dense.
+
+    Changes only flag the gallery dirty; a background thread writes the snapshot at most
+    every SAVE_INTERVAL seconds, so enroll() and remove() never wait for the disk.
+    """
+    def __init__(self, path=GALLERY_PATH):
+        self.path = path
+        self._matrix = np.zeros((INITIAL_CAPACITY, ENCODING_SIZE), dtype=np.float32)
+        self._norms = np.zeros(INITIAL_CAPACITY, dtype=np.float32)  # Squared norm of every row
+        self._ids = []  # row -> identity
+        self._rows = {}  # identity -> row
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # One snapshot written at a time (saver thread and exit)
+        self._dirty = False
+        self._changed = threading.Event()
+        self._closed = threading.Event()
+        self._stats = {"enrolled": 0, "removed": 0, "searches": 0, "saves": 0}
+        self._load()
+
+        self._saver = threading.Thread(target=self._save_loop, name="face-gallery-saver", daemon=True)
+        self._saver.start()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _load(self):
+        try:
+            with np.load(self.path) as data:
+                ids, matrix = data["ids"].tolist(), data["encodings"].astype(np.float32)
+        except (OSError, KeyError, ValueError):
+            return
+
+        for identity, encoding in zip(ids, matrix):
+            self._put(identity, encoding)
+        self._dirty = False
+
+    def _put(self, identity, encoding):
+        # Called with the lock held (or before the gallery is shared)
+        row = self._rows.get(identity)
+        if row is None:
+            row = len(self._ids)
+            if row == len(self._matrix):
+                self._grow()
+            self._ids.append(identity)
+            self._rows[identity] = row
+
+        self._matrix[row] = encoding
+        self._norms[row] = np.dot(self._matrix[row], self._matrix[row])
+        self._dirty = True
+
+    def _grow(self):
+        capacity = len(self._matrix) * 2
+        matrix = np.zeros((capacity, ENCODING_SIZE), dtype=np.float32)
+        norms = np.zeros(capacity, dtype=np.float32)
+        matrix[:len(self._ids)] = self._matrix[:len(self._ids)]
+        norms[:len(self._ids)] = self._norms[:len(self._ids)]
+        self._matrix, self._norms = matrix, norms
+
+    def enroll(self, identity, encoding):
+        """
+        Adds an identity, or replaces its encoding if it is already enrolled.
+
+        Returns:
+            bool: True if an existing encoding was replaced.
+        """
+        encoding = np.asarray(encoding, dtype=np.float32).reshape(ENCODING_SIZE)
+        with self._lock:
+            replaced = identity in self._rows
+            self._put(identity, encoding)
+            self._stats["enrolled"] += 1
+        self._changed.set()
+        return replaced
+
+    def remove(self, identity):
+        """
+        Removes an identity. Returns False if it was not enrolled.
+        """
+        with self._lock:
+            row = self._rows.pop(identity, None)
+            if row is None:
+                return False
+
+            last = len(self._ids) - 1
+            if row != last:
+                # Keep the matrix dense: the last identity takes the freed row
+                moved = self._ids[last]
+                self._matrix[row] = self._matrix[last]
+                self._norms[row] = self._norms[last]
+                self._ids[row] = moved
+                self._rows[moved] = row
+            self._ids.pop()
+            self._stats["removed"] += 1
+            self._dirty = True
+        self._changed.set()
+        return True
+
+    def identify(self, encoding, k=DEFAULT_TOP_K):
+        """
+        Finds the enrolled identities closest to a probe encoding.
+
+        Args:
+            encoding (array-like): 128-d encoding of the probe face.
+            k (int): Number of matches returned.
+
+        Returns:
+            list: Up to k (identity, distance) pairs, closest first.
+        """
+        probe = np.asarray(encoding, dtype=np.float32).reshape(ENCODING_SIZE)
+        with self._lock:
+            n = len(self._ids)
+            if n == 0:
+                return []
+            self._stats["searches"] += 1
+
+            # |g|^2 - 2 g.q ranks like the squared distance (|q|^2 is the same for every row), in place
+            gallery = self._matrix[:n]
+            scores = gallery @ probe
+            scores *= -2
+            scores += self._norms[:n]
+
+            k = min(k, n)
+            top = np.argpartition(scores, k - 1)[:k] if k < n else np.arange(n)
+
+            # Exact distances for the k candidates, the expanded form loses precision in float32
+            distances = np.linalg.norm(gallery[top].astype(np.float64) - probe, axis=1)
+            order = np.argsort(distances)
+            return [(self._ids[top[i]], float(distances[i])) for i in order]
+
+    def _save_loop(self):
+        while not self._closed.is_set():
+            self._changed.wait()
+            self._changed.clear()
+            self.save()
+            # Changes made meanwhile are saved together once the interval is over
+            self._closed.wait(SAVE_INTERVAL)
+
+    def save(self):
+        """
+        Writes the gallery to disk (atomically) if it changed.
+        """
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                ids = np.array(self._ids, dtype=str)
+                encodings = self._matrix[:len(self._ids)].copy()
+                self._dirty = False
+
+            tmp_path = self.path + ".tmp.npz"
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                np.savez(tmp_path, ids=ids, encodings=encodings)
+                os.replace(tmp_path, self.path)
+            except OSError as err:
+                print(f"❌ Error while saving the face gallery: {err}\n")
+                with self._lock:
+                    self._dirty = True  # Retried on the next change or at exit
+                return
+
+            with self._lock:
+                self._stats["saves"] += 1
+
+    def close(self):
+        """
+        Stops the background saver and writes the pending changes.
+        """
+        self._closed.set()
+        self._changed.set()
+        self._saver.join(timeout=SAVE_INTERVAL + 5)
+        self.save()
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "identities": len(self._ids),
+                "capacity": len(self._matrix),
+                "bytes": self._matrix.nbytes + self._norms.nbytes,
+            }
+
+
+# Shared gallery of enrolled faces
+gallery = FaceGallery()
+atexit.register(gallery.close)
@@ -0,0 +1,244 @@
+import cv2
+import face_recognition
+import hashlib
+import math
+import numpy as np
+import os
+from result_cache import TTLCache
+import uuid
+
+
+# Face detection tuning (override through environment variables)
+PROBE_MAX_SIDE = int(os.environ.get("FACE_PROBE_MAX_SIDE", 320))  # Longest side of the copy orientations are probed on
+DETECT_MAX_SIDE = int(os.environ.get("FACE_DETECT_MAX_SIDE", 1024))  # Larger images are downscaled to this longest side before detection
+MAX_UPSAMPLE = int(os.environ.get("FACE_MAX_UPSAMPLE", 2))  # Upper bound of the HOG upsampling picked per image
+MIN_FACE_SIDE = 160  # Face side (pixels) from which the HOG detector reliably finds faces without upsampling
+PROBE_UPSAMPLE = int(os.environ.get("FACE_PROBE_UPSAMPLE", 0))  # HOG upsampling of the probe copy, 0 finds faces of about 1/4 of its side and up
+MATCH_TOLERANCE = float(os.environ.get("FACE_MATCH_TOLERANCE", 0.6))  # Max encoding distance of two faces of the same person
+REFERENCE_TTL = int(os.environ.get("FACE_REFERENCE_TTL", 1800))  # Seconds a reference encoding (and its token) is kept
+REFERENCE_CACHE_MAX_BYTES = int(os.environ.get("FACE_REFERENCE_CACHE_MAX_BYTES", 8 * 1024 * 1024))  # About 1 KB per reference
+
+
+
+class FaceError(Exception):
+    """
+    Raised when an image cannot be used for a comparison: undecodable, or not exactly one face.
+    """
+
+
+# Orientations probed in order (counterclockwise degrees, like the old rotate-and-retry loop),
+# mapped to the lossless cv2.rotate transpose producing them
+ORIENTATIONS = {
+    0: None,
+    90: cv2.ROTATE_90_COUNTERCLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_CLOCKWISE,
+}
+
+
+def image_normalize(file):
+    """
+    Decodes an uploaded image file into a BGR array.
+
+    cv2.IMREAD_COLOR applies the EXIF orientation tag, so phone photos saved sideways
+    with an orientation flag already come out upright.
+
+    Returns:
+        numpy.ndarray | None: The image, or None if it cannot be decoded.
+    """
+    # Convert file to a NumPy array
+    file_bytes = np.frombuffer(file.read(), np.uint8)
+
+    # Decode image using OpenCV
+    return cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
+
+def rotate_image(image, angle):
+    """
+    Rotates the image by a multiple of 90 degrees (counterclockwise) without cropping or resampling.
+    """
+    code = ORIENTATIONS[angle % 360]
+    return image if code is None else cv2.rotate(image, code)
+
+def downscale(image, max_side):
+    """
+    Shrinks the image so its longest side is at most max_side.
+
+    Returns:
+        tuple: (image, scale applied)
+    """
+    h, w = image.shape[:2]
+    scale = max_side / max(h, w)
+    if scale >= 1:
+        return image, 1.0
+    return cv2.resize(image, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA), scale
+
+def probe_orientation(image):
+    """
+    Finds the orientation faces are upright in, on a downscaled copy of the image.
+
+    Returns:
+        tuple: (angle of the first orientation with a face, side in pixels of the smallest
+        face found there, at the image's own scale), or (None, None) if none has one.
+    """
+    small, scale = downscale(image, PROBE_MAX_SIDE)
+    for angle in ORIENTATIONS:
+        locations = face_recognition.face_locations(rotate_image(small, angle), PROBE_UPSAMPLE)
+        if locations:
+            return angle, min(bottom - top for top, _, bottom, _ in locations) / scale
+    return None, None
+
+def choose_upsample(face_side, image_side):
+    """
+    Picks the HOG upsampling for a detection image.
+
+    With the face size known from the probe, it is the least upsampling that brings the
+    face to MIN_FACE_SIDE. Otherwise any face is too small for the probe, so the image is
+    upsampled once, or twice when that still keeps it within DETECT_MAX_SIDE.
+    """
+    if face_side:
+        upsample = math.ceil(math.log2(MIN_FACE_SIDE / face_side)) if face_side < MIN_FACE_SIDE else 0
+    else:
+        upsample = 2 if image_side * 4 <= DETECT_MAX_SIDE else 1
+    return max(0, min(upsample, MAX_UPSAMPLE))
+
+def scale_locations(locations, scale, shape):
+    """
+    Maps (top, right, bottom, left) boxes found on an image resized by `scale` back to the original image.
+    """
+    h, w = shape[:2]
+    return [
+        (max(round(top / scale), 0), min(round(right / scale), w), min(round(bottom / scale), h), max(round(left / scale), 0))
+        for top, right, bottom, left in locations
+    ]
+
+def detect_faces(img):
+    """
+    Detects faces in any of the four orientations with a single detection pass.
+
+    The orientation is probed on a copy downscaled to PROBE_MAX_SIDE, where a HOG pass
+    costs a fraction of a full one. Faces are then detected once in that orientation, on the
+    image downscaled to DETECT_MAX_SIDE, so the cost no longer grows with the upload resolution.
+    Upsampling follows the face size seen by the probe and the boxes are mapped back to
+    the full-resolution image, ready for encoding.
+
+    When the probe finds nothing (no face, or faces too small for the copy) the upright
+    image is tried first, then the other orientations, all at detection scale, so small
+    rotated faces are still found. Only images without any face pay for all four passes.
+
+    Returns:
+        tuple: (full-resolution image rotated upright, face locations in it, angle it was rotated by)
+    """
+    angle, face_side = probe_orientation(img)
+    detect_img, scale = downscale(img, DETECT_MAX_SIDE)
+    upsample = choose_upsample(face_side and face_side * scale, max(detect_img.shape[:2]))
+
+    for candidate in ORIENTATIONS if angle is None else (angle,):
+        locations = face_recognition.face_locations(rotate_image(detect_img, candidate), upsample)
+        if locations:
+            break
+    else:
+        candidate = angle or 0
+
+    upright = rotate_image(img, candidate)
+    return upright, scale_locations(locations, scale, upright.shape), candidate
+
+def fetch_face_locations(img):
+    """
+    Detect faces in the given image.
+    """
+    return detect_faces(img)[1]
+
+def encode_faces(img):
+    """
+    Detects, aligns and encodes the faces of an image in a single flow.
+
+    The encoder is given the upright image and the boxes detect_faces() found in it, so
+    faces are never detected a second time and rotated faces are encoded upright. The
+    image is converted to RGB, the channel order the encoding model expects.
+
+    Returns:
+        tuple: (face locations in the upright image, their 128-d encodings)
+    """
+    upright, locations, _ = detect_faces(img)
+    if not locations:
+        return [], []
+    rgb = cv2.cvtColor(upright, cv2.COLOR_BGR2RGB)
+    return locations, face_recognition.face_encodings(rgb, known_face_locations=locations)
+
+def face_distance(encoding1, encoding2):
+    """
+    Returns the euclidean distance of two face encodings, lower is more similar.
+    """
+    return float(np.linalg.norm(np.asarray(encoding1) - np.asarray(encoding2)))
+
+def single_face_encoding(img, label):
+    """
+    Returns the encoding of the only face of an image.
+
+    Args:
+        img (numpy.ndarray): Decoded image.
+        label (str): What the image is, for the error message (e.g. 'live frame').
+
+    Raises:
+        FaceError: If the image does not contain exactly one face.
+    """
+    locations, encodings = encode_faces(img)
+    if len(locations) != 1 or not encodings:
+        raise FaceError(f'The {label} must contain exactly one face')
+    return encodings[0]
+
+
+# Encodings of reference images, keyed by content hash ('sha256:...') or enroll token ('token:...')
+reference_cache = TTLCache(max_bytes=REFERENCE_CACHE_MAX_BYTES)
+
+def reference_encoding(data):
+    """
+    Returns the face encoding of a stored reference image.
+
+    The encoding is cached by the hash of the image content, so a client posting the same
+    reference with every live frame only pays for decoding, detection and encoding once
+    per REFERENCE_TTL.
+
+    Args:
+        data (bytes): The uploaded image.
+
+    Raises:
+        FaceError: If the image cannot be decoded or does not contain exactly one face.
+    """
+    key = "sha256:" + hashlib.sha256(data).hexdigest()
+    cached = reference_cache.get(key)
+    if cached is not None:
+        return cached[0]
+
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise FaceError('Invalid image')
+
+    encoding = single_face_encoding(img, 'stored image')
+    reference_cache.set(key, encoding, REFERENCE_TTL, encoding.nbytes)
+    return encoding
+
+def enroll_reference(data):
+    """
+    Encodes a reference image once and returns a token standing for it in later comparisons.
+
+    Raises:
+        FaceError: If the image cannot be decoded or does not contain exactly one face.
+    """
+    encoding = reference_encoding(data)
+    token = uuid.uuid4().hex
+    reference_cache.set("token:" + token, encoding, REFERENCE_TTL, encoding.nbytes)
+    return token
+
+def token_encoding(token):
+    """
+    Returns the encoding an enroll token stands for, or None if it is unknown or expired.
+    """
+    cached = reference_cache.get("token:" + token)
+    return cached[0] if cached is not None else None
+
+def revoke_reference(token):
+    """
+    Drops an enroll token. Returns False if it was unknown.
+    """
+    return reference_cache.invalidate("token:" + token)
@@ -1,91 +1,92 @@
-from bs4 import BeautifulSoup
-from datetime import datetime
-import os
-import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, Alignment
-import random
-import requests
-import uuid
-
-
-def scrape(s_url, url, products_scrape):
+from async_engine import fetch, run_in_thread, run_sync, FetchError, FetchTimeout
+from extract_spec import Field, ItemSpec
+from scraper_utils import parse_html, dump_debug_page, collect_pages, DEFAULT_LIMIT
+
+
+# Scraper name used for debug dumps
+SOURCE = "flipkart"
+
+# Elements holding the search results. Pages are parsed whole: restricting the parse to
+# these containers measured no faster on Flipkart pages, the results are most of the page
+RESULTS_CONTAINER_CLASS = "gdgoEp"
+
+# Fields of one result, read in a single walk over its subtree.
+# Vertical layout: one product per row, with description and rating
+VERTICAL_PRODUCT_SPEC = ItemSpec(
+    Name=Field(cls="KzDlHZ"),
+    Image=Field(cls="DByuf4", attr="src"),
+    Price=Field(cls="Nx9bqj"),
+    Rating=Field(cls="XQDdHH"),
+    Description=Field(cls="_6NESgJ", get=lambda desc: [li.get_text() for li in desc.find_all("li")]),
+    Link=Field(tag="a", attr="href"),
+)
+
+# Grid layout: several products per row, the name is only carried by a link title
+GRID_PRODUCT_SPEC = ItemSpec(
+    Name=Field(tag="a", has_attr="title", attr="title"),
+    Image=Field(tag="img", attr="src"),
+    Price=Field(cls="Nx9bqj"),
+    Link=Field(tag="a", attr="href"),
+)
+
+async def scrape_async(s_url, url, products_scrape=None, on_item=None):
     """
-    Scrapes product data from the given search URL and saves the page locally.
+    Scrapes product data from the given search URL on the async engine.
 
     Args:
         s_url (str): The search URL to scrape.
         url (str): Main domain URL.
-        products_scrape (int, optional): Number of products to scrape.
+        products_scrape (int, optional): Number of products to scrape, every product of the page if None.
+        on_item (callable, optional): Called with each product as soon as it is extracted.
 
     Returns:
-        bool: True if scraping is successful, False otherwise.
+        list | int | None: Scraped products, 0 if none were found, None on failure.
     """
-    print(f"🔍 Scraping {products_scrape} {'products' if products_scrape > 1 else 'product'} from {s_url}...\n")
+    print(f"🔍 Scraping {products_scrape or 'all'} {'product' if products_scrape == 1 else 'products'} from {s_url}...\n")
 
     try:
-        # Generate a unique filename for storing the response
-        file_name = f"{uuid.uuid4()}.html"
-        file_path = os.path.join("temp_files", file_name)
-
-        # Send GET request to the URL
-        response = requests.get(s_url, timeout=10)
-        response.raise_for_status()  # Raise exception for HTTP errors
-
-        if response.status_code == 200:
-            # Save response content to a temporary file
-            with open(file_path, "wb") as f:
-                f.write(response.content)
-
-            # Call function to extract product details
-            result = scrape_products(file_path, products_scrape, url)
-            return result
-        else:
-            print(f"❌ [ERROR] Failed to scrape {s_url}, Status Code: {response.status_code}\n")
-            return None
-    except requests.ConnectionError:
-        print(f"❌ [ERROR] Connection Error: Failed to connect to {s_url}\n")
-    except requests.ConnectTimeout:
+        # Send GET request to the URL (under the domain's governor), through the on-disk response cache
+        response = await fetch(s_url, cache=True)
+
+        # Extract product details off the event loop, straight from the response bytes
+        result = await run_in_thread(scrape_products, response.content, products_scrape, url, on_item)
+        if not result:
+            dump_debug_page(response.content, SOURCE)
+        return result
+    except FetchTimeout:
         print(f"⏳ [ERROR] Timeout Error: {s_url} took too long to respond\n")
-    except requests.HTTPError as http_err:
-        print(f"❌ [ERROR] HTTP Error: {http_err}\n")
-    except requests.RequestException as req_err:
-        print(f"❌ [ERROR] Request Error: {req_err}\n")
+    except FetchError as fetch_err:
+        print(f"❌ [ERROR] Request Error: {fetch_err}\n")
     except Exception as err:
         print(f"❌ [ERROR] Unexpected Error: {err}\n")
     return None
 
-def scrape_products(file_path, products_scrape, url):
+def scrape(s_url, url, products_scrape):
     """
-    Extracts product information from the stored HTML file and saves it in Excel.
+    Sync wrapper around scrape_async.
+    """
+    return run_sync(scrape_async(s_url, url, products_scrape))
+
+def scrape_products(content, products_scrape, url, on_item=None):
+    """
+    Extracts product information from the page content.
 
     Args:
-        file_path (str): Path to the stored HTML file.
-        products_scrape (int): Number of products to extract.
+        content (bytes | str): Raw HTML of the search results page.
+        products_scrape (int | None): Number of products to extract, all of them if None.
+        url (str): Main domain URL.
+        on_item (callable, optional): Called with each product as soon as it is extracted.
     """
     # Define HTML class names for product attributes
-    products_container_class = "gdgoEp"
     products_class = "cPHDOP"
-    # Vertical prodcuts rows
-    products_name_class = "KzDlHZ"
-    products_price_class = "Nx9bqj"
-    products_image_class = "DByuf4"
-    products_rating_class = "XQDdHH"
-    products_desc_class = "_6NESgJ"
 
-    # Read the saved HTML file
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    soup = BeautifulSoup(content, "html.parser")
+    soup = parse_html(content)
 
+    scrapped_products = []
     try:
         # Locate the product container
-        products_container = soup.find_all(class_=products_container_class)
+        products_container = soup.find_all(class_=RESULTS_CONTAINER_CLASS)
         if not products_container:
-            # Clean up the temporary file after scraping
-            clean(file_path)
             return 0
 
         products_container = products_container[-1]
@@ -106,56 +107,35 @@ def scrape_products(file_path, products_scrape, url):
 
         horizontel_row_products = []
         if not is_vertical:
-            # Classes for horizontel prodcuts rows
-            products_price_class = "Nx9bqj"
             for prod in products:
                 horizontel_row_products.extend(list(prod.find(class_="_75nlfW").children))
 
             products = horizontel_row_products[:products_scrape]
 
-        scrapped_products = []
+        spec = VERTICAL_PRODUCT_SPEC if is_vertical else GRID_PRODUCT_SPEC
 
         # Extract details for each product
         for i, product in enumerate(products):
-            product_link = product.find("a").attrs.get("href") if product.find("a") else ""
-            if not is_vertical:
-                a_tags = product.find_all("a")
-                img_tags = product.find_all("img")
-                product_image = img_tags[0].attrs.get("src")
-                for a_tag in a_tags:
-                    title = a_tag.attrs.get("title")
-                    if title:
-                        product_name = title
-                        break
-            else:
-                product_name = product.find(class_=products_name_class).text if product.find(class_=products_name_class) else ""
-                product_image = product.find(class_=products_image_class).attrs.get("src") if product.find(class_=products_image_class) else ""
-
-            product_price = product.find(class_=products_price_class).text if product.find(class_=products_price_class) else ""
-
-            if (product_name == "" and product_price == "" and product_link == "") or product_link == "":
+            fields = spec.extract(product)
+
+            if fields["Link"] == "":
                 continue
 
             product_data = {
                 "SNo": i + 1,
-                "Name": product_name,
-                "Image": product_image,
-                "Price": product_price,
-                "Link": url + product_link,
+                "Name": fields["Name"],
+                "Image": fields["Image"],
+                "Price": fields["Price"],
+                "Link": url + fields["Link"],
             }
 
             if is_vertical:  # if single product eixts in a row, get desc and rating
-                # Extract description list
-                product_desc_container = product.find(class_=products_desc_class)
-                product_desc_lis = product_desc_container.find_all("li")
-                product_desc = [li.text for li in product_desc_lis]
-
-                product_rating = product.find(class_=products_rating_class).text if product.find(class_=products_rating_class) else ""
-
-                product_data["Description"] = product_desc
-                product_data["Rating"] = product_rating
+                product_data["Description"] = fields["Description"] or []
+                product_data["Rating"] = fields["Rating"]
 
             scrapped_products.append(product_data)
+            if on_item:
+                on_item(product_data)
     except AttributeError as attr_err:
         print(f"❌ Attribute Error: {attr_err}\n")
         if not scrapped_products:
@@ -164,118 +144,43 @@ def scrape_products(file_path, products_scrape, url):
         print(f"❌ Unexpected Error: {err}\n")
         return None
 
-    # Clean up the temporary file after scraping
-    clean(file_path)
-
     # Save extracted products to an Excel file
-    # save_to_excel(scrapped_products)
-    print(f"✅ {len(scrapped_products)} {'products' if products_scrape > 1 else 'product'} scrapped successfully.\n")
+    # save_export(scrapped_products, "scraped_products")
+    print(f"✅ {len(scrapped_products)} {'product' if len(scrapped_products) == 1 else 'products'} scrapped successfully.\n")
     return scrapped_products
 
-def save_to_excel(products):
+async def start_flipkart_scrapper_async(search_key, limit=DEFAULT_LIMIT, offset=0, on_item=None):
     """
-    📊 Saves the scraped product data into an Excel file with improved formatting.
-
-    Features:
-    ✅ Auto-adjusts column widths based on content.
-    ✅ Bold headers for better readability.
-    ✅ Center-aligns the headers.
-    ✅ Description column wrapped to avoid excessive width.
+    Start scrapping on the async engine
 
     Args:
-        products (list of dict): List containing product details.
+        search_key (str): The keyword to search for.
+        limit (int): Number of products to return.
+        offset (int): Number of products to skip.
+        on_item (callable, optional): Called with each product of the window as soon as it is extracted.
     """
-    # Convert 'Description' list to a formatted string
-    for product in products:
-        if "Description" not in product.keys():
-            break
-        product["Description"] = "\n".join(product["Description"])
-
-    df = pd.DataFrame(products)
-
-    # Generate a timestamped filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_name = f"scraped_products_{timestamp}.xlsx"
-
-    # Save the DataFrame to Excel
-    df.to_excel(file_name, index=False, engine="openpyxl")
-
-    # Load the workbook to format it
-    wb = load_workbook(file_name)
-    ws = wb.active
-
-    # Apply formatting
-    for col_num, col in enumerate(ws.columns, 1):
-        max_length = 0
-        column_letter = get_column_letter(col_num)
-
-        # Determine max content width
-        for cell in col:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-
-        adjusted_width = max_length + 2  # Extra padding
-        ws.column_dimensions[column_letter].width = min(adjusted_width, 50)  # Limit max width
-
-    # Style headers
-    header_font = Font(bold=True)
-    for cell in ws[1]:  
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center")
-
-    # Wrap text in the "Description" column
-    for row in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=ws.max_column, max_col=ws.max_column):
-        for cell in row:
-            cell.alignment = Alignment(wrap_text=True)
-
-    # Save the formatted file
-    wb.save(file_name)
-    print(f"📁 Data successfully saved and formatted in {file_name} ✅\n")
-
-def clean(file_path):
-    """
-    🗑️ Cleans up temporary files after scraping.
-
-    Args:
-        file_path (str): The path of the temporary file to delete.
-    """
-    try:
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            print(f"🧹 Successfully deleted temporary file: {file_path}\n")
-        else:
-            print(f"⚠️  File not found: {file_path}\n")
-    except Exception as e:
-        print(f"❌ Error while deleting file {file_path}: {e}\n")
-
-def start_flipkart_scrapper(search_key):
-    """
-    Start scrapping
-    """
-    # Ensure the 'temp_files' directory exists
-    os.makedirs("temp_files", exist_ok=True)
-
-    # Generate a random number between 1 - 50
-    products_scrape = random.randint(1, 50)
-
     url = "https://www.flipkart.com"
 
     # Construct search URL
     search_url = f"{url}/search?q={search_key}"
 
-    # Call the scrape function with the provided number of products
-    result = scrape(search_url, url, products_scrape)
+    async def scrape_page(page, wanted, on_page_item):
+        # Take the whole page, collect_pages trims it to the requested window
+        return await scrape_async(f"{search_url}&page={page}", url, None, on_page_item)
+
+    # Fetch the result pages covering the requested window
+    result = await collect_pages(scrape_page, limit, offset, on_item=on_item)
 
     return result
 
+def start_flipkart_scrapper(search_key, limit=DEFAULT_LIMIT, offset=0):
+    """
+    Start scrapping
+    """
+    return run_sync(start_flipkart_scrapper_async(search_key, limit=limit, offset=offset))
+
 
 if __name__ == "__main__":
-    # Ensure the 'temp_files' directory exists
-    os.makedirs("temp_files", exist_ok=True)
-
     url = "https://www.flipkart.com"
 
     # Get search query from user
@@ -1,158 +1,223 @@
-from bs4 import BeautifulSoup
+from async_engine import fetch, run_blocking, run_in_thread, run_sync, FetchError
+from browser_pool import get_html_selenium
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from extract_spec import Field, ItemSpec
+from functools import partial
 import os
-import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, Alignment
-import random
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-import time
-import uuid
-from webdriver_manager.chrome import ChromeDriverManager
-
-
-def get_html_selenium(url, scroll_pause=0.5, scroll_step=300):
+from scraper_utils import OrderedEmitter, parse_html, dump_debug_page, DEFAULT_LIMIT
+from urllib.parse import quote_plus, urlsplit
+import xml.etree.ElementTree as ET
+
+
+# Scraper name used for debug dumps
+SOURCE = "g-news"
+
+# Element holding the rendered news results. Pages are parsed whole: restricting the
+# parse to this container measured no faster on Google News pages
+RESULTS_CONTAINER_CLASS = "D9SJMe"
+
+# News backends: 'rss' (search feed, no browser), 'selenium' (rendered page) or
+# 'auto' (feed first, Selenium only when the feed returns too few items)
+BACKENDS = ("auto", "rss", "selenium")
+DEFAULT_BACKEND = os.environ.get("G_NEWS_BACKEND", "auto")
+
+RSS_SEARCH_URL = "https://news.google.com/rss/search?q={}&hl=en-IN&gl=IN&ceid=IN:en"
+FAVICON_URL = "https://www.google.com/s2/favicons?domain={}&sz=64"
+RSS_CHUNK_SIZE = 64 * 1024
+
+# Fields of one rendered news card, read in a single walk over its subtree
+NEWS_SPEC = ItemSpec(
+    Provider=Field(cls="zC7z7b", attr="src"),
+    Title=Field(cls="JtKRv"),
+    Image=Field(cls="Quavad", attr="src"),
+    Time=Field(cls="hvbAAd", attr="datetime", post=lambda time: datetime.strptime(time, "%Y-%m-%dT%H:%M:%SZ").strftime("%d %b %Y")),
+    Link=Field(cls="WwrzSb", attr="href"),
+)
+
+def _rss_item_to_news(item, sno):
     """
-    Fetches the full HTML source of a webpage using headless Selenium with smooth scrolling.
+    Maps a feed <item> element to the same record shape as scrape_newss.
+    """
+    news_link = (item.findtext("link") or "").strip()
+    news_title = (item.findtext("title") or "").strip()
+    if not news_link:
+        return None
+
+    source = item.find("source")
+    source_name = (source.text or "").strip() if source is not None else ""
+    source_url = source.get("url", "") if source is not None else ""
+
+    # Feed titles end with ' - <publisher>'
+    if source_name and news_title.endswith(f" - {source_name}"):
+        news_title = news_title[:-len(source_name) - 3]
+
+    news_time = ""
+    pub_date = item.findtext("pubDate")
+    if pub_date:
+        try:
+            news_time = parsedate_to_datetime(pub_date).strftime("%d %b %Y")
+        except (TypeError, ValueError):
+            pass
+
+    return {
+        "SNo": sno,
+        "Provider": FAVICON_URL.format(urlsplit(source_url).hostname) if source_url else "",
+        "Title": news_title,
+        "Image": "",  # The feed does not carry article thumbnails
+        "Time": news_time,
+        "Link": news_link,
+    }
+
+def scrape_rss_newss(content, news_scrape, on_item=None):
+    """
+    Extracts news items from a Google News search feed with a streaming XML parser.
+
+    The feed is fed to the parser in chunks and every <item> is released as soon as it
+    is mapped, so parsing stops early once news_scrape items are collected.
 
     Args:
-        url (str): The target URL.
-        scroll_pause (float): Time to pause (in seconds) between scrolls.
-        scroll_step (int): Number of pixels to scroll per step.
+        content (bytes): Raw RSS feed.
+        news_scrape (int): Number of newss to extract.
+        on_item (callable, optional): Called with each news as soon as it is extracted.
+
+    Returns:
+        list | int | None: Scraped newss, 0 if the feed is empty, None if it could not be parsed.
     """
-    options = Options()
-    options.add_argument("--headless")  # Run in background
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36")
-
-    # Setup WebDriver
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    
-    # Open URL
-    driver.get(url)
-    
-    # Wait for JavaScript content to load (Optional)
-    driver.implicitly_wait(5)
-
-    # Get total page height
-    last_height = driver.execute_script("return document.body.scrollHeight")
-
-    while True:
-        for _ in range(0, last_height, scroll_step):
-            driver.execute_script(f"window.scrollBy(0, {scroll_step});")
-            time.sleep(scroll_pause)  # Pause for data to load
-
-        # Allow time for new content to load
-        time.sleep(1)
-
-        # Calculate new scroll height after scrolling
-        new_height = driver.execute_script("return document.body.scrollHeight")
-
-        # Break if no new content is loaded
-        if new_height == last_height:
-            break
-        last_height = new_height
-
-    # Get full page source
-    page_source = driver.page_source
-    
-    # Close driver
-    driver.quit()
-    
-    return page_source
+    parser = ET.XMLPullParser(events=("end",))
+    scrapped_newss = []
 
-def scrape(s_url, url, news_scrape):
+    try:
+        for start in range(0, len(content), RSS_CHUNK_SIZE):
+            parser.feed(content[start:start + RSS_CHUNK_SIZE])
+
+            for _, element in parser.read_events():
+                if element.tag != "item":
+                    continue
+
+                news_data = _rss_item_to_news(element, len(scrapped_newss) + 1)
+                element.clear()
+                if news_data:
+                    scrapped_newss.append(news_data)
+                    if on_item:
+                        on_item(news_data)
+
+                if len(scrapped_newss) >= news_scrape:
+                    return scrapped_newss
+        parser.close()
+    except ET.ParseError as parse_err:
+        print(f"❌ Feed Parse Error: {parse_err}\n")
+        if not scrapped_newss:
+            return None
+
+    return scrapped_newss or 0
+
+async def scrape_rss_async(search_key, news_scrape, on_item=None):
+    """
+    Scrapes news from the Google News search feed over plain HTTP.
+
+    Returns:
+        list | int | None: Scraped newss, 0 if none were found, None on failure.
+    """
+    feed_url = RSS_SEARCH_URL.format(quote_plus(search_key))
+    print(f"📰 Reading {news_scrape} {'newss' if news_scrape > 1 else 'news'} from {feed_url}...\n")
+
+    try:
+        response = await fetch(feed_url)
+        result = await run_in_thread(scrape_rss_newss, response.content, news_scrape, on_item)
+        if not result:
+            dump_debug_page(response.content, f"{SOURCE}-rss")
+        return result
+    except FetchError as fetch_err:
+        print(f"❌ [ERROR] Request Error: {fetch_err}\n")
+    except Exception as err:
+        print(f"❌ [ERROR] Unexpected Error: {err}\n")
+    return None
+
+async def scrape_async(s_url, url, news_scrape, on_item=None):
     """
-    Scrapes news data from the given search URL and saves the page locally.
+    Scrapes news data from the given search URL on the async engine.
 
     Args:
         s_url (str): The search URL to scrape.
         url (str): Main domain URL.
         news_scrape (int, optional): Number of newss to scrape.
+        on_item (callable, optional): Called with each news as soon as it is extracted.
 
     Returns:
-        bool: True if scraping is successful, False otherwise.
+        list | int | None: Scraped newss, 0 if none were found, None on failure.
     """
     print(f"🔍 Scraping {news_scrape} {'newss' if news_scrape > 1 else 'news'} from {s_url}...\n")
 
     try:
-        # Generate a unique filename for storing the response
-        file_name = f"{uuid.uuid4()}.html"
-        file_path = os.path.join("temp_files", file_name)
-
-        # Get html content to selenium
-        html_content = get_html_selenium(s_url)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-
-        # Call function to extract news details
-        result = scrape_newss(file_path, news_scrape, url)
+        # Get html content to selenium (bounded by the per-domain concurrency limit),
+        # scrolling only until enough result nodes are rendered
+        html_content = await run_blocking(
+            s_url,
+            partial(get_html_selenium, s_url, target_selector=".D9SJMe", target_count=news_scrape + 5),  # The first 5 children are not news cards
+        )
+
+        # Call function to extract news details straight from the page source
+        result = await run_in_thread(scrape_newss, html_content, news_scrape, url, on_item)
+        if not result:
+            dump_debug_page(html_content, SOURCE)
         return result
     except Exception as err:
         print(f"❌ [ERROR] Unexpected Error: {err}\n")
     return None
 
-def scrape_newss(file_path, news_scrape, url):
+def scrape(s_url, url, news_scrape):
+    """
+    Sync wrapper around scrape_async.
+    """
+    return run_sync(scrape_async(s_url, url, news_scrape))
+
+def scrape_newss(content, news_scrape, url, on_item=None):
     """
-    Extracts news information from the stored HTML file and saves it in Excel.
+    Extracts news information from the page content.
 
     Args:
-        file_path (str): Path to the stored HTML file.
+        content (str): Rendered HTML page source.
         news_scrape (int): Number of newss to extract.
+        url (str): Main domain URL.
+        on_item (callable, optional): Called with each news as soon as it is extracted.
     """
-    # Define HTML class names for news attributes
-    newss_container_class = "D9SJMe"
-
-    # Read the saved HTML file
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    soup = BeautifulSoup(content, "html.parser")
+    soup = parse_html(content)
 
+    scrapped_newss = []
     try:
         # Locate the news container
-        newss_container = soup.find(class_=newss_container_class)
+        newss_container = soup.find(class_=RESULTS_CONTAINER_CLASS)
 
         newss = newss_container.children
         newss = list(newss)
         print('Total:', len(newss), '\n')
         if not newss:
-            # Clean up the temporary file after scraping
-            clean(file_path)
             return 0
 
         # Limit to requested count
         newss = newss[5:news_scrape + 5]
         print('Total:', len(newss), '\n')
 
-        scrapped_newss = []
-
         # Extract details for each news
         for i, news in enumerate(newss):
-            news_provider = news.find(class_="zC7z7b").attrs.get("src") if news.find(class_="zC7z7b") else ""
-            news_title = news.find(class_="JtKRv").text if news.find(class_="JtKRv") else ""
-            news_image = news.find(class_="Quavad").attrs.get("src") if news.find(class_="Quavad") else ""
-            news_time = news.find(class_="hvbAAd").attrs.get("datetime") if news.find(class_="hvbAAd") else ""
-            news_link = news.find(class_="WwrzSb").attrs.get('href') if news.find(class_="WwrzSb") else ""
+            fields = NEWS_SPEC.extract(news)
 
-            if (news_title == "" and news_link == "" and news_provider == "") or news_link == "":
+            if fields["Link"] == "":
                 continue
 
             news_data = {
                 "SNo": i + 1,
-                "Provider": news_provider,
-                "Title": news_title,
-                "Image": url + news_image,
-                "Time": datetime.strptime(news_time, "%Y-%m-%dT%H:%M:%SZ").strftime("%d %b %Y") if news_time else "",
-                "Link": url + news_link,
+                "Provider": fields["Provider"],
+                "Title": fields["Title"],
+                "Image": url + fields["Image"],
+                "Time": fields["Time"],
+                "Link": url + fields["Link"],
             }
 
             scrapped_newss.append(news_data)
+            if on_item:
+                on_item(news_data)
 
     except AttributeError as attr_err:
         print(f"❌ Attribute Error: {attr_err}\n")
@@ -162,112 +227,75 @@ def scrape_newss(file_path, news_scrape, url):
         print(f"❌ Unexpected Error: {err}\n")
         return None
 
-    # Clean up the temporary file after scraping
-    clean(file_path)
-
     # Save extracted newss to an Excel file
-    # save_to_excel(scrapped_newss)
+    # save_export(scrapped_newss, "scraped_newss")
     print(f"✅ {len(scrapped_newss)} {'newss' if news_scrape > 1 else 'news'} scrapped successfully.\n")
     return scrapped_newss
 
-def save_to_excel(newss):
+async def start_g_news_scrapper_async(search_key, limit=DEFAULT_LIMIT, offset=0, backend=DEFAULT_BACKEND, on_item=None):
     """
-    📊 Saves the scraped news data into an Excel file with improved formatting.
-
-    Features:
-    ✅ Auto-adjusts column widths based on content.
-    ✅ Bold headers for better readability.
-    ✅ Center-aligns the headers.
+    Start scrapping on the async engine
 
     Args:
-        newss (list of dict): List containing news details.
+        search_key (str): The keyword to search for.
+        limit (int): Number of newss to return.
+        offset (int): Number of newss to skip.
+        backend (str): One of BACKENDS, see DEFAULT_BACKEND.
+        on_item (callable, optional): Called with each news of the window as soon as it is extracted.
     """
+    # Google News has no result pages, read enough items to cover the window and slice it
+    news_scrape = offset + limit
 
-    df = pd.DataFrame(newss)
-
-    # Generate a timestamped filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_name = f"scraped_newss_{timestamp}.xlsx"
-
-    # Save the DataFrame to Excel
-    df.to_excel(file_name, index=False, engine="openpyxl")
+    # Everything comes from a single "page", the emitter only applies the window
+    emitter = OrderedEmitter(on_item, 1, offset, limit, offset) if on_item else None
+    on_news = emitter.page_callback(1) if emitter else None
 
-    # Load the workbook to format it
-    wb = load_workbook(file_name)
-    ws = wb.active
-
-    # Apply formatting
-    for col_num, col in enumerate(ws.columns, 1):
-        max_length = 0
-        column_letter = get_column_letter(col_num)
-
-        # Determine max content width
-        for cell in col:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
+    url = "https://news.google.com"
 
-        adjusted_width = max_length + 2  # Extra padding
-        ws.column_dimensions[column_letter].width = min(adjusted_width, 50)  # Limit max width
+    # Read the feed first, it needs no browser
+    feed_result = None
+    result = None
+    if backend in ("auto", "rss"):
+        # In auto mode the feed may be dropped for Selenium, so only stream it once accepted
+        feed_result = await scrape_rss_async(search_key, news_scrape, on_news if backend == "rss" else None)
+        if backend == "rss" or (feed_result and len(feed_result) >= news_scrape):
+            result = feed_result
+            if backend == "auto" and on_news:
+                for news in result:
+                    on_news(news)
+        else:
+            print("↪️  Feed returned too few items, falling back to Selenium\n")
 
-    # Style headers
-    header_font = Font(bold=True)
-    for cell in ws[1]:  
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center")
+    if result is None:
+        # Construct search URL
+        search_url = f"{url}/search?q={search_key}"
 
-    # Wrap text in the "Description" column
-    for row in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=ws.max_column, max_col=ws.max_column):
-        for cell in row:
-            cell.alignment = Alignment(wrap_text=True)
+        # Call the scrape function with the provided number of products
+        result = await scrape_async(search_url, url, news_scrape, on_news)
 
-    # Save the formatted file
-    wb.save(file_name)
-    print(f"📁 Data successfully saved and formatted in {file_name} ✅\n")
+        # Better a short feed result than nothing
+        if not result and feed_result:
+            result = feed_result
+            if on_news:
+                for news in result:
+                    on_news(news)
 
-def clean(file_path):
-    """
-    🗑️ Cleans up temporary files after scraping.
+    if not result:
+        return result
 
-    Args:
-        file_path (str): The path of the temporary file to delete.
-    """
-    try:
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            print(f"🧹 Successfully deleted temporary file: {file_path}\n")
-        else:
-            print(f"⚠️  File not found: {file_path}\n")
-    except Exception as e:
-        print(f"❌ Error while deleting file {file_path}: {e}\n")
+    newss = result[offset:news_scrape]
+    for i, news in enumerate(newss):
+        news["SNo"] = offset + i + 1
+    return newss or 0
 
-def start_g_news_scrapper(search_key):
+def start_g_news_scrapper(search_key, limit=DEFAULT_LIMIT, offset=0, backend=DEFAULT_BACKEND):
     """
     Start scrapping
     """
-    # Ensure the 'temp_files' directory exists
-    os.makedirs("temp_files", exist_ok=True)
-
-    # Generate a random number between 1 - 50
-    news_scrape = random.randint(1, 50)
-
-    url = "https://news.google.com"
-
-    # Construct search URL
-    search_url = f"{url}/search?q={search_key}"
-
-    # Call the scrape function with the provided number of products
-    result = scrape(search_url, url, news_scrape)
-
-    return result
+    return run_sync(start_g_news_scrapper_async(search_key, limit=limit, offset=offset, backend=backend))
 
 
 if __name__ == "__main__":
-    # Ensure the 'temp_files' directory exists
-    os.makedirs("temp_files", exist_ok=True)
-
     url = "https://news.google.com"
 
     # Get search query from user
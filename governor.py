@@ -0,0 +1,347 @@
+import asyncio
+import os
+import time
+
+
+# Governor tuning (override through environment variables)
+DEFAULT_RATE = float(os.environ.get("GOVERNOR_RATE", 10))  # Requests per second per domain, 0 disables rate limiting
+DEFAULT_BURST = int(os.environ.get("GOVERNOR_BURST", 20))  # Requests a domain may receive back to back
+BREAKER_FAILURES = int(os.environ.get("BREAKER_FAILURES", 5))  # Consecutive failures that open a domain's circuit
+BREAKER_OPEN_SECONDS = float(os.environ.get("BREAKER_OPEN_SECONDS", 30))  # First open period, doubled on every failed probe
+BREAKER_MAX_OPEN_SECONDS = float(os.environ.get("BREAKER_MAX_OPEN_SECONDS", 600))
+AIMD_BACKOFF = float(os.environ.get("AIMD_BACKOFF", 0.5))  # Concurrency is multiplied by this on errors and latency spikes
+AIMD_COOLDOWN = float(os.environ.get("AIMD_COOLDOWN", 1))  # Min seconds between two decreases, so one incident halves once
+LATENCY_SPIKE_FACTOR = float(os.environ.get("LATENCY_SPIKE_FACTOR", 3))  # Latency above this x the average counts as a spike
+LATENCY_MIN_SAMPLES = 5  # Samples needed before latency spikes are detected
+LATENCY_ALPHA = 0.2  # Weight of the newest sample in the latency average
+
+# Outcomes reported for a finished call
+OK, FAILED, NEUTRAL = 'ok', 'failed', 'neutral'
+
+
+def _parse_domain_rates(value):
+    """
+    Parses per-domain rate overrides like 'www.amazon.in=2,www.myntra.com=0.5' (requests per second).
+    """
+    rates = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        domain, rate = item.split("=", 1)
+        try:
+            rates[domain.strip().lower()] = float(rate)
+        except ValueError:
+            continue
+    return rates
+
+DOMAIN_RATES = _parse_domain_rates(os.environ.get("GOVERNOR_DOMAIN_RATES", ""))
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: `rate` tokens per second, holding at most `burst`.
+    """
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.waits = 0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """
+        Waits until a request may be sent.
+        """
+        if self.rate <= 0:
+            return
+
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+
+            wait = self.paused_until - now
+            if wait <= 0:
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+
+            self.waits += 1
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Holds every request back for the given time (e.g. an upstream Retry-After).
+        """
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class AdaptiveLimit:
+    """
+    AIMD concurrency limit: grows by about one slot per round of successful calls up to
+    max_limit, and is cut by AIMD_BACKOFF on errors and latency spikes, down to one.
+    """
+    def __init__(self, max_limit):
+        self.max_limit = max_limit
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.latency = None
+        self.samples = 0
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._condition = None
+
+    def _cond(self):
+        # Created lazily so it binds to the engine loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        async with self._cond():
+            await self._condition.wait_for(lambda: self.in_flight < max(int(self.limit), 1))
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._cond():
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def increase(self):
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def decrease(self):
+        now = time.monotonic()
+        if now - self._last_decrease < AIMD_COOLDOWN:
+            return
+        self._last_decrease = now
+        self.limit = max(1.0, self.limit * AIMD_BACKOFF)
+        self.decreases += 1
+
+    def observe(self, latency):
+        """
+        Records a call latency and returns True if it is a spike against the running average.
+        """
+        spike = (
+            self.samples >= LATENCY_MIN_SAMPLES
+            and latency > LATENCY_SPIKE_FACTOR * self.latency
+        )
+        self.latency = latency if self.latency is None else (1 - LATENCY_ALPHA) * self.latency + LATENCY_ALPHA * latency
+        self.samples += 1
+        return spike
+
+
+class CircuitBreaker:
+    """
+    Opens after BREAKER_FAILURES consecutive failures and rejects calls while open.
+
+    Once the open period is over a single probe call is let through (half-open): if it
+    succeeds the circuit closes, if it fails the circuit opens again for twice as long.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, name="", threshold=BREAKER_FAILURES, open_seconds=BREAKER_OPEN_SECONDS, max_open_seconds=BREAKER_MAX_OPEN_SECONDS):
+        self.name = name
+        self.threshold = threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.rejected = 0
+        self.open_until = 0.0
+        self._next_open_seconds = open_seconds
+        self._probing = False
+
+    def is_open(self):
+        return self.state == self.OPEN and time.monotonic() < self.open_until
+
+    def retry_in(self):
+        return max(self.open_until - time.monotonic(), 0)
+
+    def allow(self):
+        """
+        Returns True if a call may go upstream now.
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() < self.open_until:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._probing = False
+
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                self.rejected += 1
+                return False
+            self._probing = True
+        return True
+
+    def record(self, outcome):
+        if outcome == OK:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._next_open_seconds = self.open_seconds
+        elif outcome == FAILED:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                self.trip()
+        elif self.state == self.HALF_OPEN:
+            # The probe told us nothing, let the next call probe
+            self._probing = False
+
+    def trip(self):
+        """
+        Opens the circuit for the current backoff period.
+        """
+        seconds = self._next_open_seconds
+        self.state = self.OPEN
+        self.open_until = time.monotonic() + seconds
+        self.trips += 1
+        self._probing = False
+        self._next_open_seconds = min(self._next_open_seconds * 2, self.max_open_seconds)
+        print(f"🚧 Circuit {self.name} opened for {seconds:.0f}s after {self.failures} failure(s)\n")
+
+
+class DomainGovernor:
+    """
+    Upstream governor of one domain: a rate limit shared by all calls, plus adaptive
+    concurrency and a circuit breaker per kind of call ('fetch', 'blocking'). Kinds fail
+    independently: a plain-HTTP fast path getting 403s must not open the circuit of the
+    Selenium fallback that is meant to work around them.
+
+    Must be used from the scraping engine loop.
+    """
+    def __init__(self, domain):
+        self.domain = domain
+        self.bucket = TokenBucket(DOMAIN_RATES.get(domain, DEFAULT_RATE), DEFAULT_BURST)
+        self.breakers = {}
+        self.limits = {}
+        self.calls = 0
+        self.failures = 0
+        self.spikes = 0
+
+    def breaker(self, kind):
+        breaker = self.breakers.get(kind)
+        if breaker is None:
+            breaker = self.breakers[kind] = CircuitBreaker(f"{self.domain} ({kind})")
+        return breaker
+
+    def allow(self, kind):
+        return self.breaker(kind).allow()
+
+    def is_open(self, kinds=None):
+        """
+        Returns True while the circuit of every given kind of call (by default every kind
+        seen so far) is open. A kind never called yet counts as closed.
+        """
+        kinds = tuple(self.breakers) if kinds is None else kinds
+        return bool(kinds) and all(kind in self.breakers and self.breakers[kind].is_open() for kind in kinds)
+
+    async def acquire(self, kind, max_limit):
+        """
+        Waits for a rate limit token and a concurrency slot of the given kind.
+        """
+        limit = self.limits.get(kind)
+        if limit is None:
+            limit = self.limits[kind] = AdaptiveLimit(max_limit)
+
+        try:
+            await self.bucket.acquire()
+            await limit.acquire()
+        except BaseException:
+            # The call never ran (e.g. cancelled while waiting): if allow() let it through
+            # as the half-open probe, the next call has to probe instead
+            self.breaker(kind).record(NEUTRAL)
+            raise
+
+    async def release(self, kind, outcome, latency=None, retry_after=None):
+        """
+        Frees the slot and feeds the call outcome to the limiter and the breaker.
+
+        Args:
+            kind (str): Kind of call, as passed to acquire().
+            outcome (str): OK, FAILED (upstream unhealthy) or NEUTRAL (e.g. cancelled, 404).
+            latency (float, optional): Call duration in seconds.
+            retry_after (float, optional): Seconds the upstream asked us to wait.
+        """
+        limit = self.limits[kind]
+        await limit.release()
+        self.calls += 1
+
+        if retry_after:
+            self.bucket.pause(retry_after)
+
+        if outcome == FAILED:
+            self.failures += 1
+            limit.decrease()
+        elif outcome == OK and latency is not None:
+            if limit.observe(latency):
+                self.spikes += 1
+                limit.decrease()
+            else:
+                limit.increase()
+
+        self.breaker(kind).record(outcome)
+
+    def stats(self):
+        circuits = {}
+        for kind, breaker in self.breakers.items():
+            state = breaker.state
+            if state == CircuitBreaker.OPEN and not breaker.is_open():
+                state = CircuitBreaker.HALF_OPEN  # The next call probes
+            circuits[kind] = {
+                "state": state,
+                "retry_in": round(breaker.retry_in(), 1) if breaker.is_open() else 0,
+                "consecutive_failures": breaker.failures,
+                "trips": breaker.trips,
+                "rejected": breaker.rejected,
+            }
+
+        return {
+            "circuits": circuits,
+            "calls": self.calls,
+            "failures": self.failures,
+            "latency_spikes": self.spikes,
+            "rate": self.bucket.rate,
+            "tokens": round(self.bucket.tokens, 2),
+            "rate_limited_waits": self.bucket.waits,
+            "concurrency": {
+                kind: {
+                    "limit": round(limit.limit, 2),
+                    "max": limit.max_limit,
+                    "in_flight": limit.in_flight,
+                    "decreases": limit.decreases,
+                    "latency_ms": round(limit.latency * 1000, 1) if limit.latency is not None else None,
+                }
+                for kind, limit in self.limits.items()
+            },
+        }
+
+
+_governors = {}
+
+def get_governor(domain):
+    governor = _governors.get(domain)
+    if governor is None:
+        governor = _governors[domain] = DomainGovernor(domain)
+    return governor
+
+def is_open(domain, kinds=None):
+    """
+    Returns True while the domain's circuits of the given kinds of call (by default all
+    of them) are open, so every such call to it fails fast.
+    """
+    governor = _governors.get(domain)
+    return governor is not None and governor.is_open(kinds)
+
+def get_governor_stats():
+    """
+    Returns the governor state of every domain seen so far.
+    """
+    return {domain: governor.stats() for domain, governor in list(_governors.items())}
@@ -0,0 +1,311 @@
+import atexit
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+
+
+# HTTP response cache tuning (override through environment variables)
+ENABLED = os.environ.get("HTTP_CACHE", "1").strip().lower() not in ("0", "false", "no")
+CACHE_DIR = os.environ.get("HTTP_CACHE_DIR", os.path.join("temp_files", "http_cache"))
+MAX_BYTES = int(os.environ.get("HTTP_CACHE_MAX_BYTES", 256 * 1024 * 1024))  # Total size of the compressed bodies on disk
+FRESH_SECONDS = int(os.environ.get("HTTP_CACHE_FRESH_SECONDS", 60))  # Served without revalidation when the upstream sets no max-age
+COMPRESS_LEVEL = 6
+INDEX_SAVE_INTERVAL = 5  # Min seconds between two index writes, the index is also saved at exit
+
+INDEX_FILE = "index.json"
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+# Response headers worth keeping with a cached body (lower case)
+KEPT_HEADERS = ("content-type", "etag", "last-modified", "cache-control")
+
+
+def _header(headers, name):
+    """
+    Case-insensitive header lookup on a plain dict.
+    """
+    for key, value in (headers or {}).items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+def _fresh_for(headers):
+    """
+    Seconds a response may be served without revalidation: the upstream max-age, or FRESH_SECONDS.
+
+    no-cache/no-store are not honoured on purpose, this is a private cache of a single client
+    and every stale entry is revalidated with its validators anyway.
+    """
+    match = MAX_AGE_PATTERN.search(_header(headers, "Cache-Control") or "")
+    return int(match.group(1)) if match else FRESH_SECONDS
+
+
+class CachedResponse:
+    """
+    A cached response read back from disk.
+    """
+    __slots__ = ("url", "status", "headers", "content", "fresh")
+
+    def __init__(self, url, status, headers, content, fresh):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.content = content
+        self.fresh = fresh
+
+    def validators(self):
+        """
+        Returns the conditional request headers for revalidating this response.
+        """
+        validators = {}
+        etag = _header(self.headers, "ETag")
+        last_modified = _header(self.headers, "Last-Modified")
+        if etag:
+            validators["If-None-Match"] = etag
+        if last_modified:
+            validators["If-Modified-Since"] = last_modified
+        return validators
+
+
+class HTTPCache:
+    """
+    Size-bounded on-disk cache of raw HTTP responses.
+
+    Bodies are stored zlib-compressed, one file per URL, next to a JSON index holding
+    their headers, size and freshness, so the cache survives restarts. Entries are
+    evicted least recently used first once the compressed bodies exceed max_bytes.
+    """
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._index = OrderedDict()  # url -> {file, status, headers, size, stored_at, fresh_until}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = 0.0
+        self._stats = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0, "bytes_saved": 0}
+        self._load()
+
+    def _path(self, name):
+        return os.path.join(self.cache_dir, name)
+
+    def _load(self):
+        """
+        Reads the index back and drops entries whose body file is gone, and body files no entry points to.
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._path(INDEX_FILE)) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = []
+
+        for url, entry in entries:
+            if os.path.exists(self._path(entry["file"])):
+                self._index[url] = entry
+                self._bytes += entry["size"]
+
+        known = {entry["file"] for entry in self._index.values()}
+        try:
+            for name in os.listdir(self.cache_dir):
+                # Also drops temp files left behind by a crash in the middle of a write
+                if (name.endswith(".z") and name not in known) or name.endswith(".tmp"):
+                    self._remove_file(name)
+        except OSError:
+            pass
+
+        self._evict()
+
+    def _remove_file(self, name):
+        try:
+            os.remove(self._path(name))
+        except OSError:
+            pass
+
+    def get(self, url):
+        """
+        Returns the cached response of a URL (fresh or due for revalidation), or None.
+
+        A fresh response counts as a hit. A stale one is counted once the caller knows
+        the outcome: revalidated() on a 304, or a miss when set() replaces it.
+        """
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._index.move_to_end(url)
+
+        try:
+            with open(self._path(entry["file"]), "rb") as f:
+                content = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            self.invalidate(url)
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+
+        fresh = time.time() < entry["fresh_until"]
+        if fresh:
+            with self._lock:
+                self._stats["hits"] += 1
+                self._stats["bytes_saved"] += len(content)
+        return CachedResponse(url, entry["status"], entry["headers"], content, fresh)
+
+    def set(self, url, status, headers, content):
+        """
+        Stores a response, evicting least recently used entries to stay within max_bytes.
+
+        Concurrent writers of the same URL each write their own temp file and the last
+        rename wins. A failed write is reported and skipped, it never fails the fetch.
+        """
+        body = zlib.compress(content, COMPRESS_LEVEL)
+        if len(body) > self.max_bytes:
+            return
+
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest() + ".z"
+        if not self._write(name, body):
+            return
+
+        now = time.time()
+        with self._lock:
+            old = self._index.pop(url, None)
+            if old is not None:
+                # Replacing a stale entry means its revalidation failed
+                self._bytes -= old["size"]
+                self._stats["misses"] += 1
+
+            self._index[url] = {
+                "file": name,
+                "status": status,
+                "headers": {key: value for key, value in headers.items() if key.lower() in KEPT_HEADERS},
+                "size": len(body),
+                "stored_at": now,
+                "fresh_until": now + _fresh_for(headers),
+            }
+            self._bytes += len(body)
+            self._stats["stores"] += 1
+            self._evict()
+            self._dirty = True
+        self._maybe_save()
+
+    def _write(self, name, data):
+        """
+        Writes a file of the cache directory atomically, through a unique temp file.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=name + ".", suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(name))
+            return True
+        except OSError as err:
+            print(f"❌ Error while writing {name} to the HTTP cache: {err}\n")
+            if tmp_path:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return False
+
+    def revalidated(self, url, headers, size):
+        """
+        Marks an entry fresh again after a 304 Not Modified, taking over the new validators.
+        """
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                return
+            for key in ("ETag", "Last-Modified", "Cache-Control"):
+                value = _header(headers, key)
+                if value:
+                    kept = {name: old for name, old in entry["headers"].items() if name.lower() != key.lower()}
+                    entry["headers"] = {**kept, key: value}
+            entry["fresh_until"] = time.time() + _fresh_for(entry["headers"])
+            self._stats["revalidated"] += 1
+            self._stats["bytes_saved"] += size
+            self._dirty = True
+        self._maybe_save()
+
+    def invalidate(self, url):
+        with self._lock:
+            entry = self._index.pop(url, None)
+            if entry is None:
+                return False
+            self._bytes -= entry["size"]
+            self._dirty = True
+        self._remove_file(entry["file"])
+        return True
+
+    def clear(self):
+        with self._lock:
+            entries = list(self._index.values())
+            self._index.clear()
+            self._bytes = 0
+            self._dirty = True
+        for entry in entries:
+            self._remove_file(entry["file"])
+        self.save()
+
+    def _evict(self):
+        # Called with the lock held
+        while self._bytes > self.max_bytes and self._index:
+            _, entry = self._index.popitem(last=False)
+            self._bytes -= entry["size"]
+            self._stats["evictions"] += 1
+            self._remove_file(entry["file"])
+
+    def _maybe_save(self):
+        if time.time() - self._saved_at >= INDEX_SAVE_INTERVAL:
+            self.save()
+
+    def save(self):
+        """
+        Writes the index to disk (atomically) if it changed.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = list(self._index.items())
+            self._dirty = False
+            self._saved_at = time.time()
+
+        self._write(INDEX_FILE, json.dumps(entries).encode("utf-8"))
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["revalidated"] + self._stats["misses"]
+            served = self._stats["hits"] + self._stats["revalidated"]
+            return {
+                **self._stats,
+                "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+                "entries": len(self._index),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "enabled": ENABLED,
+            }
+
+
+# Shared on-disk response cache, created on first use
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HTTPCache()
+            atexit.register(_cache.save)
+    return _cache
+
+def get_http_cache_stats():
+    return get_cache().stats() if ENABLED else {"enabled": False}
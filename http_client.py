@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Brotli support is optional, urllib3 decodes 'br' transparently once the package is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+# Pool tuning (override through environment variables)
+POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS", 10))  # Number of per-host pools kept alive
+POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", 20))  # Max idle connections kept per host
+POOL_BLOCK = os.environ.get("HTTP_POOL_BLOCK", "").strip().lower() in ("1", "true", "yes")  # Wait for a free connection instead of opening extra ones
+
+# Timeouts split into (connect, read), in seconds
+CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", 3.05))
+READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", 10))
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Accept-Language": "en-IN,en;q=0.9",
+    "Connection": "keep-alive",
+}
+
+
+class PoolStats:
+    """
+    Thread-safe per-host counters for connection pool usage.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _host(self, host):
+        return self._hosts.setdefault(host, {
+            "checkouts": 0,
+            "new_connections": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        })
+
+    def record_checkout(self, host, wait_time):
+        with self._lock:
+            stats = self._host(host)
+            stats["checkouts"] += 1
+            stats["wait_time_total"] += wait_time
+            stats["wait_time_max"] = max(stats["wait_time_max"], wait_time)
+
+    def record_new_connection(self, host):
+        with self._lock:
+            self._host(host)["new_connections"] += 1
+
+    def snapshot(self):
+        """
+        Returns a JSON-serializable copy of the counters, keyed by host.
+        """
+        with self._lock:
+            result = {}
+            for host, stats in self._hosts.items():
+                checkouts = stats["checkouts"]
+                result[host] = {
+                    "checkouts": checkouts,
+                    "hits": max(checkouts - stats["new_connections"], 0),  # Requests served by a reused keep-alive connection
+                    "new_connections": stats["new_connections"],
+                    "wait_time_total_ms": round(stats["wait_time_total"] * 1000, 3),
+                    "wait_time_max_ms": round(stats["wait_time_max"] * 1000, 3),
+                    "wait_time_avg_ms": round(stats["wait_time_total"] * 1000 / checkouts, 3) if checkouts else 0.0,
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._hosts.clear()
+
+
+pool_stats = PoolStats()
+
+
+class _StatsPoolMixin:
+    """
+    Records connection checkouts, pool wait time and new connections on a urllib3 pool.
+    """
+    def _get_conn(self, timeout=None):
+        start = time.perf_counter()
+        conn = super()._get_conn(timeout=timeout)
+        pool_stats.record_checkout(self.host, time.perf_counter() - start)
+        return conn
+
+    def _new_conn(self):
+        pool_stats.record_new_connection(self.host)
+        return super()._new_conn()
+
+
+class StatsHTTPConnectionPool(_StatsPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class StatsHTTPSConnectionPool(_StatsPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose per-host pools report usage to pool_stats.
+    """
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": StatsHTTPConnectionPool,
+            "https": StatsHTTPSConnectionPool,
+        }
+
+
+# A single adapter (and therefore a single set of connection pools) shared by every thread
+_adapter = PooledHTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, pool_block=POOL_BLOCK)
+_local = threading.local()
+
+
+def get_session():
+    """
+    Returns the calling thread's session.
+
+    Each thread gets its own Session (cookies, headers) while all of them share the
+    same keep-alive connection pools, so TCP/TLS handshakes are paid once per connection.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        session.mount("http://", _adapter)
+        session.mount("https://", _adapter)
+        _local.session = session
+    return session
+
+def fetch(url, headers=None, timeout=None, **kwargs):
+    """
+    Sends a GET request through the pooled session.
+
+    Args:
+        url (str): The target URL.
+        headers (dict, optional): Extra headers merged over the defaults.
+        timeout (float | tuple, optional): Overrides the default (connect, read) timeout.
+
+    Returns:
+        requests.Response: The response object.
+    """
+    return get_session().get(url, headers=headers, timeout=timeout or DEFAULT_TIMEOUT, **kwargs)
+
+def get_pool_stats():
+    """
+    Returns pool configuration and per-host usage counters.
+
+    The counters cover both engine backends: the aiohttp connector of the default async
+    backend reports to pool_stats too (see async_engine). The config is the requests pool's.
+    """
+    return {
+        "config": {
+            "pool_connections": POOL_CONNECTIONS,
+            "pool_maxsize": POOL_MAXSIZE,
+            "pool_block": POOL_BLOCK,
+            "connect_timeout": CONNECT_TIMEOUT,
+            "read_timeout": READ_TIMEOUT,
+            "accept_encoding": ACCEPT_ENCODING,
+        },
+        "hosts": pool_stats.snapshot(),
+    }
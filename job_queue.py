@@ -0,0 +1,324 @@
+import asyncio
+import atexit
+import concurrent.futures
+import ipaddress
+import itertools
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+from async_engine import get_loop, SYNC_TIMEOUT
+import http_client
+
+
+# Job queue tuning (override through environment variables)
+WORKERS = int(os.environ.get("JOB_WORKERS", 4))  # Jobs executed at the same time
+MAX_QUEUED = int(os.environ.get("JOB_MAX_QUEUED", 100))  # Jobs waiting for a worker before new ones are rejected
+RESULT_TTL = int(os.environ.get("JOB_RESULT_TTL", 900))  # Seconds a finished job (and its result) is kept
+JOB_TIMEOUT = float(os.environ.get("JOB_TIMEOUT", SYNC_TIMEOUT))  # Upper bound for one job, in seconds
+WEBHOOK_TIMEOUT = float(os.environ.get("JOB_WEBHOOK_TIMEOUT", 5))  # Seconds per webhook delivery attempt
+WEBHOOK_RETRIES = int(os.environ.get("JOB_WEBHOOK_RETRIES", 3))  # Delivery attempts before giving up
+WEBHOOK_WORKERS = int(os.environ.get("JOB_WEBHOOK_WORKERS", 4))  # Webhooks delivered at the same time
+# Comma-separated callback hosts; when set only these are accepted (and may be internal)
+WEBHOOK_ALLOWED_HOSTS = {host.strip().lower() for host in os.environ.get("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()}
+
+# Lower value runs first
+PRIORITIES = {'high': 0, 'normal': 1, 'low': 2}
+
+# Job states; the last three are final
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINAL_STATES = (DONE, FAILED, CANCELLED)
+
+
+class QueueFull(Exception):
+    """
+    Raised when a job is submitted while MAX_QUEUED jobs are already waiting.
+    """
+
+
+def check_callback_url(url):
+    """
+    Checks that a webhook URL may be called: http(s), and either one of WEBHOOK_ALLOWED_HOSTS
+    or a host whose every address is public, so jobs cannot be used to reach loopback,
+    private (RFC 1918), link-local (cloud metadata at 169.254.169.254) or reserved addresses.
+
+    Raises:
+        ValueError: With the reason the URL is rejected.
+    """
+    parts = urlsplit(url) if isinstance(url, str) else None
+    if parts is None or parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError('callback_url must be an http(s) URL.')
+
+    host = parts.hostname.lower()
+    if WEBHOOK_ALLOWED_HOSTS:
+        if host not in WEBHOOK_ALLOWED_HOSTS:
+            raise ValueError('callback_url host must be one of {}'.format(sorted(WEBHOOK_ALLOWED_HOSTS)))
+        return
+
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, parts.port, type=socket.SOCK_STREAM)}
+    except (socket.gaierror, UnicodeError, ValueError):
+        raise ValueError('callback_url host cannot be resolved.')
+
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split('%')[0])
+        if ip.version == 6 and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError('callback_url must not point at a loopback, private, link-local or reserved address.')
+
+
+class Job:
+    """
+    One background job: a coroutine factory run on the scraping engine loop, with its state and result.
+    """
+    def __init__(self, coro_fn, priority, callback_url=None, meta=None):
+        self.id = uuid.uuid4().hex
+        self.coro_fn = coro_fn
+        self.priority = priority
+        self.callback_url = callback_url
+        self.meta = meta or {}
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.webhook = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+
+    def to_dict(self, include_result=True):
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'priority': self.priority,
+            **self.meta,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'expires_at': self.finished_at + RESULT_TTL if self.finished_at else None,
+            'error': self.error,
+            'webhook': self.webhook,
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+
+class JobQueue:
+    """
+    In-process priority job queue executed by a bounded pool of worker threads.
+
+    Jobs wait in a PriorityQueue (priority, then submission order) and each worker
+    runs one job at a time on the scraping engine loop, so at most WORKERS scrapes
+    triggered by jobs are in flight and HTTP workers are never blocked by them.
+    Finished jobs are kept for RESULT_TTL seconds for polling, then dropped.
+    Webhooks are delivered (and retried) by their own WEBHOOK_WORKERS threads, so a
+    slow or failing callback never holds a job worker.
+    """
+    def __init__(self, workers=WORKERS, max_queued=MAX_QUEUED):
+        self.max_queued = max_queued
+        self._queue = queue.PriorityQueue()
+        self._jobs = {}
+        self._queued = 0
+        self._running = 0
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"submitted": 0, "rejected": 0, "done": 0, "failed": 0, "cancelled": 0, "expired": 0,
+                       "webhooks_sent": 0, "webhooks_failed": 0}
+
+        self._webhooks = concurrent.futures.ThreadPoolExecutor(WEBHOOK_WORKERS, thread_name_prefix="job-webhook")
+        self._workers = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True) for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, coro_fn, priority='normal', callback_url=None, meta=None):
+        """
+        Queues a job.
+
+        Args:
+            coro_fn (callable): Zero-argument function returning the coroutine to run.
+            priority (str): One of PRIORITIES.
+            callback_url (str, optional): URL the finished job is POSTed to.
+            meta (dict, optional): Extra fields reported with the job (e.g. the search request).
+
+        Returns:
+            Job: The queued job.
+
+        Raises:
+            QueueFull: If MAX_QUEUED jobs are already waiting.
+        """
+        self._expire()
+
+        job = Job(coro_fn, priority, callback_url, meta)
+        with self._lock:
+            if self._queued >= self.max_queued:
+                self._stats["rejected"] += 1
+                raise QueueFull(f"{self._queued} jobs already queued")
+            self._jobs[job.id] = job
+            self._queued += 1
+            self._stats["submitted"] += 1
+
+        self._queue.put((PRIORITIES[priority], next(self._sequence), job))
+        return job
+
+    def get(self, job_id):
+        """
+        Returns the job, or None if it is unknown or its result expired.
+        """
+        self._expire()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Cancels a queued or running job.
+
+        Returns:
+            Job | None: The job (check its status, finished jobs are left as they are), or None if unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINAL_STATES:
+                return job
+
+            if job.status == QUEUED:
+                # The worker that pops it skips it
+                self._queued -= 1
+                self._finish(job, CANCELLED)
+                return job
+
+            future = job.future
+
+        # Running: cancel the coroutine on the engine loop, the worker records the outcome
+        if future is not None:
+            future.cancel()
+        return job
+
+    def _work(self):
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+
+            with self._lock:
+                if job.status != QUEUED:
+                    continue
+                self._queued -= 1
+                self._running += 1
+                job.status = RUNNING
+                job.started_at = time.time()
+                job.future = asyncio.run_coroutine_threadsafe(job.coro_fn(), get_loop())
+
+            status = DONE
+            try:
+                job.result = job.future.result(timeout=JOB_TIMEOUT)
+            except concurrent.futures.CancelledError:
+                status = CANCELLED
+            except concurrent.futures.TimeoutError:
+                job.future.cancel()
+                job.error = f"Job timed out after {JOB_TIMEOUT}s"
+                status = FAILED
+            except Exception as err:
+                print(f"❌ [ERROR] Job {job.id} failed: {err}\n")
+                job.error = str(err)
+                status = FAILED
+
+            with self._lock:
+                self._running -= 1
+                self._finish(job, status)
+
+            if job.callback_url:
+                self._webhooks.submit(self._deliver, job)
+
+    def _finish(self, job, status):
+        # Called with the lock held
+        job.status = status
+        job.finished_at = time.time()
+        job.coro_fn = job.future = None
+        self._stats[status] += 1
+
+    def _deliver(self, job):
+        """
+        POSTs the finished job to its callback URL, retrying with backoff. Runs on a webhook thread.
+        """
+        try:
+            # Checked again: the host may resolve differently than when the job was submitted
+            check_callback_url(job.callback_url)
+        except ValueError as err:
+            print(f"⚠️  Webhook for job {job.id} not sent: {err}\n")
+            job.webhook = {'delivered': False, 'attempts': 0, 'error': str(err)}
+            with self._lock:
+                self._stats["webhooks_failed"] += 1
+            return
+
+        payload = job.to_dict()
+        error = None
+        for attempt in range(1, WEBHOOK_RETRIES + 1):
+            try:
+                # Redirects are not followed, they could lead to an address check_callback_url rejects
+                response = http_client.get_session().post(job.callback_url, json=payload, timeout=WEBHOOK_TIMEOUT,
+                                                          allow_redirects=False)
+                if response.status_code < 400:
+                    job.webhook = {'delivered': True, 'attempts': attempt, 'status': response.status_code}
+                    with self._lock:
+                        self._stats["webhooks_sent"] += 1
+                    return
+                error = f"HTTP {response.status_code}"
+            except Exception as err:
+                error = str(err)
+
+            print(f"⚠️  Webhook for job {job.id} failed (attempt {attempt}/{WEBHOOK_RETRIES}): {error}\n")
+            if attempt < WEBHOOK_RETRIES:
+                time.sleep(2 ** (attempt - 1))
+
+        job.webhook = {'delivered': False, 'attempts': WEBHOOK_RETRIES, 'error': error}
+        with self._lock:
+            self._stats["webhooks_failed"] += 1
+
+    def _expire(self):
+        """
+        Drops finished jobs older than RESULT_TTL.
+        """
+        cutoff = time.time() - RESULT_TTL
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.status in FINAL_STATES and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+            self._stats["expired"] += len(expired)
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "queued": self._queued,
+                "running": self._running,
+                "kept": len(self._jobs),
+                "workers": len(self._workers),
+                "max_queued": self.max_queued,
+                "result_ttl": RESULT_TTL,
+            }
+
+    def close(self):
+        """
+        Stops the workers once they finish their current job. Queued jobs and webhooks are dropped.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            # Sorts before every real job so idle workers exit right away
+            self._queue.put((-1, -1, None))
+        self._webhooks.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared queue of background scrape jobs
+jobs = JobQueue()
+atexit.register(jobs.close)
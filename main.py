@@ -1,18 +1,43 @@
-from amazon import start_amazon_scrapper
-import face_recognition
-from flipkart import start_flipkart_scrapper
+from async_engine import get_engine_stats
+from browser_pool import pool as browser_pool, resolve_driver_path
+from exporter import EXPORT_FORMATS, available_formats, export_filename, iter_export
+from face_gallery import gallery, DEFAULT_TOP_K, MAX_TOP_K
+from face_utils import FaceError, enroll_reference, face_distance, fetch_face_locations, image_normalize, reference_encoding, revoke_reference, single_face_encoding, token_encoding, MATCH_TOLERANCE, REFERENCE_TTL
 from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
-from google_news import start_g_news_scrapper
+from governor import get_governor_stats
+from http_cache import get_http_cache_stats
+from http_client import get_pool_stats
 import imghdr
+from job_queue import jobs, check_callback_url, PRIORITIES, QueueFull, FINAL_STATES
 import json
-from myntra import start_myntra_scrapper
+from price_store import prices, PRODUCT_SOURCES
 import requests
-from utils import fetch_face_locations, image_normalize, get_user_id, get_profile, get_posts, process_instagram_data
+from result_cache import cache as result_cache
+from scraper_utils import DEFAULT_LIMIT, MAX_LIMIT
+from scrape_service import SEARCH_RESOURCES, G_NEWS_BACKENDS, flights, resolve_sources, scrape_source, scrape_sources, stream_sources, submit_search, export_columns, export_items
+import time
+from utils import get_user_id, get_profile, get_posts, process_instagram_data
 
 
 app = Flask(__name__)
-CORS(app, supports_credentials=True)
+CORS(app, supports_credentials=True, expose_headers=['X-Cache', 'Age', 'Warning', 'Content-Disposition'])
+
+# Streaming formats of /scrape mapped to their content types
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream',
+}
+
+def stream_frame(stream, kind, source, payload):
+    """
+    Serializes one streaming event as an NDJSON line or a Server-Sent Event.
+    """
+    frame = {'type': kind, 'source': source, 'data': payload} if source else {'type': kind, 'data': payload}
+    body = json.dumps(frame, ensure_ascii=False, sort_keys=False)
+    if stream == 'sse':
+        return f"event: {kind}\ndata: {body}\n\n"
+    return body + "\n"
 
 @app.route('/scrapers', methods=['GET'])
 def scrapers():
@@ -26,6 +51,31 @@ def scrapers():
     """
     return jsonify([{ "Flipkart": "flipkart" }, { "Amazon": "amazon" }, { "Myntra": "myntra" }, { "Google News": "g-news" }])
 
+@app.route('/scrapers/stats', methods=['GET'])
+def scrapers_stats():
+    """
+    Scraper Stats Endpoint
+
+    This endpoint returns runtime statistics of the scraping layer, used to size it for the expected load.
+
+    Response:
+        - 200: Returns the scraping engine state, the HTTP connection pool usage, the browser pool usage
+          the result cache and request coalescing counters, the background job queue and the upstream
+          governor state per domain (circuit breaker, rate limit, adaptive concurrency) and the on-disk
+          HTTP response cache counters.
+    """
+    return jsonify({
+        'engine': get_engine_stats(),
+        'http_pool': get_pool_stats(),
+        'browser_pool': browser_pool.stats(),
+        'result_cache': result_cache.stats(),
+        'single_flight': flights.stats(),
+        'jobs': jobs.stats(),
+        'governor': get_governor_stats(),
+        'http_cache': get_http_cache_stats(),
+        'price_store': prices.stats(),
+    })
+
 @app.route('/scrape', methods=['POST'])
 def scrape():
     """
@@ -35,13 +85,37 @@ def scrape():
     
     Request JSON Parameters:
         - search_key (str): The keyword to search for. Must be at least 3 characters long.
-        - search_from (str): The source to search from. Must be one of ['amazon', 'flipkart', 'myntra', 'g-news'].
-    
+        - search_from (str | list): The source to search from. Must be one of ['amazon', 'flipkart', 'myntra', 'g-news'],
+          a list of them, or 'all'. Multiple sources are scraped concurrently.
+        - limit (int, optional): Number of results to return per source, 1 to 200. Defaults to 20.
+        - offset (int, optional): Number of results to skip per source. Defaults to 0.
+        - no_cache (bool, optional): Skip cached results and scrape upstream again. Defaults to false.
+        - backend (str, optional): Google News backend, one of ['auto', 'rss', 'selenium']. Defaults to 'auto'
+          (search feed, with Selenium only when the feed returns too few items).
+        - stream (str, optional): 'ndjson' or 'sse' to stream results while they are scraped instead of
+          returning them at the end. Every item is sent as an 'item' frame as soon as it is extracted, each
+          finished source as a 'source' frame (status, timing, count, cache info) and the last frame is a
+          'summary' with the per-source outcomes. A source failing after some of its items were sent
+          reports status 'partial' with the count of items sent.
+        - async (bool, optional): Run the scrape as a background job and return its id right away,
+          to be polled at GET /jobs/<job_id>. Defaults to false. The job result has the multi-source shape.
+        - priority (str, optional): Job priority, one of ['high', 'normal', 'low']. Defaults to 'normal'.
+        - callback_url (str, optional): http(s) URL the finished job is POSTed to. Its host must resolve to
+          public addresses only (or be listed in JOB_WEBHOOK_ALLOWED_HOSTS).
+        - export (str, optional): 'xlsx', 'csv' or 'parquet' to download the results as a file instead of JSON.
+          Items are written as they are scraped (with a 'Source' column for several sources), without
+          buffering the whole result set. Parquet needs pyarrow.
+
     Response:
-        - 200: Returns search results from the specified source.
+        - 200: Returns search results from the specified source. For a list of sources (or 'all'),
+          returns results keyed by source, each with its own status, timing, count and whether it was
+          served from cache (with its age in seconds). While a source's upstream is failing its expired
+          cached result is served, flagged as stale. Single-source responses carry the same information
+          in the X-Cache (HIT/STALE/MISS), Age and Warning headers.
+        - 202: For async requests, returns the queued job.
         - 400: If required parameters are missing or invalid.
+        - 503: For async requests, if the job queue is full.
     """
-    search_resources = ['amazon', 'flipkart', 'myntra', 'g-news']
     data = request.get_json()
 
     if not data:
@@ -60,19 +134,93 @@ def scrape():
     if len(search_key) < 3:
         return jsonify({'error': 'search_key must have at least 3 characters.'}), 400
 
-    if search_from not in search_resources:
-        return jsonify({'error': 'search_from must be one of {}'.format(search_resources)}), 400
-
-    # Perform web scraping based on the selected source
-    result = []
-    if search_from == 'amazon':
-        result = start_amazon_scrapper(search_key)
-    elif search_from == 'flipkart':
-        result = start_flipkart_scrapper(search_key)
-    elif search_from == 'myntra':
-        result = start_myntra_scrapper(search_key)
-    elif search_from == 'g-news':
-        result = start_g_news_scrapper(search_key)
+    sources = resolve_sources(search_from)
+    if not sources:
+        return jsonify({'error': "search_from must be one of {}, a list of them, or 'all'".format(SEARCH_RESOURCES)}), 400
+
+    backend = data.get('backend')
+    if backend is not None and backend not in G_NEWS_BACKENDS:
+        return jsonify({'error': 'backend must be one of {}'.format(list(G_NEWS_BACKENDS))}), 400
+
+    limit = data.get('limit', DEFAULT_LIMIT)
+    offset = data.get('offset', 0)
+
+    if not isinstance(limit, int) or isinstance(limit, bool) or not 1 <= limit <= MAX_LIMIT:
+        return jsonify({'error': f'limit must be an integer between 1 and {MAX_LIMIT}.'}), 400
+    if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+        return jsonify({'error': 'offset must be a non-negative integer.'}), 400
+
+    stream = data.get('stream')
+    if stream is not None and stream not in STREAM_FORMATS:
+        return jsonify({'error': 'stream must be one of {}'.format(list(STREAM_FORMATS))}), 400
+
+    run_async = data.get('async', False)
+    priority = data.get('priority', 'normal')
+    callback_url = data.get('callback_url')
+
+    export = data.get('export')
+    if export is not None and export not in available_formats():
+        return jsonify({'error': 'export must be one of {}'.format(available_formats())}), 400
+
+    if run_async and stream:
+        return jsonify({'error': 'async and stream cannot be combined.'}), 400
+    if export and (run_async or stream):
+        return jsonify({'error': 'export cannot be combined with async or stream.'}), 400
+    if priority not in PRIORITIES:
+        return jsonify({'error': 'priority must be one of {}'.format(list(PRIORITIES))}), 400
+    if callback_url is not None:
+        try:
+            check_callback_url(callback_url)
+        except ValueError as err:
+            return jsonify({'error': str(err)}), 400
+
+    options = {'limit': limit, 'offset': offset, 'backend': backend}
+    use_cache = not data.get('no_cache', False)
+
+    if run_async:
+        try:
+            job = submit_search(sources, search_key, options, use_cache, priority, callback_url)
+        except QueueFull:
+            response = jsonify({'error': 'Too many queued jobs, try again later.'})
+            response.headers['Retry-After'] = '30'
+            return response, 503
+        response = jsonify(job.to_dict(include_result=False))
+        response.headers['Location'] = f'/jobs/{job.id}'
+        return response, 202
+
+    if export:
+        rows = export_items(sources, search_key, options, use_cache)
+        file_name = export_filename('scraped_' + '_'.join(source.replace('-', '_') for source in sources), export)
+        return Response(
+            iter_export(rows, export, export_columns(sources)),
+            mimetype=EXPORT_FORMATS[export],
+            headers={'Content-Disposition': f'attachment; filename="{file_name}"'},
+        )
+
+    if stream:
+        events = stream_sources(sources, search_key, options, use_cache)
+        return Response(
+            (stream_frame(stream, *event) for event in events),
+            mimetype=STREAM_FORMATS[stream],
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},  # Keep proxies from buffering the stream
+        )
+
+    # Perform web scraping based on the selected source(s)
+    if isinstance(search_from, str) and search_from != 'all':
+        outcome = scrape_source(search_from, search_key, options, use_cache)
+        response = app.response_class(
+            response=json.dumps(outcome['data'], ensure_ascii=False, sort_keys=False),
+            status=200,
+            mimetype='application/json'
+        )
+        response.headers['X-Cache'] = 'STALE' if outcome['stale'] else 'HIT' if outcome['cached'] else 'MISS'
+        if outcome['cached']:
+            response.headers['Age'] = str(int(outcome['age']))
+        if outcome['stale']:
+            response.headers['Warning'] = '110 - "Response is Stale"'
+        return response
+
+    result = scrape_sources(sources, search_key, options, use_cache)
 
     return app.response_class(
         response=json.dumps(result, ensure_ascii=False, sort_keys=False),
@@ -80,6 +228,117 @@ def scrape():
         mimetype='application/json'
     )
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Job Status Endpoint
+
+    This endpoint returns the state of a background scrape job, with its result once it is done.
+
+    Response:
+        - 200: Returns the job: status ('queued', 'running', 'done', 'failed' or 'cancelled'), timestamps,
+          error, webhook delivery and the result.
+        - 404: If the job is unknown or its result expired.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired.'}), 404
+
+    return app.response_class(
+        response=json.dumps(job.to_dict(), ensure_ascii=False, sort_keys=False),
+        status=200,
+        mimetype='application/json'
+    )
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """
+    Job Cancellation Endpoint
+
+    This endpoint cancels a queued or running background scrape job.
+
+    Response:
+        - 200: Returns the job, cancelled (a running job is cancelled as soon as its scrape yields).
+        - 404: If the job is unknown or its result expired.
+        - 409: If the job had already finished.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired.'}), 404
+    if job.status in FINAL_STATES:
+        return jsonify({'error': f'Job already {job.status}.'}), 409
+
+    job = jobs.cancel(job_id)
+    return jsonify(job.to_dict(include_result=False)), 200
+
+@app.route('/prices/history', methods=['GET'])
+def price_history():
+    """
+    Price History Endpoint
+
+    This endpoint returns every recorded price of a product, from the local price store (no scrape).
+
+    Query Parameters:
+        - source (str): One of ['amazon', 'flipkart', 'myntra'].
+        - link (str): The product link, as returned by /scrape. Per-search tracking parameters are ignored.
+        - since (float, optional): Only prices recorded after this Unix timestamp.
+        - limit (int, optional): Max number of prices returned (the most recent ones), 1 to 10000. Defaults to 1000.
+
+    Response:
+        - 200: Returns the prices oldest first, each with its timestamp ('ts') and the product name.
+        - 400: If parameters are missing or invalid.
+    """
+    source = request.args.get('source')
+    link = request.args.get('link')
+
+    if source not in PRODUCT_SOURCES:
+        return jsonify({'error': 'source must be one of {}'.format(list(PRODUCT_SOURCES))}), 400
+    if not link:
+        return jsonify({'error': 'Missing required parameter: link'}), 400
+
+    since = request.args.get('since', type=float)
+    limit = request.args.get('limit', 1000, type=int)
+    if not 1 <= limit <= 10000:
+        return jsonify({'error': 'limit must be an integer between 1 and 10000.'}), 400
+
+    history = prices.price_history(source, link, since, limit)
+    return jsonify({'source': source, 'link': link, 'count': len(history), 'prices': history}), 200
+
+@app.route('/prices/cheapest', methods=['GET'])
+def cheapest_listings():
+    """
+    Cheapest Listings Endpoint
+
+    This endpoint returns the cheapest products by their latest recorded price, from the local
+    price store (no scrape).
+
+    Query Parameters:
+        - search_key (str, optional): Only products found for this search.
+        - source (str, optional): Only products of this source, one of ['amazon', 'flipkart', 'myntra'].
+        - max_age (float, optional): Only products seen in the last max_age seconds.
+        - limit (int, optional): Number of products returned, 1 to 200. Defaults to 20.
+
+    Response:
+        - 200: Returns the products cheapest first, with their latest price and when it was seen ('ts').
+        - 400: If parameters are invalid.
+    """
+    source = request.args.get('source')
+    if source is not None and source not in PRODUCT_SOURCES:
+        return jsonify({'error': 'source must be one of {}'.format(list(PRODUCT_SOURCES))}), 400
+
+    limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+    if not 1 <= limit <= MAX_LIMIT:
+        return jsonify({'error': f'limit must be an integer between 1 and {MAX_LIMIT}.'}), 400
+
+    listings = prices.cheapest(
+        request.args.get('search_key'), source, request.args.get('max_age', type=float), limit
+    )
+    return app.response_class(
+        response=json.dumps(listings, ensure_ascii=False, sort_keys=False),
+        status=200,
+        mimetype='application/json'
+    )
+
 @app.route('/detect_face', methods=['POST'])
 def detect_face():
     """
@@ -127,67 +386,209 @@ def compare_faces():
     """
     Endpoint to verify if a face in a live camera frame matches a stored image.
 
+    The stored image is only processed the first time its content is seen (its encoding is
+    cached for FACE_REFERENCE_TTL seconds), and can be replaced by a token from
+    POST /compare_faces/reference so it is not uploaded with every frame.
+
     Request (multipart/form-data):
-        - image (file): A stored image file (JPG, JPEG, PNG).
+        - image (file): A stored image file (JPG, JPEG, PNG). Not needed with reference_token.
+        - reference_token (str, optional): Token of an enrolled stored image.
         - frame (file): A live camera frame captured from the camera.
 
     Response:
-        - If both images contain a single face: Returns match result (True/False).
+        - If both images contain a single face: Returns the match result (True/False) and the
+          distance of the two faces (lower is more similar, they match up to FACE_MATCH_TOLERANCE).
         - If any image does not contain a face: Returns an error message.
+        - 404: If the reference_token is unknown or expired.
     """
+    reference_token = request.form.get('reference_token')
 
     # Ensure both files exist in the request
-    if 'image' not in request.files or 'frame' not in request.files:
-        return jsonify({'error': 'Both image and frame are required'}), 400
+    if 'frame' not in request.files or ('image' not in request.files and not reference_token):
+        return jsonify({'error': 'Both image (or reference_token) and frame are required'}), 400
 
-    file_image = request.files['image']
+    file_image = None if reference_token else request.files['image']
     file_frame = request.files['frame']
 
-    # Reset file pointers (Fix for multiple reads issue)
-    file_image.seek(0)
-    file_frame.seek(0)
-
     # Validate image format (should be JPG, JPEG, or PNG)
     try:
         valid_extensions = ['jpg', 'jpeg', 'png']
-        if (
-            imghdr.what(file_image) not in valid_extensions or 
-            imghdr.what(file_frame) not in valid_extensions
-        ):
-            return jsonify({'error': 'Invalid image format. Only JPG, JPEG, and PNG are supported'}), 400
+        for file in (file_image, file_frame):
+            if file is None:
+                continue
+            # Reset file pointers (Fix for multiple reads issue)
+            file.seek(0)
+            if imghdr.what(file) not in valid_extensions:
+                return jsonify({'error': 'Invalid image format. Only JPG, JPEG, and PNG are supported'}), 400
+
+        # Encoding of the stored image: enrolled, cached by content, or computed now
+        if reference_token:
+            encoding1 = token_encoding(reference_token)
+            if encoding1 is None:
+                return jsonify({'error': 'Unknown or expired reference_token'}), 404
+        else:
+            encoding1 = reference_encoding(file_image.read())
 
-        # Decode image using OpenCV
-        img1 = image_normalize(file_image)
+        # Decode, detect, align and encode the live frame
         img2 = image_normalize(file_frame)
+        if img2 is None:
+            return {"error": "Invalid image"}, 400
+        encoding2 = single_face_encoding(img2, 'live frame')
+
+        # Compare faces (lower distance = more similar)
+        distance = face_distance(encoding1, encoding2)
+
+        return jsonify({
+            'matched': distance <= MATCH_TOLERANCE,
+            'distance': round(distance, 4),
+        }), 200
+    except FaceError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print('Error:', e)
+        return jsonify({'error': 'Something went wrong'}), 500
 
-        if img1 is None or img2 is None:
+@app.route('/compare_faces/reference', methods=['POST'])
+def enroll_compare_reference():
+    """
+    Endpoint to enroll a stored image once for repeated live verification.
+
+    Request (multipart/form-data):
+        - image (file): A stored image file (JPG, JPEG, PNG) with exactly one face.
+
+    Response:
+        - 201: Returns the reference_token to send to /compare_faces instead of the image,
+          valid for expires_in seconds.
+        - 400: If the image is missing, invalid or does not contain exactly one face.
+    """
+    if 'image' not in request.files:
+        return jsonify({'error': 'No image file provided'}), 400
+
+    file = request.files['image']
+    try:
+        if imghdr.what(file) not in ['jpg', 'jpeg', 'png']:
+            return jsonify({'error': 'Invalid image format. Only JPG, JPEG, and PNG are supported'}), 400
+
+        token = enroll_reference(file.read())
+        return jsonify({'reference_token': token, 'expires_in': REFERENCE_TTL}), 201
+    except FaceError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print('Error:', e)
+        return jsonify({'error': 'Something went wrong'}), 500
+
+@app.route('/compare_faces/reference/<token>', methods=['DELETE'])
+def revoke_compare_reference(token):
+    """
+    Endpoint to invalidate an enrolled stored image.
+
+    Response:
+        - 200: If the token was revoked.
+        - 404: If the token is unknown or expired.
+    """
+    if not revoke_reference(token):
+        return jsonify({'error': 'Unknown or expired reference_token'}), 404
+    return jsonify({'message': 'Success'}), 200
+
+@app.route('/faces', methods=['POST'])
+def enroll_face():
+    """
+    Face Enrollment Endpoint
+
+    This endpoint adds a face to the identification gallery, or replaces the face of an enrolled id.
+
+    Request (multipart/form-data):
+        - id (str): Identity the face belongs to.
+        - image (file): An image file (JPG, JPEG, PNG) with exactly one face.
+
+    Response:
+        - 201: Returns the id and whether an existing face was replaced.
+        - 400: If the id or image is missing, invalid or does not contain exactly one face.
+    """
+    identity = (request.form.get('id') or '').strip()
+    if not identity:
+        return jsonify({'error': 'Missing required parameter: id'}), 400
+    if 'image' not in request.files:
+        return jsonify({'error': 'No image file provided'}), 400
+
+    file = request.files['image']
+    try:
+        if imghdr.what(file) not in ['jpg', 'jpeg', 'png']:
+            return jsonify({'error': 'Invalid image format. Only JPG, JPEG, and PNG are supported'}), 400
+
+        img = image_normalize(file)
+        if img is None:
             return {"error": "Invalid image"}, 400
 
-        # Detect faces in both images
-        face_locations1 = fetch_face_locations(img1)
-        face_locations2 = fetch_face_locations(img2)
+        replaced = gallery.enroll(identity, single_face_encoding(img, 'image'))
+        return jsonify({'id': identity, 'replaced': replaced}), 201
+    except FaceError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print('Error:', e)
+        return jsonify({'error': 'Something went wrong'}), 500
+
+@app.route('/faces/<identity>', methods=['DELETE'])
+def remove_face(identity):
+    """
+    Face Removal Endpoint
+
+    Response:
+        - 200: If the identity was removed from the gallery.
+        - 404: If the identity is not enrolled.
+    """
+    if not gallery.remove(identity):
+        return jsonify({'error': 'Identity not enrolled.'}), 404
+    return jsonify({'message': 'Success'}), 200
+
+@app.route('/faces/identify', methods=['POST'])
+def identify_face():
+    """
+    Face Identification Endpoint
+
+    This endpoint matches the face of an image against every enrolled face (1:N).
+
+    Request (multipart/form-data):
+        - image (file): An image file (JPG, JPEG, PNG) with exactly one face.
+        - k (int, optional): Number of closest identities returned, 1 to 100. Defaults to 5.
+
+    Response:
+        - 200: Returns the closest identities with their distance (lower is more similar) and whether
+          they match (distance up to FACE_MATCH_TOLERANCE), closest first, and the gallery search time.
+        - 400: If the image is missing, invalid or does not contain exactly one face.
+    """
+    if 'image' not in request.files:
+        return jsonify({'error': 'No image file provided'}), 400
+
+    k = request.form.get('k', DEFAULT_TOP_K, type=int)
+    if not 1 <= k <= MAX_TOP_K:
+        return jsonify({'error': f'k must be an integer between 1 and {MAX_TOP_K}.'}), 400
 
-        # Validate that exactly one face exists in each image
-        if len(face_locations1) != 1:
-            return jsonify({'error': 'The stored image must contain exactly one face'}), 400
-        if len(face_locations2) != 1:
-            return jsonify({'error': 'The live frame must contain exactly one face'}), 400
+    file = request.files['image']
+    try:
+        if imghdr.what(file) not in ['jpg', 'jpeg', 'png']:
+            return jsonify({'error': 'Invalid image format. Only JPG, JPEG, and PNG are supported'}), 400
 
-        # Encode faces (convert to numerical representation)
-        face_encoding1 = face_recognition.face_encodings(img1)
-        face_encoding2 = face_recognition.face_encodings(img2)
+        img = image_normalize(file)
+        if img is None:
+            return {"error": "Invalid image"}, 400
 
-        if not face_encoding1 or not face_encoding2:
-            return jsonify({'error': 'Something went wrong'}), 500
+        encoding = single_face_encoding(img, 'image')
 
-        # Compare faces
-        match_result = face_recognition.compare_faces([face_encoding1[0]], face_encoding2[0])[0]
-        # similarity_score = np.linalg.norm(face_encoding1[0] - face_encoding2[0])  # Lower score = more similar
+        start = time.perf_counter()
+        matches = gallery.identify(encoding, k)
+        search_ms = (time.perf_counter() - start) * 1000
 
         return jsonify({
-            'matched': bool(match_result),
-            # 'similarity_score': f'{100 - similarity_score * 100}%'
+            'matches': [
+                {'id': identity, 'distance': round(distance, 4), 'matched': distance <= MATCH_TOLERANCE}
+                for identity, distance in matches
+            ],
+            'gallery_size': len(gallery),
+            'search_ms': round(search_ms, 3),
         }), 200
+    except FaceError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print('Error:', e)
         return jsonify({'error': 'Something went wrong'}), 500
@@ -242,4 +643,6 @@ def sentiment_analyzers():
     return jsonify([{ "YouTube": "ytb" }])
 
 if __name__ == '__main__':
+    # Resolve chromedriver once before serving, so no request pays for it
+    resolve_driver_path()
     app.run(debug=True, host='0.0.0.0', ssl_context=('cert.pem', 'key.pem'))
@@ -1,159 +1,209 @@
-from bs4 import BeautifulSoup
-from datetime import datetime
+from async_engine import fetch, run_blocking, run_in_thread, run_sync, FetchError
+from browser_pool import get_html_selenium
+from extract_spec import Field, ItemSpec, text_of
+from functools import partial
+import json
 import os
-import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, Alignment
-import random
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-import time
-import uuid
-from webdriver_manager.chrome import ChromeDriverManager
-
-
-def get_html_selenium(url, scroll_pause=0.5, scroll_step=300):
+import re
+from scraper_utils import parse_html, dump_debug_page, collect_pages, DEFAULT_LIMIT
+
+
+# Scraper name used for debug dumps
+SOURCE = "myntra"
+
+# Result cards on a full search page, the most Chrome ever scrolls for
+PAGE_SIZE = 50
+
+# Element holding the rendered search results. Pages are parsed whole: restricting the
+# parse to this container measured no faster on Myntra pages
+RESULTS_CONTAINER_CLASS = "results-base"
+
+# Plain-HTTP fast path reading the JSON state embedded in the search page (MYNTRA_FAST_PATH=0 always renders in Chrome)
+FAST_PATH_ENABLED = os.environ.get("MYNTRA_FAST_PATH", "1").strip().lower() not in ("0", "false", "no")
+EMBEDDED_STATE_PATTERN = re.compile(r"window\.__myx\s*=\s*")
+
+# Fields of one rendered result card, read in a single walk over its subtree
+PRODUCT_SPEC = ItemSpec(
+    Name=Field(cls="product-product"),
+    Image=Field(tag="img", parent="picture", attr="src"),
+    Price=Field(cls="product-discountedPrice"),
+    Rating=Field(cls="product-ratingsContainer", get=lambda rating: text_of(rating.find("span"))),
+    Link=Field(tag="a", attr="href"),
+)
+
+def extract_embedded_products(content):
     """
-    Fetches the full HTML source of a webpage using headless Selenium with smooth scrolling.
+    Pulls the product list out of the window.__myx state blob of a search page.
 
     Args:
-        url (str): The target URL.
-        scroll_pause (float): Time to pause (in seconds) between scrolls.
-        scroll_step (int): Number of pixels to scroll per step.
+        content (bytes | str): Raw HTML of the search page.
+
+    Returns:
+        list | None: Raw product objects, or None if the blob is missing or unreadable.
     """
-    options = Options()
-    options.add_argument("--headless")  # Run in background
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36")
-
-    # Setup WebDriver
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    
-    # Open URL
-    driver.get(url)
-    
-    # Wait for JavaScript content to load (Optional)
-    driver.implicitly_wait(5)
-
-    # Get total page height
-    last_height = driver.execute_script("return document.body.scrollHeight")
-
-    while True:
-        for _ in range(0, last_height, scroll_step):
-            driver.execute_script(f"window.scrollBy(0, {scroll_step});")
-            time.sleep(scroll_pause)  # Pause for data to load
-
-        # Allow time for new content to load
-        time.sleep(1)
-
-        # Calculate new scroll height after scrolling
-        new_height = driver.execute_script("return document.body.scrollHeight")
-
-        # Break if no new content is loaded
-        if new_height == last_height:
-            break
-        last_height = new_height
-
-    # Get full page source
-    page_source = driver.page_source
-    
-    # Close driver
-    driver.quit()
-    
-    return page_source
+    if isinstance(content, bytes):
+        content = content.decode("utf-8", errors="replace")
 
-def scrape(s_url, url, products_scrape):
+    match = EMBEDDED_STATE_PATTERN.search(content)
+    if not match:
+        return None
+
+    try:
+        # raw_decode stops at the end of the object, so the rest of the script is ignored
+        state, _ = json.JSONDecoder().raw_decode(content, match.end())
+        products = state["searchData"]["results"]["products"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+    return products if isinstance(products, list) else None
+
+def scrape_embedded_products(content, products_scrape, url, on_item=None):
+    """
+    Maps the embedded product objects to the same shape as scrape_products.
+
+    Returns:
+        list | int | None: Scraped products, 0 if the page has no results, None if the blob is missing.
+    """
+    products = extract_embedded_products(content)
+    if products is None:
+        return None
+    if not products:
+        return 0
+
+    scrapped_products = []
+    for i, product in enumerate(products[:products_scrape]):
+        product_link = product.get("landingPageUrl") or ""
+        if not product_link:
+            continue
+
+        rating = product.get("rating") or 0
+        price = product.get("price") or product.get("mrp") or ""
+
+        product_data = {
+            "SNo": i + 1,
+            "Name": product.get("additionalInfo") or product.get("productName") or "",
+            "Image": product.get("searchImage") or "",
+            "Price": f"Rs. {price}" if price != "" else "",
+            "Rating": f"{rating:.1f}" if rating else "",
+            "Link": url + '/' + product_link,
+        }
+
+        scrapped_products.append(product_data)
+        if on_item:
+            on_item(product_data)
+
+    print(f"⚡ {len(scrapped_products)} {'product' if len(scrapped_products) == 1 else 'products'} read from embedded page data.\n")
+    return scrapped_products
+
+async def scrape_fast_async(s_url, url, products_scrape, on_item=None):
+    """
+    Scrapes products over plain HTTP from the embedded page JSON, without a browser.
+
+    Returns:
+        list | int | None: Scraped products, 0 if the page has no results, None if the
+        blob is missing or the fetch failed (caller should fall back to Selenium).
+    """
+    try:
+        response = await fetch(s_url)
+        return await run_in_thread(scrape_embedded_products, response.content, products_scrape, url, on_item)
+    except FetchError as fetch_err:
+        print(f"⚠️  Fast path request failed: {fetch_err}\n")
+    except Exception as err:
+        print(f"⚠️  Fast path failed: {err}\n")
+    return None
+
+async def scrape_async(s_url, url, products_scrape=None, on_item=None, target_count=None):
     """
-    Scrapes product data from the given search URL and saves the page locally.
+    Scrapes product data from the given search URL on the async engine.
 
     Args:
         s_url (str): The search URL to scrape.
         url (str): Main domain URL.
-        products_scrape (int, optional): Number of products to scrape. Default is 10.
+        products_scrape (int, optional): Number of products to scrape, every product of the page if None.
+        on_item (callable, optional): Called with each product as soon as it is extracted.
+        target_count (int, optional): Number of products needed from the page, Chrome stops
+            scrolling once that many are rendered. Defaults to products_scrape.
 
     Returns:
-        bool: True if scraping is successful, False otherwise.
+        list | int | None: Scraped products, 0 if none were found, None on failure.
     """
-    print(f"🔍 Scraping {products_scrape} {'products' if products_scrape > 1 else 'product'} from {s_url}...\n")
+    print(f"🔍 Scraping {products_scrape or 'all'} {'product' if products_scrape == 1 else 'products'} from {s_url}...\n")
 
-    try:
-        # Generate a unique filename for storing the response
-        file_name = f"{uuid.uuid4()}.html"
-        file_path = os.path.join("temp_files", file_name)
+    # Try the embedded JSON first, it needs no browser
+    if FAST_PATH_ENABLED:
+        result = await scrape_fast_async(s_url, url, products_scrape, on_item)
+        if result is not None:
+            return result
+        print("↪️  Embedded product data not available, falling back to Selenium\n")
 
-        # Get html content to selenium
-        html_content = get_html_selenium(s_url)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-
-        # Call function to extract product details
-        result = scrape_products(file_path, products_scrape, url)
+    target_count = min(target_count or products_scrape or PAGE_SIZE, PAGE_SIZE)
+    try:
+        # Get html content to selenium (bounded by the per-domain concurrency limit),
+        # scrolling only until enough result nodes are rendered
+        html_content = await run_blocking(
+            s_url,
+            partial(get_html_selenium, s_url, target_selector=".results-base", target_count=target_count),
+        )
+
+        # Call function to extract product details straight from the page source
+        result = await run_in_thread(scrape_products, html_content, products_scrape, url, on_item)
+        if not result:
+            dump_debug_page(html_content, SOURCE)
         return result
     except Exception as err:
         print(f"❌ [ERROR] Unexpected Error: {err}\n")
     return None
 
-def scrape_products(file_path, products_scrape, url):
+def scrape(s_url, url, products_scrape):
     """
-    Extracts product information from the stored HTML file and saves it in Excel.
-
-    Args:
-        file_path (str): Path to the stored HTML file.
-        products_scrape (int): Number of products to extract.
+    Sync wrapper around scrape_async.
     """
-    # Define HTML class names for product attributes
-    products_container_class = "results-base"
-    products_name_class = "product-product"
-    products_price_class = "product-discountedPrice"
-    products_rating_class = "product-ratingsContainer"
+    return run_sync(scrape_async(s_url, url, products_scrape))
 
-    # Read the saved HTML file
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
+def scrape_products(content, products_scrape, url, on_item=None):
+    """
+    Extracts product information from the page content.
 
-    soup = BeautifulSoup(content, "html.parser")
+    Args:
+        content (str): Rendered HTML page source.
+        products_scrape (int | None): Number of products to extract, all of them if None.
+        url (str): Main domain URL.
+        on_item (callable, optional): Called with each product as soon as it is extracted.
+    """
+    soup = parse_html(content)
 
+    scrapped_products = []
     try:
         # Locate the product container
-        products_container = soup.find(class_=products_container_class)
+        products_container = soup.find(class_=RESULTS_CONTAINER_CLASS)
 
         products = products_container.children
         if not products:
-            # Clean up the temporary file after scraping
-            clean(file_path)
             return 0
 
 
         # Limit to requested count
         products = list(products)[:products_scrape]
 
-        scrapped_products = []
-
         # Extract details for each product
         for i, product in enumerate(products):
-            product_name = product.find(class_=products_name_class).text if product.find(class_=products_name_class) else ""
-            product_image = product.find("picture").find("img").attrs.get("src") if product.find("picture") and product.find("picture").find("img") else ""
-            product_price = product.find(class_=products_price_class).text if product.find(class_=products_price_class) else ""
-            product_rating = product.find(class_=products_rating_class).find("span").text if product.find(class_=products_rating_class) else ""
-            product_link = product.find("a").attrs.get('href') if product.find("a") else ""
+            fields = PRODUCT_SPEC.extract(product)
 
-            if (product_name == "" and product_price == "" and product_link == "") or product_link == "":
+            if fields["Link"] == "":
                 continue
 
             product_data = {
                 "SNo": i + 1,
-                "Name": product_name,
-                "Image": product_image,
-                "Price": product_price,
-                "Rating": product_rating,
-                "Link": url + '/' + product_link,
+                "Name": fields["Name"],
+                "Image": fields["Image"],
+                "Price": fields["Price"],
+                "Rating": fields["Rating"],
+                "Link": url + '/' + fields["Link"],
             }
 
             scrapped_products.append(product_data)
+            if on_item:
+                on_item(product_data)
 
     except AttributeError as attr_err:
         print(f"❌ Attribute Error: {attr_err}\n")
@@ -163,112 +213,44 @@ def scrape_products(file_path, products_scrape, url):
         print(f"❌ Unexpected Error: {err}\n")
         return None
 
-    # Clean up the temporary file after scraping
-    clean(file_path)
-
     # Save extracted products to an Excel file
-    # save_to_excel(scrapped_products)
-    print(f"✅ {len(scrapped_products)} {'products' if products_scrape > 1 else 'product'} scrapped successfully.\n")
+    # save_export(scrapped_products, "scraped_products")
+    print(f"✅ {len(scrapped_products)} {'product' if len(scrapped_products) == 1 else 'products'} scrapped successfully.\n")
     return scrapped_products
 
-def save_to_excel(products):
+async def start_myntra_scrapper_async(search_key, limit=DEFAULT_LIMIT, offset=0, on_item=None):
     """
-    📊 Saves the scraped product data into an Excel file with improved formatting.
-
-    Features:
-    ✅ Auto-adjusts column widths based on content.
-    ✅ Bold headers for better readability.
-    ✅ Center-aligns the headers.
+    Start scrapping on the async engine
 
     Args:
-        products (list of dict): List containing product details.
+        search_key (str): The keyword to search for.
+        limit (int): Number of products to return.
+        offset (int): Number of products to skip.
+        on_item (callable, optional): Called with each product of the window as soon as it is extracted.
     """
+    url = "https://www.myntra.com"
 
-    df = pd.DataFrame(products)
-
-    # Generate a timestamped filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_name = f"scraped_products_{timestamp}.xlsx"
-
-    # Save the DataFrame to Excel
-    df.to_excel(file_name, index=False, engine="openpyxl")
-
-    # Load the workbook to format it
-    wb = load_workbook(file_name)
-    ws = wb.active
-
-    # Apply formatting
-    for col_num, col in enumerate(ws.columns, 1):
-        max_length = 0
-        column_letter = get_column_letter(col_num)
-
-        # Determine max content width
-        for cell in col:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-
-        adjusted_width = max_length + 2  # Extra padding
-        ws.column_dimensions[column_letter].width = min(adjusted_width, 50)  # Limit max width
-
-    # Style headers
-    header_font = Font(bold=True)
-    for cell in ws[1]:  
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center")
+    # Construct search URL
+    search_url = f"{url}/{search_key}"
 
-    # Wrap text in the "Description" column
-    for row in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=ws.max_column, max_col=ws.max_column):
-        for cell in row:
-            cell.alignment = Alignment(wrap_text=True)
+    async def scrape_page(page, wanted, on_page_item):
+        # Keep whatever the page holds (collect_pages trims it to the requested window),
+        # but only make Chrome scroll for the products this page has to supply
+        return await scrape_async(f"{search_url}?p={page}", url, None, on_page_item, target_count=wanted)
 
-    # Save the formatted file
-    wb.save(file_name)
-    print(f"📁 Data successfully saved and formatted in {file_name} ✅\n")
+    # Fetch the result pages covering the requested window
+    result = await collect_pages(scrape_page, limit, offset, on_item=on_item)
 
-def clean(file_path):
-    """
-    🗑️ Cleans up temporary files after scraping.
+    return result
 
-    Args:
-        file_path (str): The path of the temporary file to delete.
-    """
-    try:
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            print(f"🧹 Successfully deleted temporary file: {file_path}\n")
-        else:
-            print(f"⚠️  File not found: {file_path}\n")
-    except Exception as e:
-        print(f"❌ Error while deleting file {file_path}: {e}\n")
-
-def start_myntra_scrapper(search_key):
+def start_myntra_scrapper(search_key, limit=DEFAULT_LIMIT, offset=0):
     """
     Start scrapping
     """
-    # Ensure the 'temp_files' directory exists
-    os.makedirs("temp_files", exist_ok=True)
-
-    # Generate a random number between 1 - 50
-    products_scrape = random.randint(1, 50)
-
-    url = "https://www.myntra.com"
-
-    # Construct search URL
-    search_url = f"{url}/{search_key}"
-
-    # Call the scrape function with the provided number of products
-    result = scrape(search_url, url, products_scrape)
-
-    return result
+    return run_sync(start_myntra_scrapper_async(search_key, limit=limit, offset=offset))
 
 
 if __name__ == "__main__":
-    # Ensure the 'temp_files' directory exists
-    os.makedirs("temp_files", exist_ok=True)
-
     url = "https://www.myntra.com"
 
     # Get search query from user
@@ -0,0 +1,295 @@
+import atexit
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+from result_cache import normalize_search_key
+
+
+# Price history store tuning (override through environment variables)
+DB_PATH = os.environ.get("PRICE_DB_PATH", os.path.join("temp_files", "prices.db"))
+BATCH_SIZE = int(os.environ.get("PRICE_DB_BATCH_SIZE", 500))  # Rows written per transaction
+FLUSH_INTERVAL = float(os.environ.get("PRICE_DB_FLUSH_INTERVAL", 2))  # Max seconds a row waits before being written
+MAX_PENDING = int(os.environ.get("PRICE_DB_MAX_PENDING", 20000))  # Rows waiting for the writer before new ones are dropped
+
+# Sources whose items are products with a price
+PRODUCT_SOURCES = ('amazon', 'flipkart', 'myntra')
+
+PRICE_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?")
+AMAZON_ASIN_PATTERN = re.compile(r"/(?:dp|gp/product)/([A-Z0-9]{10})")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_history (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    link TEXT NOT NULL,
+    name TEXT,
+    price INTEGER,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_price_history_source_link_ts ON price_history (source, link, ts);
+
+CREATE TABLE IF NOT EXISTS latest_listing (
+    search_key TEXT NOT NULL,
+    source TEXT NOT NULL,
+    link TEXT NOT NULL,
+    name TEXT,
+    image TEXT,
+    rating TEXT,
+    price INTEGER,
+    ts REAL NOT NULL,
+    PRIMARY KEY (search_key, source, link)
+);
+CREATE INDEX IF NOT EXISTS idx_latest_listing_search_key_price ON latest_listing (search_key, price);
+CREATE INDEX IF NOT EXISTS idx_latest_listing_price ON latest_listing (price);
+
+CREATE TABLE IF NOT EXISTS latest_price (
+    source TEXT NOT NULL,
+    link TEXT NOT NULL,
+    name TEXT,
+    image TEXT,
+    rating TEXT,
+    price INTEGER,
+    ts REAL NOT NULL,
+    PRIMARY KEY (source, link)
+);
+CREATE INDEX IF NOT EXISTS idx_latest_price_price ON latest_price (price);
+"""
+
+# Fills latest_price from latest_listing in stores created before it existed (SQLite takes
+# the other columns from the row holding MAX(ts))
+BACKFILL_LATEST_PRICE = """
+INSERT OR IGNORE INTO latest_price (source, link, name, image, rating, price, ts)
+SELECT source, link, name, image, rating, price, MAX(ts) FROM latest_listing GROUP BY source, link
+"""
+
+
+def parse_price(text):
+    """
+    Parses a displayed price into whole rupees, e.g. "Rs.1,299" -> 1299, "₹10,000" -> 10000.
+
+    Returns:
+        int | None: The price, or None if the text holds no number.
+    """
+    if not text:
+        return None
+    match = PRICE_PATTERN.search(str(text))
+    if not match:
+        return None
+    return int(float(match.group().replace(",", "")))
+
+def normalize_link(source, link):
+    """
+    Reduces a product link to what identifies the product, so the same product seen in
+    different searches gets one price history. Search results carry per-search tracking
+    parameters (Amazon ref=sr_1_N, qid, sr; Flipkart iid, ssid, qH) that change every time.
+
+    - amazon: https://www.amazon.in/dp/<ASIN>, also for sponsored redirect links
+    - flipkart: the product path and its pid
+    - myntra: the product path, without the query string
+
+    Returns:
+        str: The normalized link, or the link unchanged if it has no known shape.
+    """
+    if not link:
+        return link
+    parts = urlsplit(link)
+    base = f"{parts.scheme}://{parts.netloc}" if parts.netloc else ""
+
+    if source == 'amazon':
+        # Sponsored results link through /sspa/click?url=<encoded product path>
+        match = AMAZON_ASIN_PATTERN.search(unquote(link))
+        return f"{base}/dp/{match.group(1)}" if match else link
+    if source == 'flipkart':
+        pid = parse_qs(parts.query).get("pid")
+        return f"{base}{parts.path}?pid={pid[0]}" if pid else f"{base}{parts.path}"
+    if source == 'myntra':
+        return f"{base}{parts.path}"
+    return link
+
+
+class PriceStore:
+    """
+    SQLite store of every scraped product price.
+
+    Scrapes only queue their rows; a background thread writes them in batches of up
+    to BATCH_SIZE rows (or every FLUSH_INTERVAL seconds) in a single transaction, so
+    the request path never waits for the disk. price_history keeps every observation,
+    indexed by (source, link, ts), latest_listing the last one per search result and
+    latest_price the last one per product (whatever search found it), both indexed by
+    price, so every query is answered from an index.
+    """
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._pending = queue.Queue(maxsize=MAX_PENDING)
+        self._local = threading.local()
+        self._stats = {"queued": 0, "written": 0, "dropped": 0, "batches": 0, "errors": 0}
+        self._stats_lock = threading.Lock()  # Counted from request threads and the writer
+        self._closed = threading.Event()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            if conn.execute("SELECT 1 FROM latest_price LIMIT 1").fetchone() is None:
+                conn.execute(BACKFILL_LATEST_PRICE)
+
+        self._writer = threading.Thread(target=self._write_loop, name="price-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")  # Readers never wait for the writer
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self):
+        # One read connection per thread, sqlite3 connections are not shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            conn.row_factory = sqlite3.Row
+        return conn
+
+    def record(self, source, search_key, items):
+        """
+        Queues the products of a scrape for writing. Never blocks.
+        """
+        if source not in PRODUCT_SOURCES or not items:
+            return
+
+        now = time.time()
+        search_key = normalize_search_key(search_key)
+        for item in items:
+            link = normalize_link(source, item.get("Link"))
+            if not link:
+                continue
+            row = (search_key, source, link, item.get("Name"), item.get("Image"), item.get("Rating"),
+                   parse_price(item.get("Price")), now)
+            try:
+                self._pending.put_nowait(row)
+                self._count("queued")
+            except queue.Full:
+                self._count("dropped")
+
+    def _count(self, name, n=1):
+        with self._stats_lock:
+            self._stats[name] += n
+
+    def _write_loop(self):
+        conn = self._connect()
+        while not (self._closed.is_set() and self._pending.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO price_history (source, link, name, price, ts) VALUES (?, ?, ?, ?, ?)",
+                        [(source, link, name, price, ts) for _, source, link, name, _, _, price, ts in batch],
+                    )
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO latest_listing (search_key, source, link, name, image, rating, price, ts) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        batch,
+                    )
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO latest_price (source, link, name, image, rating, price, ts) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [row[1:] for row in batch],
+                    )
+                self._count("written", len(batch))
+                self._count("batches")
+            except sqlite3.Error as err:
+                self._count("errors")
+                print(f"❌ [ERROR] Price store write failed: {err}\n")
+        conn.close()
+
+    def _next_batch(self):
+        """
+        Waits for the first pending row, then collects more until BATCH_SIZE or FLUSH_INTERVAL.
+        """
+        try:
+            batch = [self._pending.get(timeout=FLUSH_INTERVAL)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while len(batch) < BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._closed.is_set():
+                break
+            try:
+                batch.append(self._pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def price_history(self, source, link, since=None, limit=1000):
+        """
+        Returns the recorded prices of one product, oldest first.
+
+        Args:
+            source (str): The source the product was scraped from.
+            link (str): The product link, as returned by the scraper (normalized, see normalize_link).
+            since (float, optional): Only observations after this epoch timestamp.
+            limit (int): Max observations returned (the most recent ones).
+        """
+        rows = self._reader().execute(
+            "SELECT ts, price, name FROM price_history WHERE source = ? AND link = ? AND ts >= ? "
+            "ORDER BY ts DESC LIMIT ?",
+            (source, normalize_link(source, link), since or 0, limit),
+        ).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def cheapest(self, search_key=None, source=None, max_age=None, limit=20):
+        """
+        Returns the cheapest listings by their latest observed price.
+
+        Without search_key every product is listed once, at its latest price whatever
+        search found it (latest_price); with it, at its latest price in that search.
+
+        Args:
+            search_key (str, optional): Only listings found for this search.
+            source (str, optional): Only listings of this source.
+            max_age (float, optional): Only listings seen in the last max_age seconds.
+            limit (int): Number of listings returned.
+        """
+        clauses = ["price IS NOT NULL"]
+        params = []
+        if search_key:
+            clauses.append("search_key = ?")
+            params.append(normalize_search_key(search_key))
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        if max_age:
+            clauses.append("ts >= ?")
+            params.append(time.time() - max_age)
+
+        table = "latest_listing" if search_key else "latest_price"
+        rows = self._reader().execute(
+            f"SELECT source, link, name, image, rating, price, ts FROM {table} "
+            f"WHERE {' AND '.join(clauses)} ORDER BY price LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        return {**stats, "pending": self._pending.qsize(), "db_path": self.db_path}
+
+    def close(self):
+        """
+        Writes the rows still pending and stops the writer.
+        """
+        self._closed.set()
+        self._writer.join(timeout=FLUSH_INTERVAL + 5)
+
+
+# Shared price history store
+prices = PriceStore()
+atexit.register(prices.close)
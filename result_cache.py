@@ -0,0 +1,138 @@
+from collections import OrderedDict
+import json
+import os
+import threading
+import time
+
+
+# Result cache tuning (override through environment variables)
+MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", 64 * 1024 * 1024))  # Total size limit of cached results
+DEFAULT_TTL = int(os.environ.get("RESULT_CACHE_TTL", 300))  # Seconds, for sources without their own TTL
+
+# Per-source TTLs in seconds (e.g. RESULT_CACHE_TTL_G_NEWS=60)
+SOURCE_TTLS = {
+    'amazon': int(os.environ.get("RESULT_CACHE_TTL_AMAZON", 300)),
+    'flipkart': int(os.environ.get("RESULT_CACHE_TTL_FLIPKART", 300)),
+    'myntra': int(os.environ.get("RESULT_CACHE_TTL_MYNTRA", 600)),
+    'g-news': int(os.environ.get("RESULT_CACHE_TTL_G_NEWS", 120)),  # News goes stale fastest
+}
+
+
+def normalize_search_key(search_key):
+    """
+    Normalizes a search key for cache lookups: trimmed, case-folded, whitespace-collapsed.
+    """
+    return " ".join(search_key.split()).casefold()
+
+def estimate_size(value):
+    """
+    Approximates the memory cost of a cached value by its serialized size in bytes.
+    """
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL and a total size limit in bytes.
+
+    Expired entries are not served by get() but are kept until evicted, so they stay
+    available to get_stale() as a fallback.
+    """
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size, stored_at, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "stale_hits": 0}
+
+    def get(self, key):
+        """
+        Returns (value, age in seconds) for a fresh entry, or None.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            value, _, stored_at, expires_at = entry
+            if now >= expires_at:
+                self._stats["misses"] += 1
+                self._stats["expired"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value, now - stored_at
+
+    def get_stale(self, key):
+        """
+        Returns (value, age in seconds) even if the entry has expired, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._stats["stale_hits"] += 1
+            return entry[0], time.time() - entry[2]
+
+    def set(self, key, value, ttl, size=None):
+        """
+        Stores a value, evicting least recently used entries to stay within max_bytes.
+        """
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = (value, size, now, now + ttl)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size, _, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats["evictions"] += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+            return entry is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Shared cache of scraper results
+cache = TTLCache()
+
+
+def cache_key(search_from, search_key, options=None):
+    """
+    Builds the cache key of a scrape: source, normalized search key and the options that change the result.
+    """
+    extra = tuple(sorted((k, v) for k, v in (options or {}).items() if v is not None))
+    return (search_from, normalize_search_key(search_key)) + extra
+
+def source_ttl(search_from):
+    return SOURCE_TTLS.get(search_from, DEFAULT_TTL)
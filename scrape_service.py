@@ -0,0 +1,330 @@
+import asyncio
+import queue
+import time
+from amazon import start_amazon_scrapper_async
+from async_engine import get_loop, run_sync, SYNC_TIMEOUT
+from flipkart import start_flipkart_scrapper_async
+from google_news import start_g_news_scrapper_async, BACKENDS as G_NEWS_BACKENDS
+from governor import is_open
+from job_queue import jobs
+from myntra import start_myntra_scrapper_async
+import os
+from price_store import prices
+from result_cache import cache, cache_key, source_ttl
+from singleflight import SingleFlight
+
+
+# Supported sources mapped to their async scrapper entry points
+SCRAPERS = {
+    'amazon': start_amazon_scrapper_async,
+    'flipkart': start_flipkart_scrapper_async,
+    'myntra': start_myntra_scrapper_async,
+    'g-news': start_g_news_scrapper_async,
+}
+SEARCH_RESOURCES = list(SCRAPERS)
+
+# Upstream domain of each source, whose circuit breakers decide if it is worth trying
+SOURCE_DOMAINS = {
+    'amazon': 'www.amazon.in',
+    'flipkart': 'www.flipkart.com',
+    'myntra': 'www.myntra.com',
+    'g-news': 'news.google.com',
+}
+
+# Kinds of upstream calls each source can make (see governor.DomainGovernor), a source is
+# only skipped while all of them are failing: Myntra and Google News fall back to Selenium
+SOURCE_CALLS = {
+    'amazon': ('fetch',),
+    'flipkart': ('fetch',),
+    'myntra': ('fetch', 'blocking'),
+    'g-news': ('fetch', 'blocking'),
+}
+
+# Columns of the items of each source, in export order
+PRODUCT_COLUMNS = ('SNo', 'Name', 'Image', 'Price', 'Rating', 'Link')
+SOURCE_COLUMNS = {
+    'amazon': PRODUCT_COLUMNS,
+    'flipkart': PRODUCT_COLUMNS + ('Description',),
+    'myntra': PRODUCT_COLUMNS,
+    'g-news': ('SNo', 'Provider', 'Title', 'Image', 'Time', 'Link'),
+}
+
+# Per-request options understood by every source, and by specific sources
+COMMON_OPTIONS = ('limit', 'offset')
+SOURCE_OPTIONS = {
+    'g-news': ('backend',),
+}
+
+# Upper bound (in seconds) for one shared upstream scrape, per source
+SOURCE_TIMEOUTS = {
+    'amazon': float(os.environ.get("SCRAPE_TIMEOUT_AMAZON", 30)),
+    'flipkart': float(os.environ.get("SCRAPE_TIMEOUT_FLIPKART", 30)),
+    'myntra': float(os.environ.get("SCRAPE_TIMEOUT_MYNTRA", 90)),
+    'g-news': float(os.environ.get("SCRAPE_TIMEOUT_G_NEWS", 90)),
+}
+
+# Identical searches in flight at the same time share one upstream scrape
+flights = SingleFlight()
+
+
+def resolve_sources(search_from):
+    """
+    Normalizes the search_from request parameter into a list of sources.
+
+    Args:
+        search_from (str | list): A single source, 'all', or a list of sources.
+
+    Returns:
+        list | None: Unique sources in request order, or None if any of them is unsupported or not a string.
+    """
+    if search_from == 'all':
+        return list(SEARCH_RESOURCES)
+
+    sources = [search_from] if isinstance(search_from, str) else search_from
+    if not isinstance(sources, list) or not sources:
+        return None
+
+    resolved = []
+    for source in sources:
+        # Checked first: unhashable elements (e.g. a nested list) would raise on the lookup
+        if not isinstance(source, str) or source not in SCRAPERS:
+            return None
+        if source not in resolved:
+            resolved.append(source)
+    return resolved
+
+def _source_kwargs(search_from, options):
+    """
+    Picks the request options the given source understands.
+    """
+    allowed = COMMON_OPTIONS + SOURCE_OPTIONS.get(search_from, ())
+    return {key: value for key, value in (options or {}).items() if key in allowed and value is not None}
+
+async def _scrape_and_cache(search_from, search_key, kwargs, key, on_item=None):
+    """
+    Scrapes upstream once, caches a successful result and records its prices.
+    """
+    result = await SCRAPERS[search_from](search_key, **kwargs, on_item=on_item)
+
+    # Only successful scrapes are worth keeping
+    if result:
+        cache.set(key, result, source_ttl(search_from))
+        prices.record(search_from, search_key, result)
+    return result
+
+async def run_source(search_from, search_key, options=None, use_cache=True, on_item=None):
+    """
+    Runs one scraper (or answers from the result cache) and wraps its outcome with status and timing.
+
+    While every upstream circuit of the source is open the scraper is not run at all, and when
+    the scrape fails an expired cached result is served instead, flagged as stale. If it fails
+    after some items already went out through on_item, those items are the result instead
+    (status 'partial'), so a stream never gets them twice.
+
+    Args:
+        search_from (str): The source to scrape.
+        search_key (str): The keyword to search for.
+        options (dict, optional): Per-request options, only those the source understands are used.
+        use_cache (bool): Set to False to bypass cached results. Fresh results are still cached.
+        on_item (callable, optional): Called with each item of the result as soon as it is available.
+
+    Returns:
+        dict: {'status': 'ok' | 'partial' | 'empty' | 'error', 'elapsed_ms', 'count', 'cached', 'stale', 'coalesced', 'age', 'data'}
+    """
+    start = time.perf_counter()
+    kwargs = _source_kwargs(search_from, options)
+    key = cache_key(search_from, search_key, kwargs)
+    coalesced = stale = partial = False
+
+    emitted = []
+    done = False
+
+    def emit(item):
+        # A shared scrape outliving this call (e.g. after a timeout) must not emit into it anymore
+        if not done:
+            emitted.append(item)
+            on_item(item)
+
+    cached = cache.get(key) if use_cache else None
+    if cached is not None:
+        result, age = cached
+    elif is_open(SOURCE_DOMAINS[search_from], SOURCE_CALLS[search_from]):
+        print(f"🚧 [ERROR] {search_from} is failing, skipping the scrape\n")
+        result, age = None, None
+    else:
+        age = None
+        try:
+            result, coalesced = await flights.do(
+                key,
+                lambda: _scrape_and_cache(search_from, search_key, kwargs, key, emit if on_item else None),
+                timeout=SOURCE_TIMEOUTS.get(search_from),
+            )
+        except asyncio.TimeoutError:
+            print(f"⏳ [ERROR] {search_from} scraper timed out after {SOURCE_TIMEOUTS.get(search_from)}s\n")
+            result = None
+        except Exception as err:
+            print(f"❌ [ERROR] {search_from} scraper failed: {err}\n")
+            result = None
+    done = True
+
+    # Items already streamed are what the caller got, replaying a stale result would repeat them
+    if result is None and emitted:
+        result, partial = list(emitted), True
+
+    # Better an expired result than nothing while the upstream is failing
+    if result is None:
+        stale_entry = cache.get_stale(key)
+        if stale_entry is not None:
+            result, age = stale_entry
+            stale = True
+
+    # Cached, stale and coalesced results were extracted elsewhere, hand them over in one go
+    if on_item and result and (cached is not None or stale or coalesced):
+        for item in result:
+            on_item(item)
+
+    if result is None:
+        status = 'error'
+    elif partial:
+        status = 'partial'
+    elif not result:
+        status = 'empty'
+    else:
+        status = 'ok'
+
+    return {
+        'status': status,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+        'count': len(result) if result else 0,
+        'cached': cached is not None or stale,
+        'stale': stale,
+        'coalesced': coalesced,
+        'age': round(age, 1) if age is not None else None,
+        'data': result,
+    }
+
+async def run_sources(sources, search_key, options=None, use_cache=True):
+    """
+    Runs several scrapers concurrently, so total latency tracks the slowest source.
+
+    Returns:
+        dict: Per-source outcome keyed by source name, in request order.
+    """
+    outcomes = await asyncio.gather(*(run_source(source, search_key, options, use_cache) for source in sources))
+    return dict(zip(sources, outcomes))
+
+def scrape_source(search_from, search_key, options=None, use_cache=True):
+    """
+    Sync wrapper around run_source, returning the single-source outcome.
+    """
+    return run_sync(run_source(search_from, search_key, options, use_cache))
+
+async def search_sources(sources, search_key, options=None, use_cache=True):
+    """
+    Runs several scrapers concurrently and merges their outcomes into the fan-out response.
+
+    Returns:
+        dict: {'search_key', 'elapsed_ms', 'results'} with per-source outcomes keyed by source.
+    """
+    start = time.perf_counter()
+    results = await run_sources(sources, search_key, options, use_cache)
+    for outcome in results.values():
+        outcome['data'] = outcome['data'] or []
+    return {
+        'search_key': search_key,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+        'results': results,
+    }
+
+def scrape_sources(sources, search_key, options=None, use_cache=True):
+    """
+    Sync wrapper around search_sources, returning the merged fan-out response.
+    """
+    return run_sync(search_sources(sources, search_key, options, use_cache))
+
+def submit_search(sources, search_key, options=None, use_cache=True, priority='normal', callback_url=None):
+    """
+    Queues a search as a background job instead of running it in the request.
+
+    The job result is the same merged response as scrape_sources.
+
+    Returns:
+        Job: The queued job.
+
+    Raises:
+        QueueFull: If the job queue is full.
+    """
+    return jobs.submit(
+        lambda: search_sources(sources, search_key, options, use_cache),
+        priority=priority,
+        callback_url=callback_url,
+        meta={'search_key': search_key, 'sources': sources},
+    )
+
+def export_columns(sources):
+    """
+    Returns the export columns of the given sources, led by a 'Source' column when there are several.
+    """
+    columns = {'Source': None} if len(sources) > 1 else {}
+    for source in sources:
+        columns.update(dict.fromkeys(SOURCE_COLUMNS[source]))
+    return list(columns)
+
+def export_items(sources, search_key, options=None, use_cache=True):
+    """
+    Runs several scrapers concurrently and yields their items as export rows as soon as they are extracted.
+
+    Rows carry their 'Source' when there are several sources, see export_columns().
+    """
+    for kind, source, item in stream_sources(sources, search_key, options, use_cache):
+        if kind == 'item':
+            yield {'Source': source, **item} if len(sources) > 1 else item
+
+def stream_sources(sources, search_key, options=None, use_cache=True):
+    """
+    Runs several scrapers concurrently and yields their items as soon as they are extracted.
+
+    Yields:
+        tuple: ('item', source, item) for every item, ('source', source, outcome) when a
+        source finishes (outcome without 'data'), and finally ('summary', None, summary).
+    """
+    start = time.perf_counter()
+    events = queue.Queue()
+
+    async def run_one(source):
+        outcome = await run_source(
+            source, search_key, options, use_cache,
+            on_item=lambda item: events.put(('item', source, item)),
+        )
+        outcome.pop('data')
+        events.put(('source', source, outcome))
+
+    async def run_all():
+        await asyncio.gather(*(run_one(source) for source in sources))
+
+    # Scrapers run on the engine loop and push their events here from worker threads
+    future = asyncio.run_coroutine_threadsafe(run_all(), get_loop())
+
+    results = {}
+    try:
+        while len(results) < len(sources):
+            try:
+                kind, source, payload = events.get(timeout=SYNC_TIMEOUT)
+            except queue.Empty:
+                print(f"⏳ [ERROR] Stream timed out after {SYNC_TIMEOUT}s\n")
+                break
+
+            if kind == 'source':
+                results[source] = payload
+            yield kind, source, payload
+    finally:
+        # Client went away or the stream timed out: stop waiting. A scrape nobody else waits
+        # for is cancelled with it, one shared with other callers keeps running for them
+        if not future.done():
+            future.cancel()
+
+    yield 'summary', None, {
+        'search_key': search_key,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+        'results': results,
+    }
@@ -0,0 +1,232 @@
+import asyncio
+from bs4 import BeautifulSoup, SoupStrainer
+from datetime import datetime
+import math
+import os
+import threading
+import uuid
+
+# lxml is optional, it builds the tree several times faster than the pure Python html.parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+HTML_PARSER = os.environ.get("SCRAPER_HTML_PARSER", HTML_PARSER)
+# Only build the results container subtree of a page (SCRAPER_PARTIAL_PARSE=0 parses whole pages)
+PARTIAL_PARSE = os.environ.get("SCRAPER_PARTIAL_PARSE", "1").strip().lower() not in ("0", "false", "no")
+
+
+# Directory used for debug dumps of pages whose extraction failed
+DEBUG_DUMP_DIR = os.path.join("temp_files", "debug")
+
+# Result window limits shared by every scraper
+DEFAULT_LIMIT = int(os.environ.get("SCRAPE_DEFAULT_LIMIT", 20))
+MAX_LIMIT = int(os.environ.get("SCRAPE_MAX_LIMIT", 200))
+MAX_PAGES = int(os.environ.get("SCRAPE_MAX_PAGES", 10))  # Max upstream result pages per request
+
+
+def debug_dump_enabled():
+    """
+    Checks whether failed pages should be dumped to disk for debugging.
+
+    Enabled by setting the SCRAPER_DEBUG_DUMP environment variable to 1/true/yes.
+    """
+    return os.environ.get("SCRAPER_DEBUG_DUMP", "").strip().lower() in ("1", "true", "yes")
+
+def _has_class(name):
+    """
+    Strainer test for tags carrying the class among others. While parsing, the class
+    attribute is still the raw "a b c" string, so a plain class_=name would only match
+    tags whose whole class attribute equals name.
+    """
+    def matches(value):
+        if not value:
+            return False
+        return name in (value.split() if isinstance(value, str) else value)
+    return matches
+
+def parse_html(content, only_class=None):
+    """
+    Parses raw page content straight from memory, with lxml when it is installed.
+
+    With only_class, the tree is built from the elements carrying that class (and their
+    subtrees) only: the rest of the page (scripts, navigation, footer) is tokenized but
+    never turned into tags, which makes parsing faster and far lighter on memory.
+
+    Args:
+        content (bytes | str): Response bytes or Selenium page source.
+        only_class (str, optional): Class of the container(s) to keep, e.g. the results list.
+
+    Returns:
+        BeautifulSoup: Parsed document tree.
+    """
+    parse_only = SoupStrainer(class_=_has_class(only_class)) if only_class and PARTIAL_PARSE else None
+
+    # Bytes are handed over as-is so BeautifulSoup detects the encoding itself,
+    # which avoids decoding the whole page into an intermediate str copy
+    return BeautifulSoup(content, HTML_PARSER, parse_only=parse_only)
+
+def dump_debug_page(content, source):
+    """
+    💾 Saves a page whose extraction failed so it can be inspected later.
+
+    Nothing is written unless debug dumps are enabled.
+
+    Args:
+        content (bytes | str): The page content that failed to extract.
+        source (str): Scraper name, used as filename prefix.
+
+    Returns:
+        str | None: Path of the dumped file, or None if nothing was written.
+    """
+    if not content or not debug_dump_enabled():
+        return None
+
+    try:
+        os.makedirs(DEBUG_DUMP_DIR, exist_ok=True)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        file_path = os.path.join(DEBUG_DUMP_DIR, f"{source}_{timestamp}_{uuid.uuid4().hex[:8]}.html")
+
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        with open(file_path, "wb") as f:
+            f.write(content)
+
+        print(f"🐞 Extraction failed, page dumped to {file_path}\n")
+        return file_path
+    except Exception as err:
+        print(f"❌ Error while dumping debug page: {err}\n")
+    return None
+
+class OrderedEmitter:
+    """
+    Streams items of concurrently scraped pages in page order, trimmed to a limit/offset window.
+
+    Items of the page currently at the head are passed on as soon as they are extracted;
+    items of later pages are held back until every page before them has finished, so the
+    stream has the same order and numbering as the final merged result.
+    """
+    def __init__(self, on_item, first_page, skip, limit, offset):
+        self._on_item = on_item
+        self._next_page = first_page
+        self._skip = skip
+        self._remaining = limit
+        self._offset = offset
+        self._emitted = 0
+        self._buffers = {}
+        self._finished = {}
+        self._stopped = False
+        self._lock = threading.Lock()
+
+    def page_callback(self, page):
+        """
+        Returns the on_item callback to hand to the scraper of the given page.
+        """
+        return lambda item: self._push(page, item)
+
+    def _push(self, page, item):
+        with self._lock:
+            if page == self._next_page:
+                self._emit(item)
+            elif page > self._next_page:
+                self._buffers.setdefault(page, []).append(item)
+
+    def page_done(self, page, ok):
+        """
+        Marks a page as finished; an empty or failed page ends the stream like it ends the merge.
+        """
+        with self._lock:
+            self._finished[page] = ok
+            while self._next_page in self._finished:
+                if not self._finished.pop(self._next_page):
+                    self._stopped = True
+                    self._buffers.clear()
+                    return
+                self._next_page += 1
+                for item in self._buffers.pop(self._next_page, []):
+                    self._emit(item)
+
+    def _emit(self, item):
+        if self._stopped or self._remaining <= 0:
+            return
+        if self._skip > 0:
+            self._skip -= 1
+            return
+        self._remaining -= 1
+        self._emitted += 1
+        self._on_item(dict(item, SNo=self._offset + self._emitted))
+
+async def collect_pages(scrape_page, limit, offset, on_item=None):
+    """
+    Fetches the result pages needed for a limit/offset window.
+
+    Upstream pages do not hold a fixed number of items (sponsored slots, grid vs list
+    layouts), so every item of each page is kept and the window is cut out of the pages
+    read from page 1 on. Page 1 is fetched alone first; the pages still needed are then
+    worked out from the number of items the pages read so far actually returned, and
+    fetched together. Another wave follows if they come up short, and fetching stops as
+    soon as the window is filled, a page comes back empty or failed, or MAX_PAGES pages
+    were read.
+
+    Args:
+        scrape_page (callable): Coroutine function taking a 1-based page number, the number
+            of items the page has to supply to fill the window (a hint, e.g. for how far to
+            scroll) and an optional per-item callback, returning every item of the page,
+            0 if the page is empty, or None on failure.
+        limit (int): Number of items wanted.
+        offset (int): Number of items to skip.
+        on_item (callable, optional): Called with every item of the window as soon as it
+            is extracted, in final order and numbering.
+
+    Returns:
+        list | int | None: Items renumbered from offset + 1, 0 if there are none, None if the first page failed.
+    """
+    emitter = OrderedEmitter(on_item, 1, offset, limit, offset) if on_item else None
+
+    async def run_page(page, wanted):
+        result = await scrape_page(page, wanted, emitter.page_callback(page) if emitter else None)
+        if emitter:
+            emitter.page_done(page, bool(result))
+        return result
+
+    needed = offset + limit
+    collected = []
+    page = 1
+    exhausted = failed = False
+
+    while len(collected) < needed and not exhausted and page <= MAX_PAGES:
+        missing = needed - len(collected)
+        if page == 1:
+            # Nothing is known about the page size yet
+            per_page, pages = missing, 1
+        else:
+            per_page = len(collected) / (page - 1)
+            pages = math.ceil(missing / per_page)
+
+        wave = range(page, min(page + pages, MAX_PAGES + 1))
+        results = await asyncio.gather(*(
+            run_page(p, max(1, missing - round((p - page) * per_page))) for p in wave
+        ))
+
+        # Merge in page order and stop at the first empty or failed page
+        for result in results:
+            if result is None:
+                failed = exhausted = True
+                break
+            if not result:
+                exhausted = True
+                break
+            collected.extend(result)
+
+        page = wave.stop
+
+    items = collected[offset:needed]
+    if not items:
+        return None if failed and not collected else 0
+
+    for i, item in enumerate(items):
+        item["SNo"] = offset + i + 1
+    return items
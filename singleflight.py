@@ -0,0 +1,74 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into a single execution.
+
+    The first caller for a key starts the call; callers arriving while it is in
+    flight wait on the same task and receive the same result or exception. The
+    call itself is bounded by a per-key timeout, after which every waiter gets
+    asyncio.TimeoutError. A waiter that is cancelled (e.g. its client went away) leaves
+    the call running for the others, but when the last one leaves the call is cancelled,
+    as nobody is waiting for it anymore.
+
+    Must be used from a single event loop (the scraping engine loop).
+    """
+    def __init__(self):
+        self._calls = {}
+        self._waiters = {}  # task -> number of callers awaiting it
+        self._stats = {"calls": 0, "coalesced": 0, "errors": 0, "timeouts": 0, "abandoned": 0}
+
+    async def do(self, key, fn, timeout=None):
+        """
+        Runs fn() once per in-flight key and returns (result, shared).
+
+        Args:
+            key (hashable): Identity of the call.
+            fn (callable): Zero-argument function returning a coroutine.
+            timeout (float, optional): Seconds before the shared call is cancelled.
+
+        Returns:
+            tuple: (result, shared) where shared is True if the caller joined an existing call.
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+
+        if shared:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["calls"] += 1
+            task = asyncio.ensure_future(self._run(fn, timeout))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        # Shield so a cancelled waiter does not cancel the call the others are waiting on
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and not task.done():
+                self._stats["abandoned"] += 1
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    async def _run(self, fn, timeout):
+        try:
+            return await asyncio.wait_for(fn(), timeout)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            raise
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def stats(self):
+        return {**self._stats, "in_flight": len(self._calls)}
@@ -1,8 +1,6 @@
 # Standard Library Imports
 import re
 import time
-import cv2
-import numpy as np
 import requests
 from datetime import datetime, timedelta
 import concurrent.futures
@@ -44,47 +42,6 @@ stop_words = set(stopwords.words('english'))  # Load stopwords for English
 # Constants
 BASE_URL = 'https://www.instagram.com'
 
-def rotate_image(image, angle):
-    """
-    Rotate the given image by the specified angle.
-    """
-    (h, w) = image.shape[:2]
-    center = (w // 2, h // 2)
-
-    # Get rotation matrix
-    M = cv2.getRotationMatrix2D(center, angle, 1.0)
-
-    # Perform the rotation
-    rotated = cv2.warpAffine(image, M, (w, h))
-
-    return rotated
-
-def fetch_face_locations(img):
-    """
-    Detect faces in the given image.
-    """
-    # Detect faces in the image
-    angles = [0, 90, 180, 270]
-    face_exists = []
-    for angle in angles:
-        rotated_img = rotate_image(img, angle)
-        face_locations = face_recognition.face_locations(rotated_img)
-        if face_locations:
-            face_exists = face_locations
-            break
-    return face_exists
-
-def image_normalize(file):
-    """
-    Normalize the given image file.
-    """
-    # Convert file to a NumPy array
-    file_bytes = np.frombuffer(file.read(), np.uint8)
-
-    # Decode image using OpenCV
-    img = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
-    return img
-
 def get_user_id(username):
     """
     Fetches the Instagram User ID for a given username.